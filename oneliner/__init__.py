@@ -1,26 +1,137 @@
-from oneliner.config import Configs
-from oneliner.convert import convert
-from oneliner.expr_unparse import expr_unparse
+"""
+Convert python scripts into oneliner expression.
+
+The converter is loaded on first use, so `import oneliner`
+(and `python -m oneliner --version`) doesn't pay for it.
+"""
+
+from __future__ import annotations
 
 # We don't use __version__ directly, and we won't add it into __all__
 # So we skip F401
 from oneliner.version import __version__  # noqa: F401
 
-__all__ = ["convert_code_string"]
+__all__ = [
+    "convert_code_string",
+    "convert_with_stats",
+    "convert_async",
+    "convert_stream",
+]
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import typing
+
+    from oneliner.config import Configs
+    from oneliner.stats import ConversionStats
+
+# names that are loaded from the submodules on first access
+_lazy_names = {
+    "Configs": "oneliner.config",
+    "convert": "oneliner.convert",
+    "expr_unparse": "oneliner.expr_unparse",
+    "unparse_expr": "oneliner.utils",
+}
+
+
+def __getattr__(name: str):
+    if name not in _lazy_names:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(_lazy_names[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_lazy_names])
+
+
+def _keep_lazy_names():
+    """
+    Importing a submodule sets it as an attribute of the package,
+    which would hide a lazy name of the same name (`oneliner.convert`)
+    """
+    import sys
+    import types
+
+    class _Package(types.ModuleType):
+        def __setattr__(self, name: str, value):
+            if name in _lazy_names and isinstance(value, types.ModuleType):
+                return
+            super().__setattr__(name, value)
+
+    sys.modules[__name__].__class__ = _Package
 
-import ast
-import symtable
 
+_keep_lazy_names()
+
+
+def convert_code_string(
+    code: str, filename="<string>", configs: Configs | None = None, jobs: int = 1
+):
+    import ast
+    import symtable
+
+    from oneliner.config import Configs
+    from oneliner.convert import convert
+    from oneliner.utils import unparse_expr
 
-def convert_code_string(code: str, filename="<string>", configs: Configs | None = None):
     if configs is None:
         configs = Configs()
 
-    ast_root = ast.parse(code, filename, "exec")
-    symtable_root = symtable.symtable(code, filename, "exec")
-    out = convert(ast_root, symtable_root, configs)
+    if jobs > 1:
+        from oneliner.parallel import convert_parallel
 
-    if configs.unparser == "oneliner":
-        return expr_unparse(out)
+        output = convert_parallel(code, filename, configs, jobs)
     else:
-        return ast.unparse(out).replace("\n", "")
+        ast_root = ast.parse(code, filename, "exec")
+        symtable_root = symtable.symtable(code, filename, "exec")
+        output = unparse_expr(convert(ast_root, symtable_root, configs), configs)
+
+    if configs.output == "compressed":
+        from oneliner.compress import compress_output
+
+        return compress_output(output, configs)
+    return output
+
+
+def convert_with_stats(
+    code: str, filename="<string>", configs: Configs | None = None
+) -> tuple[str, ConversionStats]:
+    """
+    Convert the code like `convert_code_string`,
+    and get the statistics of the conversion, see `oneliner.stats`
+    """
+    from oneliner.stats import convert_with_stats
+
+    return convert_with_stats(code, filename, configs)
+
+
+async def convert_async(
+    code: str, configs: Configs | None = None, filename: str = "<string>"
+) -> str:
+    """
+    Convert the code without blocking the event loop,
+    see `oneliner.async_convert` for the pool and its limits
+    """
+    from oneliner.async_convert import convert_async
+
+    return await convert_async(code, configs, filename)
+
+
+def convert_stream(
+    infile: typing.TextIO,
+    outfile: typing.TextIO,
+    filename: str = "<stream>",
+    configs: Configs | None = None,
+) -> None:
+    """
+    Convert the script read from `infile` statement by statement,
+    and write the result to `outfile`,
+    see `oneliner.stream` for huge scripts
+    """
+    from oneliner.stream import convert_stream
+
+    convert_stream(infile, outfile, filename, configs)
@@ -1,8 +1,20 @@
 import argparse
+import importlib
+import sys
+
+# subcommands and the modules that implement them
+subcommands = {
+    "bundle": "oneliner.bundle",
+    "serve": "oneliner.server",
+    "client": "oneliner.client",
+    "run": "oneliner.sourcemap",
+}
+
+if len(sys.argv) > 1 and sys.argv[1] in subcommands:
+    importlib.import_module(subcommands[sys.argv[1]]).cli(sys.argv[2:])
+    sys.exit()
 
 import oneliner
-import oneliner.config
-import oneliner.version
 
 parser = argparse.ArgumentParser(
     description="Convert python scripts into oneliner expression."
@@ -33,6 +45,35 @@ parser.add_argument(
     "Oneliner-Py will print the result to the screen.",
 )
 
+parser.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    default=1,
+    help="Convert the top-level functions and classes in JOBS worker processes",
+)
+
+parser.add_argument(
+    "--stream",
+    action="store_true",
+    help="Convert and write the top-level statements one by one, "
+    "so huge scripts are converted with bounded memory",
+)
+
+parser.add_argument(
+    "--stats",
+    action="store_true",
+    help="Print the statistics of the conversion to stderr, "
+    "like the converted constructs and the generated temporaries",
+)
+
+parser.add_argument(
+    "--source-map",
+    type=str,
+    help="Write the source map of the output to this file, "
+    "see `python -m oneliner run -h`",
+)
+
 # todo: remove in 1.3.0
 parser.add_argument(
     "--unparser",
@@ -42,29 +83,10 @@ parser.add_argument(
 
 args = parser.parse_args()
 
-cfg = oneliner.config.Configs()
+# the converter is imported after parsing, so `--version` and `-h` stay fast
+import oneliner.config  # noqa: E402
 
-if args.C is None:
-    args_configs = []
-else:
-    args_configs = args.C
-
-for input_config in args_configs:
-    assert isinstance(input_config, str)
-
-    splited_input_config = input_config.split("=")
-
-    if len(splited_input_config) != 2:
-        raise TypeError(
-            "Invalid syntax of -C parameter, expected -C<config_name>=<config_value>"
-        )
-
-    config_name, config_value = splited_input_config
-
-    if not hasattr(cfg, config_name):
-        raise ValueError(f"Unknown convig name '{config_name}'")
-
-    setattr(cfg, config_name, config_value)
+cfg = oneliner.config.parse_config_args(args.C)
 
 if args.unparser is not None:
     import warnings
@@ -76,10 +98,41 @@ if args.unparser is not None:
     )
     cfg.unparser = args.unparser
 
+if cfg.output != "plain" and (args.stream or args.source_map is not None):
+    parser.error("--stream and --source-map need the plain output")
+
+if args.stats and (args.stream or args.source_map is not None or args.jobs > 1):
+    parser.error("--stats can't be used with --stream, --source-map or --jobs")
+
+if args.stream:
+    if args.source_map is not None or args.jobs > 1:
+        parser.error("--stream can't be used with --source-map or --jobs")
+    from oneliner.stream import convert_stream
+
+    with open(args.input_filename, "r", encoding="utf8") as infile:
+        if args.output is not None:
+            with open(args.output, "w", encoding="utf8") as outfile:
+                convert_stream(infile, outfile, args.input_filename, cfg)
+        else:
+            convert_stream(infile, sys.stdout, args.input_filename, cfg)
+            print()
+    sys.exit()
+
 with open(args.input_filename, "r", encoding="utf8") as infile:
     script = infile.read()
 
-converted = oneliner.convert_code_string(script, configs=cfg)
+if args.source_map is not None:
+    from oneliner.sourcemap import convert_with_source_map
+
+    converted, source_map = convert_with_source_map(
+        script, args.input_filename, cfg, args.output
+    )
+    source_map.save(args.source_map)
+elif args.stats:
+    converted, stats = oneliner.convert_with_stats(script, args.input_filename, cfg)
+    print(stats.format(), file=sys.stderr)
+else:
+    converted = oneliner.convert_code_string(script, configs=cfg, jobs=args.jobs)
 
 if args.output is not None:
     with open(args.output, "w", encoding="utf8") as outfile:
@@ -0,0 +1,203 @@
+"""
+Convert scripts without blocking the event loop.
+
+The conversions run in a thread pool or a process pool.
+The number of running conversions is limited by `max_concurrency`,
+and at most `max_queue` conversions wait for a free slot,
+more requests are rejected with `ConversionQueueFull`.
+
+The limits are shared by all the event loops (and threads) using
+the converter. A finished conversion hands its slot to the first waiting
+request, on the event loop of the request.
+
+A cancelled request which is still waiting is removed from the queue.
+The executor can't interrupt a running conversion, so a running conversion
+keeps its slot until it finishes, and its result is dropped.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import os
+import threading
+import time
+import typing
+
+from oneliner.config import Configs
+
+__all__ = [
+    "AsyncConverter",
+    "ConversionLatency",
+    "ConversionQueueFull",
+    "convert_async",
+]
+
+
+class ConversionQueueFull(RuntimeError):
+    pass
+
+
+class ConversionLatency(typing.NamedTuple):
+    queued: float  # seconds waiting for a free slot
+    running: float  # seconds of the conversion in the executor
+    total: float
+
+
+def _convert(code: str, filename: str, configs: dict[str, typing.Any]) -> str:
+    # runs in the executor, configs are passed as a dict to be pickled
+    from oneliner import convert_code_string
+
+    return convert_code_string(code, filename, Configs(**configs))
+
+
+class AsyncConverter:
+    executor: concurrent.futures.Executor
+    max_concurrency: int
+    max_queue: int
+    latencies: collections.deque[ConversionLatency]  # latencies of recent requests
+
+    def __init__(
+        self,
+        executor: typing.Literal["thread", "process"] = "thread",
+        max_workers: int | None = None,
+        max_concurrency: int | None = None,
+        max_queue: int = 64,
+        on_latency: typing.Callable[[ConversionLatency], typing.Any] | None = None,
+    ):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if executor == "thread":
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        elif executor == "process":
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+        else:
+            raise ValueError(f"Unknown executor '{executor}'")
+
+        self.max_concurrency = (
+            max_workers if max_concurrency is None else max_concurrency
+        )
+        self.max_queue = max_queue
+        self.on_latency = on_latency
+        self.latencies = collections.deque(maxlen=1024)
+
+        self.running = 0
+        # the requests waiting for a slot, the futures are set on their loops.
+        # asyncio primitives are bound to one event loop,
+        # so the slots are counted with a lock
+        self._waiters: collections.deque[
+            tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]
+        ] = collections.deque()
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _acquire(self, loop: asyncio.AbstractEventLoop) -> asyncio.Future[None] | None:
+        """Take a free slot, or get a future set when a slot is handed over"""
+        with self._lock:
+            if self.running < self.max_concurrency and not self._waiters:
+                self.running += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                raise ConversionQueueFull(
+                    f"Too many conversions are waiting (max_queue={self.max_queue})"
+                )
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+            return waiter
+
+    def _cancel_waiter(self, waiter: asyncio.Future[None]):
+        with self._lock:
+            for item in self._waiters:
+                if item[1] is waiter:
+                    self._waiters.remove(item)
+                    return
+        # the slot was handed over already
+        self._release()
+
+    def _release(self):
+        """Hand the slot over to the first waiting request, or free it"""
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(
+                        lambda waiter=waiter: waiter.done() or waiter.set_result(None)
+                    )
+                except RuntimeError:  # pragma: no cover
+                    # the loop is closed, the request is gone
+                    continue
+                return
+            self.running -= 1
+
+    async def convert(
+        self, code: str, configs: Configs | None = None, filename: str = "<string>"
+    ) -> str:
+        if configs is None:
+            configs = Configs()
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        waiter = self._acquire(loop)
+        if waiter is not None:
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                self._cancel_waiter(waiter)
+                raise
+        started = time.perf_counter()
+
+        try:
+            concurrent_future = self.executor.submit(
+                _convert, code, filename, configs.to_dict()
+            )
+        except BaseException:
+            self._release()
+            raise
+        # the slot is released when the conversion is actually finished
+        concurrent_future.add_done_callback(lambda _: self._release())
+
+        # cancelling the awaiting task cancels the conversion if it's not started
+        result = await asyncio.wrap_future(concurrent_future)
+
+        finished = time.perf_counter()
+        latency = ConversionLatency(
+            queued=started - submitted,
+            running=finished - started,
+            total=finished - submitted,
+        )
+        self.latencies.append(latency)
+        if self.on_latency is not None:
+            self.on_latency(latency)
+        return result
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_default_converter: AsyncConverter | None = None
+_default_converter_lock = threading.Lock()
+
+
+def get_default_converter() -> AsyncConverter:
+    global _default_converter
+    # event loops in different threads may ask for it at the same time
+    with _default_converter_lock:
+        if _default_converter is None:
+            _default_converter = AsyncConverter()
+        return _default_converter
+
+
+async def convert_async(
+    code: str, configs: Configs | None = None, filename: str = "<string>"
+) -> str:
+    """
+    Convert the code in the thread pool of the default converter
+    """
+    return await get_default_converter().convert(code, configs, filename)
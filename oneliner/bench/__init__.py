@@ -0,0 +1,44 @@
+"""
+Benchmarks of Oneliner-Py.
+
+Use `python -m oneliner.bench -h` to list the benchmarks.
+Each benchmark module provides `add_arguments(parser)` to register its
+command line arguments and `run(args)` which returns the measured timings.
+"""
+
+import time
+import typing
+
+__all__ = ["benchmarks", "measure", "report"]
+
+# the modules in this package and their descriptions
+benchmarks = {
+    "literal_table": "Convert a script with a big literal lookup table",
+    "importtime": "Measure the time of `import oneliner` and of the CLI startup",
+    "threads": "Convert concurrently in threads with different configs",
+    "global_counter": "Run a converted loop updating global names",
+    "target_version": "Run the scripts converted for each -Ctarget_version",
+    "unpack": "Run converted destructuring assignments in loops",
+    "stdlib": "Convert a deterministic sample of the local standard library",
+    "memory": "Measure the memory of each phase of the conversion",
+    "lowerings": "Time each lowering against the native construct",
+    "compressed": "Compare the sizes and startup times of the compressed outputs",
+    "compare": "Rerun the benchmarks and compare them with a baseline",
+}
+
+
+def measure(func: typing.Callable[[], typing.Any], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(results: dict[str, list[float]]):
+    name_width = max(map(len, results), default=0)
+    for name, timings in results.items():
+        best = min(timings)
+        mean = sum(timings) / len(timings)
+        print(f"{name:<{name_width}}  best {best:.6f}s  mean {mean:.6f}s")
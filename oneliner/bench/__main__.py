@@ -0,0 +1,17 @@
+import argparse
+import importlib
+
+from oneliner.bench import benchmarks, report
+
+parser = argparse.ArgumentParser(
+    prog="python -m oneliner.bench", description="Run benchmarks of Oneliner-Py."
+)
+subparsers = parser.add_subparsers(dest="benchmark", required=True)
+for name, description in benchmarks.items():
+    module = importlib.import_module(f"oneliner.bench.{name}")
+    subparser = subparsers.add_parser(name, help=description, description=description)
+    module.add_arguments(subparser)
+    subparser.set_defaults(run=module.run)
+
+args = parser.parse_args()
+report(args.run(args))
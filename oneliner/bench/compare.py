@@ -0,0 +1,189 @@
+"""
+Compare the benchmarks with a baseline, as a gate for regressions.
+
+    python -m oneliner.bench compare baseline.json --save   # record
+    python -m oneliner.bench compare baseline.json          # compare
+
+The conversion and runtime benchmarks are rerun with their default
+arguments (and `--repeat` runs each), and their timings are compared
+with the timings in the baseline, recorded on the same machine.
+
+A timing regresses when its median is slower than the baseline by more
+than `--tolerance`, and the one-sided Mann-Whitney U test shows that
+it is slower with the p-value below `--alpha`. The command exits with
+a non-zero status if any timing regresses.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import statistics
+import sys
+
+import oneliner
+
+BASELINE_VERSION = 1
+
+# the conversion benchmarks and the runtime benchmarks of the converted scripts
+suite = ["literal_table", "threads", "stdlib", "global_counter", "unpack", "lowerings"]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("baseline", type=str, help="The JSON file of the baseline")
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Run the benchmarks and save them as the baseline",
+    )
+    parser.add_argument(
+        "-b",
+        "--benchmarks",
+        nargs="+",
+        choices=suite,
+        default=suite,
+        help="The benchmarks to run (default: all of them)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="The allowed slowdown of the median (default: 0.1, which is 10%%)",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="The significance level of the test (default: 0.05)",
+    )
+    parser.add_argument("--repeat", type=int, default=7)
+
+
+def run_benchmark(name: str, repeat: int) -> dict[str, list[float]]:
+    """Run the benchmark with its default arguments"""
+    module = importlib.import_module(f"oneliner.bench.{name}")
+    parser = argparse.ArgumentParser()
+    module.add_arguments(parser)
+    args = parser.parse_args([])
+    args.repeat = repeat
+    # the benchmarks print their details
+    with contextlib.redirect_stdout(io.StringIO()):
+        return module.run(args)
+
+
+def _u_counts(n: int, m: int) -> list[int]:
+    """
+    The numbers of the orderings of n and m samples
+    for each value of the U statistic of the n samples
+    """
+    # counts[i][j] are the counts for i and j samples
+    counts = [[[1] for _ in range(m + 1)] for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            # the largest sample is one of the i samples (U grows by j)
+            # or one of the j samples
+            with_i = [0] * j + counts[i - 1][j]
+            with_j = counts[i][j - 1]
+            size = max(len(with_i), len(with_j))
+            counts[i][j] = [
+                (with_i[u] if u < len(with_i) else 0)
+                + (with_j[u] if u < len(with_j) else 0)
+                for u in range(size)
+            ]
+    return counts[n][m]
+
+
+def mann_whitney_greater(current: list[float], baseline: list[float]) -> float:
+    """
+    The p-value of the one-sided Mann-Whitney U test
+    that the current timings are greater than the baseline ones
+    """
+    u = sum(1.0 if c > b else 0.5 if c == b else 0.0 for c in current for b in baseline)
+    n, m = len(current), len(baseline)
+    if n * m <= 400:
+        # the exact distribution, the ties are rare in timings
+        counts = _u_counts(n, m)
+        return sum(counts[int(u) :]) / sum(counts)
+    # the normal approximation, with the continuity correction
+    mean = n * m / 2
+    sd = (n * m * (n + m + 1) / 12) ** 0.5
+    return 1 - statistics.NormalDist().cdf((u - 0.5 - mean) / sd)
+
+
+def compare(
+    current: dict[str, list[float]],
+    baseline: dict[str, list[float]],
+    tolerance: float,
+    alpha: float,
+) -> list[str]:
+    """Print the comparison, and get the names of the regressed timings"""
+    regressed = []
+    name_width = max(map(len, current), default=0)
+    for name, timings in current.items():
+        if name not in baseline:
+            print(f"{name:<{name_width}}  not in the baseline")
+            continue
+        before = statistics.median(baseline[name])
+        after = statistics.median(timings)
+        change = after / before - 1
+        p_value = mann_whitney_greater(timings, baseline[name])
+        if change > tolerance and p_value < alpha:
+            verdict = "REGRESSED"
+            regressed.append(name)
+        elif (
+            change < -tolerance
+            and mann_whitney_greater(baseline[name], timings) < alpha
+        ):
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        print(
+            f"{name:<{name_width}}  {before:.6f}s -> {after:.6f}s"
+            f"  {change:+7.1%}  p={p_value:.3f}  {verdict}"
+        )
+    return regressed
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    results: dict[str, dict[str, list[float]]] = {}
+    for name in args.benchmarks:
+        print(f"running {name}", file=sys.stderr)
+        results[name] = run_benchmark(name, args.repeat)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf8") as file:
+            json.dump(
+                {
+                    "version": BASELINE_VERSION,
+                    "oneliner": oneliner.__version__,
+                    "python": sys.version,
+                    "results": results,
+                },
+                file,
+                indent=1,
+            )
+        return {
+            name: timings
+            for benchmark in results.values()
+            for name, timings in benchmark.items()
+        }
+
+    with open(args.baseline, "r", encoding="utf8") as file:
+        data = json.load(file)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version {data.get('version')}")
+    if data["python"] != sys.version:
+        print(f"The baseline is recorded with python {data['python']}")
+
+    regressed = []
+    for name, timings in results.items():
+        if name not in data["results"]:
+            print(f"{name}: not in the baseline")
+            continue
+        regressed.extend(
+            compare(timings, data["results"][name], args.tolerance, args.alpha)
+        )
+    if regressed:
+        raise SystemExit(f"{len(regressed)} regressed: " + ", ".join(regressed))
+    return {}
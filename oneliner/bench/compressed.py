@@ -0,0 +1,81 @@
+"""
+Compare the sizes and the startup times of the plain and compressed outputs.
+
+Each output runs in a fresh interpreter. A compressed output runs cold
+(with an empty cache, so it is decompressed and compiled)
+and warm (the code object is loaded from the cache).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import oneliner
+from oneliner.bench import measure
+from oneliner.bench.memory import generate_script
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-n",
+        "--blocks",
+        type=int,
+        nargs="+",
+        default=[10, 100, 500],
+        help="The sizes of the scripts, in blocks of 20 lines (default: 10 100 500)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = os.path.join(tmp_dir, "cache")
+        env = dict(os.environ, ONELINER_CACHE=cache_dir)
+
+        def run_output(filename: str, cold: bool = False):
+            if cold and os.path.isdir(cache_dir):
+                for cached in os.listdir(cache_dir):
+                    os.remove(os.path.join(cache_dir, cached))
+            subprocess.run(
+                [sys.executable, filename], env=env, capture_output=True, check=True
+            )
+
+        for blocks in args.blocks:
+            script = generate_script(blocks)
+            lines = script.count("\n")
+            outputs = {
+                "plain": oneliner.convert_code_string(script),
+                **{
+                    compression: oneliner.convert_code_string(
+                        script,
+                        configs=oneliner.Configs(
+                            output="compressed", compression=compression
+                        ),
+                    )
+                    for compression in ("zlib", "lzma")
+                },
+            }
+            print(f"{lines} lines:")
+            for name, output in outputs.items():
+                ratio = len(output) / len(outputs["plain"])
+                print(f"  {name:<6} {len(output):>10} bytes  {ratio:6.1%}")
+
+                # not named like the modules it imports
+                filename = os.path.join(tmp_dir, f"output_{name}.py")
+                with open(filename, "w", encoding="utf8") as file:
+                    file.write(output)
+                if name == "plain":
+                    results[f"startup[{lines} lines] plain"] = measure(
+                        lambda: run_output(filename), args.repeat
+                    )
+                    continue
+                results[f"startup[{lines} lines] {name} cold"] = measure(
+                    lambda: run_output(filename, cold=True), args.repeat
+                )
+                results[f"startup[{lines} lines] {name} warm"] = measure(
+                    lambda: run_output(filename), args.repeat
+                )
+    return results
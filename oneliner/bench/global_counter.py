@@ -0,0 +1,57 @@
+import argparse
+
+import oneliner
+from oneliner.bench import measure
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=1_000_000,
+        help="The number of loop iterations of each run (default: 1000000)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+
+
+scripts = {
+    # a global counter updated in a loop
+    "counter": (
+        "counter = 0\n"
+        "total = 0\n"
+        "def count(n):\n"
+        "    global counter, total\n"
+        "    for i in range(n):\n"
+        "        counter = counter + 1\n"
+        "        total = total + i\n"
+        "count({iterations})\n"
+    ),
+    # a "from" import in a loop
+    "import_from": (
+        "def imports(n):\n"
+        "    for i in range(n):\n"
+        "        from math import sqrt\n"
+        "imports({iterations})\n"
+    ),
+}
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    configs = oneliner.Configs(unparser="oneliner")
+    results = {}
+    for name, script in scripts.items():
+        script = script.format(iterations=args.iterations)
+        converted = compile(
+            oneliner.convert_code_string(script, configs=configs),
+            "<converted>",
+            "exec",
+        )
+        original = compile(script, "<original>", "exec")
+        results[f"{name}[{args.iterations}] converted"] = measure(
+            lambda: exec(converted, {}), args.repeat
+        )
+        results[f"{name}[{args.iterations}] original"] = measure(
+            lambda: exec(original, {}), args.repeat
+        )
+    return results
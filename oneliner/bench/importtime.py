@@ -0,0 +1,44 @@
+import argparse
+import re
+import subprocess
+import sys
+
+from oneliner.bench import measure
+
+_importtime_line = re.compile(r"import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*(\S+)\s*$")
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--repeat", type=int, default=10)
+
+
+def get_import_time(module: str) -> float:
+    """
+    The cumulative import time of `module` (in seconds)
+    reported by `python -X importtime` in a fresh interpreter
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in proc.stderr.splitlines():
+        match = _importtime_line.match(line)
+        if match is not None and match.group(2) == module:
+            return int(match.group(1)) / 1_000_000
+    raise RuntimeError(f"The import time of '{module}' is not reported")
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    return {
+        "import oneliner": [get_import_time("oneliner") for _ in range(args.repeat)],
+        "python -m oneliner --version": measure(
+            lambda: subprocess.run(
+                [sys.executable, "-m", "oneliner", "--version"],
+                capture_output=True,
+                check=True,
+            ),
+            args.repeat,
+        ),
+    }
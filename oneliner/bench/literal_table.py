@@ -0,0 +1,34 @@
+import argparse
+
+import oneliner
+from oneliner.bench import measure
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-n",
+        "--elements",
+        type=int,
+        default=1_000_000,
+        help="The number of constants in the table (default: 1000000)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+
+
+def generate_script(elements: int) -> str:
+    # each row is a key and a tuple of 3 constants
+    rows = ",".join(
+        f"{i}:({-i},'row {i}',{i / 8})" for i in range(max(elements // 4, 1))
+    )
+    return f"TABLE = {{{rows}}}\ndef lookup(key):\n    return TABLE[key]\n"
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    script = generate_script(args.elements)
+    configs = oneliner.Configs(unparser="oneliner")
+    return {
+        f"literal_table[{args.elements}]": measure(
+            lambda: oneliner.convert_code_string(script, configs=configs),
+            args.repeat,
+        )
+    }
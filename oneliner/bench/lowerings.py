@@ -0,0 +1,133 @@
+"""
+Time each lowering of the converter against the native construct.
+
+Each script defines a function `bench` running one construct,
+the original and the converted `bench` are called `--number` times
+by an unconverted loop, so only the construct itself is measured
+(with the call of `bench`, which is the same in both).
+The table of the best timings per call (in nanoseconds) and their
+ratios to the native ones is printed as JSON,
+or written to `--json`.
+"""
+
+import argparse
+import json
+import timeit
+
+import oneliner
+
+scripts = {
+    # a simple "for" is a list comprehension
+    "for": "def bench():\n    for i in range(100):\n        x = i\n",
+    # a "for" with "break" loops over `__ol_iter_wrapper`
+    "for_break": (
+        "def bench():\n"
+        "    for i in range(100):\n"
+        "        if i == 99:\n"
+        "            break\n"
+    ),
+    # "while" loops over `itertools.takewhile` of `itertools.count`
+    "while": "def bench():\n    i = 0\n    while i < 100:\n        i = i + 1\n",
+    # the operator is looked up with `hasattr`
+    "aug_assign": "def bench():\n    x = 0\n    x += 1\n    x *= 2\n",
+    # nonlocal names are items of a dict
+    "nonlocal": (
+        "def make():\n"
+        "    count = 0\n"
+        "    def bench():\n"
+        "        nonlocal count\n"
+        "        count = count + 1\n"
+        "    return bench\n"
+        "bench = make()\n"
+    ),
+    # global names are set by `globals().__setitem__`
+    "global": (
+        "counter = 0\n"
+        "def bench():\n"
+        "    global counter\n"
+        "    counter = 1\n"
+        "    counter = 2\n"
+    ),
+    # a converted function is a lambda with its return value
+    "call": (
+        "def add(a, b=1):\n"
+        "    total = a + b\n"
+        "    return total\n"
+        "def bench():\n"
+        "    add(1)\n"
+    ),
+    # a class is created by its loader
+    "class": (
+        "def bench():\n"
+        "    class A:\n"
+        "        x = 1\n"
+        "        def get(self):\n"
+        "            return self.x\n"
+    ),
+    # imports call `importlib.import_module`
+    "import": "def bench():\n    import os\n    from os import path\n",
+}
+
+expr_wrappers = ["list", "chain_call"]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(scripts),
+        default=list(scripts),
+        help="The lowerings to measure (default: all of them)",
+    )
+    parser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=20_000,
+        help="The number of calls of each run (default: 20000)",
+    )
+    parser.add_argument(
+        "--json",
+        type=str,
+        default=None,
+        help="Write the table to this file instead of printing it",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+
+
+def get_bench(script: str, filename: str):
+    namespace: dict = {}
+    exec(compile(script, filename, "exec"), namespace)
+    return namespace["bench"]
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    results = {}
+    table = []
+    for name in args.only:
+        script = scripts[name]
+        benches = {"native": get_bench(script, "<native>")}
+        for expr_wrapper in expr_wrappers:
+            converted = oneliner.convert_code_string(
+                script, configs=oneliner.Configs(expr_wrapper=expr_wrapper)
+            )
+            benches[expr_wrapper] = get_bench(converted, "<converted>")
+
+        best: dict[str, float] = {}
+        for variant, bench in benches.items():
+            timings = timeit.repeat(bench, repeat=args.repeat, number=args.number)
+            results[f"{name}[x{args.number}] {variant}"] = timings
+            best[variant] = min(timings) / args.number
+        row: dict[str, str | float] = {"lowering": name}
+        for variant, timing in best.items():
+            row[f"{variant}_ns"] = round(timing * 1e9, 1)
+        for expr_wrapper in expr_wrappers:
+            row[f"{expr_wrapper}_ratio"] = round(best[expr_wrapper] / best["native"], 2)
+        table.append(row)
+
+    if args.json is None:
+        print(json.dumps(table, indent=2))
+    else:
+        with open(args.json, "w", encoding="utf8") as file:
+            json.dump(table, file, indent=2)
+    return results
@@ -0,0 +1,151 @@
+"""
+Measure the memory of each phase of a conversion with `tracemalloc`.
+
+For each phase the peak is the highest traced memory above the memory
+at the start of the phase, and the retained memory is what is still
+allocated at its end (like the tree it produces, which the next phase uses).
+The memory per line is the highest peak of all phases (above the memory
+before the conversion) divided by the number of lines of the script.
+
+With `--max-bytes-per-line`, the benchmark fails if the memory per line
+of any script exceeds it, so it can guard against regressions.
+"""
+
+import argparse
+import ast
+import symtable
+import tracemalloc
+import typing
+
+import oneliner
+from oneliner.bench import measure
+
+
+class PhaseMemory(typing.NamedTuple):
+    phase: str
+    peak: int  # bytes
+    retained: int
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-n",
+        "--blocks",
+        type=int,
+        nargs="+",
+        default=[50, 200, 800],
+        help="The sizes of the scripts, in blocks of 20 lines (default: 50 200 800)",
+    )
+    parser.add_argument(
+        "--max-bytes-per-line",
+        type=int,
+        default=None,
+        help="Fail if the memory per line of a script exceeds this",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+
+
+def generate_script(blocks: int) -> str:
+    """A script of loops, functions and classes, 20 lines per block"""
+    return "".join(
+        f"import os as os_{i}\n"
+        f"def f{i}(items):\n"
+        f"    total = 0\n"
+        f"    def add(x):\n"
+        f"        nonlocal total\n"
+        f"        total += x\n"
+        f"    for item in items:\n"
+        f"        if item > {i}:\n"
+        f"            break\n"
+        f"        add(item)\n"
+        f"    while total > {i}:\n"
+        f"        total -= 1\n"
+        f"    a, b = total, [items]\n"
+        f"    return a\n"
+        f"class C{i}:\n"
+        f"    x = {i}\n"
+        f"    def get(self):\n"
+        f"        return self.x\n"
+        f"value_{i} = f{i}(range(10)) + C{i}().get()\n"
+        f"print(value_{i})\n"
+        for i in range(blocks)
+    )
+
+
+def measure_phases(
+    script: str, configs: oneliner.Configs | None = None
+) -> list[PhaseMemory]:
+    """Convert the script and measure the memory of each phase"""
+    from oneliner.convert import analyze, convert_node
+    from oneliner.utils import unparse_expr
+
+    if configs is None:
+        configs = oneliner.Configs()
+
+    phases: list[tuple[str, typing.Callable[[dict[str, typing.Any]], typing.Any]]] = [
+        ("parse", lambda r: ast.parse(script)),
+        ("symtable", lambda r: symtable.symtable(script, "<string>", "exec")),
+        ("analyze", lambda r: analyze(r["symtable"], configs)),
+        (
+            "convert",
+            lambda r: r["analyze"].module_wraper(
+                convert_node(r["parse"], r["analyze"])
+            ),
+        ),
+        ("unparse", lambda r: unparse_expr(r["convert"], configs)),
+    ]
+    results: dict[str, typing.Any] = {}
+    memory = []
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        for name, phase in phases:
+            start, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            results[name] = phase(results)
+            end, peak = tracemalloc.get_traced_memory()
+            memory.append(PhaseMemory(name, peak - start, end - start))
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return memory
+
+
+def bytes_per_line(script: str, memory: list[PhaseMemory]) -> float:
+    # the peak of a phase is above the memory retained by the phases before it
+    retained = 0
+    peak = 0
+    for phase in memory:
+        peak = max(peak, retained + phase.peak)
+        retained += phase.retained
+    return peak / script.count("\n")
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    results = {}
+    failed = []
+    for blocks in args.blocks:
+        script = generate_script(blocks)
+        lines = script.count("\n")
+        memory = measure_phases(script)
+        per_line = bytes_per_line(script, memory)
+        print(f"{lines} lines:")
+        for phase in memory:
+            print(
+                f"  {phase.phase:<10} peak {phase.peak / 1024:10.1f} KiB"
+                f"  retained {phase.retained / 1024:10.1f} KiB"
+            )
+        print(f"  {per_line:.0f} bytes/line")
+        if args.max_bytes_per_line is not None and per_line > args.max_bytes_per_line:
+            failed.append(f"{lines} lines: {per_line:.0f} bytes/line")
+
+        results[f"convert[{lines} lines]"] = measure(
+            lambda: oneliner.convert_code_string(script), args.repeat
+        )
+    if failed:
+        raise SystemExit(
+            f"The memory per line exceeds {args.max_bytes_per_line} bytes: "
+            + ", ".join(failed)
+        )
+    return results
@@ -0,0 +1,140 @@
+"""
+Convert a sample of the local standard library, offline.
+
+The top-level statements which contain unsupported nodes (like `try` and
+`with`) are dropped, and the files without any statement left are skipped.
+With `--whole-files`, only the files which are supported entirely are kept.
+A file is also skipped if the converter rejects it (like a star import).
+
+The sample is the first files ordered by the hash of their paths
+relative to the library, so the same files are picked on every machine
+with the same version of python.
+"""
+
+import argparse
+import ast
+import hashlib
+import os
+import sysconfig
+import time
+
+import oneliner
+from oneliner.convert import ast2pending
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--lib",
+        type=str,
+        default=sysconfig.get_paths()["stdlib"],
+        help="The library to convert (default: the standard library)",
+    )
+    parser.add_argument(
+        "-n",
+        "--files",
+        type=int,
+        default=200,
+        help="The number of sampled files, 0 for all of them (default: 200)",
+    )
+    parser.add_argument(
+        "--whole-files",
+        action="store_true",
+        help="Keep only the files which are supported entirely",
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=10,
+        help="The number of the slowest files to show (default: 10)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+
+
+def iter_sources(lib: str):
+    """Yield the paths of the python files relative to the library"""
+    for dirpath, dirnames, filenames in os.walk(lib):
+        dirnames[:] = sorted(
+            name for name in dirnames if name not in ("site-packages", "__pycache__")
+        )
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                path = os.path.join(dirpath, filename)
+                yield os.path.relpath(path, lib).replace(os.sep, "/")
+
+
+def sample(paths: list[str], count: int) -> list[str]:
+    paths = sorted(paths, key=lambda path: hashlib.sha1(path.encode()).hexdigest())
+    return paths if count <= 0 else paths[:count]
+
+
+def is_supported(node: ast.stmt) -> bool:
+    for child in ast.walk(node):
+        if isinstance(child, ast.stmt) and type(child) not in ast2pending:
+            return False
+        if isinstance(child, ast.ImportFrom) and any(
+            alias.name == "*" for alias in child.names
+        ):
+            return False
+    return True
+
+
+def load(lib: str, path: str, whole_files: bool) -> tuple[str, int] | None:
+    """
+    Get the supported source of the file and the number of its statements,
+    or None if nothing is left
+    """
+    with open(os.path.join(lib, path), "rb") as file:
+        try:
+            tree = ast.parse(file.read(), path)
+        except (SyntaxError, ValueError):
+            # test data and files for other versions of python
+            return None
+    body = [node for node in tree.body if is_supported(node)]
+    if not body or whole_files and len(body) < len(tree.body):
+        return None
+    tree.body = body
+    statements = sum(isinstance(node, ast.stmt) for node in ast.walk(tree))
+    return ast.unparse(tree), statements
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    configs = oneliner.Configs()
+    corpus: list[tuple[str, str, int]] = []
+    skipped = 0
+    for path in sample(list(iter_sources(args.lib)), args.files):
+        loaded = load(args.lib, path, args.whole_files)
+        if loaded is not None:
+            try:
+                oneliner.convert_code_string(loaded[0], path, configs)
+            except (SyntaxError, NotImplementedError, RuntimeError, RecursionError):
+                loaded = None
+        if loaded is None:
+            skipped += 1
+            continue
+        corpus.append((path, *loaded))
+    if not corpus:
+        raise RuntimeError(f"No supported file is sampled from '{args.lib}'")
+    statements = sum(count for _, _, count in corpus)
+    print(
+        f"{args.lib}: {len(corpus)} files, {statements} statements, {skipped} skipped"
+    )
+
+    file_timings = {path: float("inf") for path, _, _ in corpus}
+    total_timings = []
+    for _ in range(args.repeat):
+        total = 0.0
+        for path, source, _ in corpus:
+            start = time.perf_counter()
+            oneliner.convert_code_string(source, path, configs)
+            elapsed = time.perf_counter() - start
+            file_timings[path] = min(file_timings[path], elapsed)
+            total += elapsed
+        total_timings.append(total)
+
+    best = min(total_timings)
+    print(f"{len(corpus) / best:.1f} files/s, {statements / best:.1f} statements/s")
+    print("slowest files:")
+    slowest = sorted(file_timings.items(), key=lambda item: item[1], reverse=True)
+    for path, timing in slowest[: args.slowest]:
+        print(f"  {timing:.6f}s  {path}")
+    return {f"stdlib[{len(corpus)} files, {statements} statements]": total_timings}
@@ -0,0 +1,109 @@
+import argparse
+import json
+import subprocess
+import sys
+
+import oneliner
+from oneliner.config import target_versions
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--python",
+        nargs="+",
+        default=[sys.executable],
+        help="The interpreters running the converted scripts "
+        "(default: the running interpreter)",
+    )
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=300_000,
+        help="The number of loop iterations of each run (default: 300000)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+
+
+scripts = {
+    # a while loop in a function
+    "while": (
+        "def count(n):\n"
+        "    i = 0\n"
+        "    total = 0\n"
+        "    while i < n:\n"
+        "        total = total + i\n"
+        "        i = i + 1\n"
+        "count({iterations})\n"
+    ),
+    # short inner loops, a comprehension for each outer iteration
+    "nested_for": (
+        "def table(n):\n"
+        "    total = 0\n"
+        "    for i in range(n):\n"
+        "        row = i * 3\n"
+        "        for j in range(3):\n"
+        "            total = total + row + j\n"
+        "table({iterations} // 3)\n"
+    ),
+}
+
+# run in the measured interpreter, the script is read from stdin
+_timer = (
+    "import json, sys, time\n"
+    "code = compile(sys.stdin.read(), '<script>', 'exec')\n"
+    "timings = []\n"
+    "for _ in range({repeat}):\n"
+    "    start = time.perf_counter()\n"
+    "    exec(code, {{}})\n"
+    "    timings.append(time.perf_counter() - start)\n"
+    "print(json.dumps(timings))\n"
+)
+
+
+def run_script(python: str, script: str, repeat: int) -> list[float]:
+    proc = subprocess.run(
+        [python, "-c", _timer.format(repeat=repeat)],
+        input=script,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def get_version(python: str) -> str:
+    proc = subprocess.run(
+        [python, "-c", "import sys; print('%d.%d' % sys.version_info[:2])"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return proc.stdout.strip()
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    """
+    Run the scripts converted for each target version in each interpreter,
+    the target matching the interpreter should be the fastest one
+    """
+    results = {}
+    for name, script in scripts.items():
+        script = script.format(iterations=args.iterations)
+        converted = {
+            target: oneliner.convert_code_string(
+                script,
+                configs=oneliner.Configs(target_version=target, unparser="oneliner"),
+            )
+            for target in target_versions
+        }
+        for python in args.python:
+            version = get_version(python)
+            for target, code in converted.items():
+                results[f"{name} target={target} on {version}"] = run_script(
+                    python, code, args.repeat
+                )
+            results[f"{name} original on {version}"] = run_script(
+                python, script, args.repeat
+            )
+    return results
@@ -0,0 +1,73 @@
+import argparse
+import concurrent.futures
+import itertools
+import sys
+
+import oneliner
+from oneliner.bench import measure
+
+# each thread converts with one of these configs,
+# so the output shows if the configs of the threads are mixed up
+config_variants = [
+    dict(zip(("expr_wrapper", "if_style"), values))
+    for values in itertools.product(
+        ["list", "chain_call"], ["if_expr", "short_circuit"]
+    )
+]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="The numbers of threads to compare (default: 1 2 4 8)",
+    )
+    parser.add_argument(
+        "-n",
+        "--conversions",
+        type=int,
+        default=64,
+        help="The number of conversions of each round (default: 64)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+
+
+def generate_script(functions: int = 50) -> str:
+    return "".join(
+        f"def f{i}(n):\n"
+        f"    total = 0\n"
+        f"    for x in range(n):\n"
+        f"        if x % {i + 2}:\n"
+        f"            total += x\n"
+        f"        else:\n"
+        f"            break\n"
+        f"    return total\n"
+        for i in range(functions)
+    )
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    script = generate_script()
+    configs = [oneliner.Configs(**variant) for variant in config_variants]
+    expected = [oneliner.convert_code_string(script, configs=cfg) for cfg in configs]
+
+    def convert(index: int):
+        cfg_index = index % len(configs)
+        result = oneliner.convert_code_string(script, configs=configs[cfg_index])
+        if result != expected[cfg_index]:
+            raise RuntimeError("Concurrent conversions produced a different output")
+
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL enabled: {gil_enabled}")
+
+    results = {}
+    for threads in args.threads:
+        with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+            results[f"threads[{threads}] x{args.conversions}"] = measure(
+                lambda: list(executor.map(convert, range(args.conversions))),
+                args.repeat,
+            )
+    return results
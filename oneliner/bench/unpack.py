@@ -0,0 +1,59 @@
+import argparse
+
+import oneliner
+from oneliner.bench import measure
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=300_000,
+        help="The number of loop iterations of each run (default: 300000)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+
+
+scripts = {
+    # destructuring at the start of a loop body
+    "loop_unpack": (
+        "def total(pairs):\n"
+        "    result = 0\n"
+        "    for pair in pairs:\n"
+        "        (key, value), weight = pair, 2\n"
+        "        result = result + key * weight + value\n"
+        "    return result\n"
+        "total([(i, i) for i in range({iterations})])\n"
+    ),
+    # starred destructuring at the start of a loop body
+    "loop_star_unpack": (
+        "def heads(rows):\n"
+        "    result = 0\n"
+        "    for row in rows:\n"
+        "        head, *tail = row\n"
+        "        result = result + head + len(tail)\n"
+        "    return result\n"
+        "heads([(i, i, i) for i in range({iterations})])\n"
+    ),
+}
+
+
+def run(args: argparse.Namespace) -> dict[str, list[float]]:
+    configs = oneliner.Configs(unparser="oneliner")
+    results = {}
+    for name, script in scripts.items():
+        script = script.format(iterations=args.iterations)
+        converted = compile(
+            oneliner.convert_code_string(script, configs=configs),
+            "<converted>",
+            "exec",
+        )
+        original = compile(script, "<original>", "exec")
+        results[f"{name}[{args.iterations}] converted"] = measure(
+            lambda: exec(converted, {}), args.repeat
+        )
+        results[f"{name}[{args.iterations}] original"] = measure(
+            lambda: exec(original, {}), args.repeat
+        )
+    return results
@@ -0,0 +1,311 @@
+"""
+Bundle the modules of a package into one oneliner expression.
+
+Every module is converted separately and embedded as a string.
+The bundle installs a finder in `sys.meta_path` that serves the bundled
+modules from the embedded strings, so a bundled module runs when it is
+imported, as in the unbundled package, and importing it doesn't look up
+the file system. Then the main module runs, if there is one.
+
+Usage: python -m oneliner bundle pkg/ -o tool.py
+"""
+
+import argparse
+import os
+from ast import *
+
+import oneliner
+import oneliner.utils as utils
+from oneliner.config import Configs, parse_config_args
+
+__all__ = ["BundledModule", "find_modules", "bundle_package"]
+
+
+class BundledModule:
+    name: str
+    filename: str  # relative to the directory that contains the package
+    source: str
+    is_package: bool
+
+    def __init__(self, name: str, filename: str, source: str, is_package: bool):
+        self.name = name
+        self.filename = filename
+        self.source = source
+        self.is_package = is_package
+
+    @property
+    def package(self) -> str:
+        if self.is_package:
+            return self.name
+        return self.name.rpartition(".")[0]
+
+
+def find_modules(path: str) -> dict[str, BundledModule]:
+    path = os.path.abspath(path)
+    if not os.path.isfile(os.path.join(path, "__init__.py")):
+        raise ValueError(f"'{path}' is not a package")
+    base_dir = os.path.dirname(path)
+
+    modules: dict[str, BundledModule] = {}
+    for dirpath, dirnames, filenames in os.walk(path):
+        if "__init__.py" not in filenames:
+            # not a package
+            dirnames.clear()
+            continue
+        dirnames.sort()
+        package = os.path.relpath(dirpath, base_dir).replace(os.sep, ".")
+        for filename in sorted(filenames):
+            module_name, ext = os.path.splitext(filename)
+            if ext != ".py" or not module_name.isidentifier():
+                continue
+            is_package = module_name == "__init__"
+            name = package if is_package else f"{package}.{module_name}"
+            full_filename = os.path.join(dirpath, filename)
+            with open(full_filename, encoding="utf8") as f:
+                source = f.read()
+            modules[name] = BundledModule(
+                name, os.path.relpath(full_filename, base_dir), source, is_package
+            )
+    return modules
+
+
+def _call(func: expr, args: list[expr], keywords: list[keyword] | None = None) -> Call:
+    return Call(func=func, args=args, keywords=[] if keywords is None else keywords)
+
+
+def _method(value: expr, method: str, args: list[expr]) -> Call:
+    return _call(Attribute(value=value, attr=method, ctx=Load()), args)
+
+
+def _import(name: str) -> Call:
+    return _call(Name(id="__import__", ctx=Load()), [Constant(value=name)])
+
+
+def _run_code(code: expr, filename: expr, globals_expr: expr) -> Call:
+    # eval(compile(code, filename, "eval"), globals_expr)
+    return _call(
+        Name(id="eval", ctx=Load()),
+        [
+            _call(
+                Name(id="compile", ctx=Load()),
+                [code, filename, Constant(value="eval")],
+            ),
+            globals_expr,
+        ],
+    )
+
+
+def _lambda(args: list[str], body: expr, defaults: list[expr] | None = None) -> Lambda:
+    return Lambda(
+        args=arguments(
+            posonlyargs=[],
+            args=[arg(arg=name) for name in args],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[] if defaults is None else defaults,
+        ),
+        body=body,
+    )
+
+
+def _finder(sources: dict[str, tuple[str, bool, str]]) -> Call:
+    """
+    The finder (and loader) of the bundled modules.
+    `sources` maps the module names to their filenames,
+    whether they are packages, and their converted code.
+    """
+    self_expr = Name(id="self", ctx=Load())
+    name_expr = Name(id="name", ctx=Load())
+    sources_expr = Attribute(value=self_expr, attr="sources", ctx=Load())
+    source_of = lambda name: Subscript(value=sources_expr, slice=name, ctx=Load())
+    module_expr = Name(id="module", ctx=Load())
+    module_dict = Attribute(value=module_expr, attr="__dict__", ctx=Load())
+    module_source = source_of(Attribute(value=module_expr, attr="__name__", ctx=Load()))
+
+    # the names of the functions are the ones of the finder and loader protocols
+    find_spec = _lambda(
+        ["self", "name", "path", "target"],
+        IfExp(
+            test=Compare(left=name_expr, ops=[In()], comparators=[sources_expr]),
+            # `__path__` of a package is empty,
+            # submodules that are not bundled won't be found
+            body=_call(
+                Attribute(value=self_expr, attr="module_spec", ctx=Load()),
+                [name_expr, self_expr],
+                [
+                    keyword(
+                        arg="origin",
+                        value=Subscript(
+                            value=source_of(name_expr),
+                            slice=Constant(value=0),
+                            ctx=Load(),
+                        ),
+                    ),
+                    keyword(
+                        arg="is_package",
+                        value=Subscript(
+                            value=source_of(name_expr),
+                            slice=Constant(value=1),
+                            ctx=Load(),
+                        ),
+                    ),
+                ],
+            ),
+            orelse=Constant(value=None),
+        ),
+        defaults=[Constant(value=None), Constant(value=None)],
+    )
+    exec_module = _lambda(
+        ["self", "module"],
+        List(
+            elts=[
+                _method(
+                    module_dict,
+                    "__setitem__",
+                    [
+                        Constant(value="__file__"),
+                        Subscript(
+                            value=module_source, slice=Constant(value=0), ctx=Load()
+                        ),
+                    ],
+                ),
+                _run_code(
+                    Subscript(value=module_source, slice=Constant(value=2), ctx=Load()),
+                    Attribute(value=module_expr, attr="__file__", ctx=Load()),
+                    module_dict,
+                ),
+            ],
+            ctx=Load(),
+        ),
+    )
+    class_dict = {
+        "sources": Dict(
+            keys=[Constant(value=name) for name in sources],
+            values=[
+                Tuple(elts=[Constant(value=value) for value in source], ctx=Load())
+                for source in sources.values()
+            ],
+        ),
+        "module_spec": Attribute(
+            value=Attribute(
+                value=_import("importlib.machinery"), attr="machinery", ctx=Load()
+            ),
+            attr="ModuleSpec",
+            ctx=Load(),
+        ),
+        "find_spec": find_spec,
+        # the default module creation
+        "create_module": _lambda(["self", "spec"], Constant(value=None)),
+        "exec_module": exec_module,
+    }
+    finder_type = _call(
+        Name(id="type", ctx=Load()),
+        [
+            Constant(value="OnelinerBundleFinder"),
+            Tuple(elts=[], ctx=Load()),
+            Dict(
+                keys=[Constant(value=key) for key in class_dict],
+                values=list(class_dict.values()),
+            ),
+        ],
+    )
+    return _call(finder_type, [])
+
+
+def bundle_package(
+    path: str, configs: Configs | None = None, main_module: str | None = None
+) -> str:
+    """
+    Bundle the package at `path`.
+    The module `main_module` (`<package>.__main__` by default, if exists)
+    runs in the namespace of the bundle instead of being importable.
+    """
+    if configs is None:
+        configs = Configs()
+    # the whole bundle is compressed, not each module
+    module_configs = Configs(**{**configs.to_dict(), "output": "plain"})
+
+    modules = find_modules(path)
+    root_package = min(modules, key=len)
+    if main_module is None:
+        if f"{root_package}.__main__" in modules:
+            main_module = f"{root_package}.__main__"
+    elif main_module not in modules:
+        raise ValueError(f"Module '{main_module}' is not found in the package")
+
+    sources: dict[str, tuple[str, bool, str]] = {}
+    for name, module in modules.items():
+        if name == main_module:
+            continue
+        code = oneliner.convert_code_string(
+            module.source, module.filename, module_configs
+        )
+        sources[name] = (module.filename, module.is_package, code)
+
+    # sys.meta_path.insert(0, finder)
+    body: list[expr] = [
+        _method(
+            Attribute(value=_import("sys"), attr="meta_path", ctx=Load()),
+            "insert",
+            [Constant(value=0), _finder(sources)],
+        )
+    ]
+
+    if main_module is not None:
+        module = modules[main_module]
+        globals_expr = _call(Name(id="globals", ctx=Load()), [])
+        body.append(
+            _method(
+                globals_expr,
+                "__setitem__",
+                [Constant(value="__package__"), Constant(value=module.package)],
+            )
+        )
+        code = oneliner.convert_code_string(
+            module.source, module.filename, module_configs
+        )
+        body.append(
+            _run_code(
+                Constant(value=code), Constant(value=module.filename), globals_expr
+            )
+        )
+
+    bundled = utils.unparse_expr(utils.get_expr_wrapper(configs)(body), configs)
+    if configs.output == "compressed":
+        from oneliner.compress import compress_output
+
+        return compress_output(bundled, configs)
+    return bundled
+
+
+def cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oneliner bundle",
+        description="Bundle a package into one oneliner expression.",
+    )
+    parser.add_argument("package_path", type=str, help="The path of the package")
+    parser.add_argument(
+        "-C", action="append", type=str, help="Set configs of oneliner convertion"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="The output filename. If this argument is not specified, "
+        "Oneliner-Py will print the result to the screen.",
+    )
+    parser.add_argument(
+        "--main",
+        type=str,
+        help="The module to run as the main script, "
+        "default to '<package>.__main__' if exists",
+    )
+    args = parser.parse_args(argv)
+
+    bundled = bundle_package(args.package_path, parse_config_args(args.C), args.main)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf8") as outfile:
+            outfile.write(bundled)
+    else:
+        print(bundled)
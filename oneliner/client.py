@@ -0,0 +1,124 @@
+"""
+The client of the conversion server (`python -m oneliner serve --socket PATH`).
+
+Usage: python -m oneliner client [input file] -o [output file] --socket PATH
+
+It works like `python -m oneliner`, but the conversion is done by the server.
+The socket path can also be set by the environment variable `ONELINER_SOCKET`.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import sys
+import typing
+
+__all__ = ["ConversionClient", "ConversionError"]
+
+
+class ConversionError(RuntimeError):
+    error_type: str
+
+    def __init__(self, error: dict[str, typing.Any]):
+        super().__init__(f"{error['type']}: {error['message']}")
+        self.error_type = error["type"]
+        self.error = error
+
+
+class ConversionClient:
+    def __init__(self, socket_path: str):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+        self.rfile = self.socket.makefile("rb")
+        self.request_ids = itertools.count()
+
+    def convert(
+        self,
+        source: str,
+        configs: dict[str, typing.Any] | None = None,
+        filename: str = "<string>",
+    ) -> str:
+        request_id = next(self.request_ids)
+        request = {
+            "id": request_id,
+            "source": source,
+            "filename": filename,
+            "configs": {} if configs is None else configs,
+        }
+        self.socket.sendall(json.dumps(request).encode("utf8") + b"\n")
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("The server closed the connection")
+        response = json.loads(line)
+        assert response["id"] == request_id
+        if not response["ok"]:
+            raise ConversionError(response["error"])
+        return response["output"]
+
+    def close(self):
+        self.rfile.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oneliner client",
+        description="Convert python scripts by the conversion server.",
+    )
+    parser.add_argument(
+        "-C", action="append", type=str, help="Set configs of oneliner convertion"
+    )
+    parser.add_argument(
+        "input_filename",
+        type=str,
+        help="The filename of the python script to be converted",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="The output filename. If this argument is not specified, "
+        "Oneliner-Py will print the result to the screen.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=os.environ.get("ONELINER_SOCKET"),
+        help="The path of the Unix socket of the server",
+    )
+    args = parser.parse_args(argv)
+    if args.socket is None:
+        parser.error("the socket path is required (--socket or ONELINER_SOCKET)")
+
+    configs: dict[str, str] = {}
+    for input_config in args.C or []:
+        config_name, sep, config_value = input_config.partition("=")
+        if not sep:
+            parser.error(
+                "Invalid syntax of -C parameter, expected -C<config_name>=<config_value>"
+            )
+        configs[config_name] = config_value
+
+    with open(args.input_filename, "r", encoding="utf8") as infile:
+        script = infile.read()
+
+    with ConversionClient(args.socket) as client:
+        try:
+            converted = client.convert(script, configs, args.input_filename)
+        except ConversionError as err:
+            print(err, file=sys.stderr)
+            sys.exit(1)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf8") as outfile:
+            outfile.write(converted)
+    else:
+        print(converted)
@@ -0,0 +1,83 @@
+"""
+Compressed output, for the transports with limited sizes.
+
+With `-Coutput=compressed`, the converted script is compressed with
+`-Ccompression` (zlib or lzma) and encoded with base85, and the output is
+an expression which decompresses, compiles and runs it in its globals.
+
+The compiled code object is cached by the hash of the script (and the
+`sys.implementation.cache_tag` of the interpreter) with `marshal`,
+so the next runs skip the decompression and the compilation.
+The cache is in the directory `$ONELINER_CACHE`, or `~/.cache/oneliner`.
+Nothing is cached if the directory (or its parent) is not writable,
+or if writing the cache fails.
+The cache is only used if the directory and the cached files are owned
+by the user and not writable by the group or the others,
+and only on the platforms with `os.getuid`.
+"""
+
+import base64
+import hashlib
+import lzma
+import zlib
+
+from oneliner.config import Configs
+
+__all__ = ["compress_output"]
+
+_codecs = {
+    "zlib": lambda data: zlib.compress(data, 9),
+    "lzma": lambda data: lzma.compress(data, preset=9 | lzma.PRESET_EXTREME),
+}
+
+# the cache is only used if its directory and the cached file are owned by
+# the user and not writable by the others, who could inject code in it.
+# A cache file is written to a new temporary file first,
+# so a running script never reads a partial file,
+# and a failed write (like a full disk) only skips caching
+_store = (
+    "try:\n"
+    " with os.fdopen(os.open(tmp,os.O_WRONLY|os.O_CREAT|os.O_EXCL,0o600),'wb')"
+    "as file:file.write(data)\n"
+    " os.replace(tmp,path)\n"
+    "except OSError:\n"
+    " try:os.remove(tmp)\n"
+    " except OSError:pass"
+)
+_loader = (
+    "(lambda os,sys,marshal:"
+    "(lambda trusted:"
+    "(lambda cache:"
+    "(lambda path,usable:"
+    "(lambda cached:exec(cached if cached is not None else"
+    "(lambda code:[code,usable and "
+    f"exec({_store!r},dict(os=os,tmp=path+'.%d'%os.getpid(),path=path,"
+    "data=marshal.dumps(code)))][0])"
+    "(compile(__import__({codec!r}).decompress("
+    "__import__('base64').b85decode({data!r})),'<oneliner>','exec')),"
+    "globals()))"
+    "((lambda file:[marshal.loads(file.read())"
+    "if trusted(os.fstat(file.fileno()))else None,file.close()][0])"
+    "(open(path,'rb'))if usable and os.path.isfile(path)else None))"
+    "(os.path.join(cache,'%s-%s'%({digest!r},sys.implementation.cache_tag)),"
+    "hasattr(os,'getuid')and os.path.isdir(cache)and os.access(cache,os.W_OK)"
+    "and trusted(os.stat(cache))))"
+    "((lambda cache:[os.path.isdir(cache)"
+    "or os.access(os.path.dirname(cache),os.W_OK)"
+    "and os.makedirs(cache,0o700,exist_ok=True),cache][1])"
+    "(os.environ.get('ONELINER_CACHE')"
+    "or os.path.join(os.path.expanduser('~'),'.cache','oneliner'))))"
+    "(lambda st:st.st_uid==os.getuid()and not st.st_mode&0o022))"
+    "(__import__('os'),__import__('sys'),__import__('marshal'))"
+)
+
+
+def compress_output(code: str, configs: Configs) -> str:
+    """Get the compressed expression running the converted `code`"""
+    encoded = code.encode("utf8")
+    data = base64.b85encode(_codecs[configs.compression](encoded)).decode("ascii")
+    return _loader.format(
+        codec=configs.compression,
+        data=data,
+        digest=hashlib.sha256(encoded).hexdigest()[:32],
+    )
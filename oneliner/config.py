@@ -1,18 +1,26 @@
+import sys
 from typing import Any
 
+target_versions = ["3.10", "3.11", "3.12", "3.13", "3.14"]
+
+
+def _running_version() -> str:
+    version = "{}.{}".format(*sys.version_info[:2])
+    return version if version in target_versions else target_versions[-1]
+
 
 class Cfg:
     tp: list | type
     default: Any
-    value: Any
     docs: str
     name: str
+    minimum: Any
 
-    def __init__(self, tp, default, docs=""):
+    def __init__(self, tp, default, docs="", minimum=None):
         self.tp = tp
         self.default = default
         self.docs = docs
-        self.value = default
+        self.minimum = minimum
 
     def __set_name__(self, owner, name):
         self.name = name
@@ -26,12 +34,27 @@ class Cfg:
                     f"got '{value}', expected {self.tp}"
                 )
         else:
+            if isinstance(value, str) and self.tp is not str:
+                # values from the command line are strings
+                try:
+                    value = self.tp(value)
+                except ValueError:
+                    pass
             if not isinstance(value, self.tp):
                 raise ValueError(f"Invalid value of config '{self.name}'")
-        self.value = value
+            if self.minimum is not None and value < self.minimum:
+                raise ValueError(
+                    f"Invalid value of config '{self.name}', "
+                    f"got {value}, expected at least {self.minimum}"
+                )
+        # the value is stored on the instance, so each `Configs`
+        # (and each conversion using it) has its own configs
+        instance.__dict__[self.name] = value
 
     def __get__(self, instance, owner=None):
-        return self.value
+        if instance is None:
+            return self
+        return instance.__dict__.get(self.name, self.default)
 
 
 class Configs:
@@ -50,4 +73,71 @@ class Configs:
         "if_expr",
         "Choose the style of the convertion of 'if' statements",
     )
+    max_depth = Cfg(
+        int,
+        32,
+        "The nesting budget of a block, longer call chains are split "
+        "and deeper interrupt guards are flattened",
+        minimum=2,
+    )
+    target_version = Cfg(
+        target_versions,
+        _running_version(),
+        "The python version running the converted script, "
+        "the lowerings are chosen for it (default: the running version)",
+    )
+    output = Cfg(
+        ["plain", "compressed"],
+        "plain",
+        "Choose the form of the output, a compressed output decompresses "
+        "and runs the converted script (see oneliner.compress)",
+    )
+    compression = Cfg(
+        ["zlib", "lzma"],
+        "zlib",
+        "The compression of the compressed output",
+    )
     config_names = tuple(name for name in locals() if not name.startswith("__"))
+
+    def __init__(self, **configs: Any):
+        for config_name, config_value in configs.items():
+            if config_name not in self.config_names:
+                raise ValueError(f"Unknown config name '{config_name}'")
+            setattr(self, config_name, config_value)
+
+    @property
+    def target_version_info(self) -> tuple[int, int]:
+        major, minor = self.target_version.split(".")
+        return int(major), int(minor)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.config_names}
+
+
+def parse_config_args(config_args: list[str] | None) -> Configs:
+    """
+    Get the configs from the `-C<config_name>=<config_value>`
+    command line arguments
+    """
+    cfg = Configs()
+    if config_args is None:
+        return cfg
+
+    for input_config in config_args:
+        assert isinstance(input_config, str)
+
+        splited_input_config = input_config.split("=")
+
+        if len(splited_input_config) != 2:
+            raise TypeError(
+                "Invalid syntax of -C parameter, "
+                "expected -C<config_name>=<config_value>"
+            )
+
+        config_name, config_value = splited_input_config
+
+        if not hasattr(cfg, config_name):
+            raise ValueError(f"Unknown convig name '{config_name}'")
+
+        setattr(cfg, config_name, config_value)
+    return cfg
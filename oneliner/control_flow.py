@@ -0,0 +1,126 @@
+"""
+Control flow analysis of the statements of a block.
+
+The converted statements can't jump, so the statements after a possible
+"break", "continue" or "return" are guarded by a flow-control flag
+(see `_PendingCompoundStmt._iter_branch`).
+`simplify_block` rewrites a block so that fewer guards and flags are needed:
+
+- An "if" with a branch that always interrupts takes the statements after
+  it into its other branch, so they are selected by the "if" itself.
+- The statements after an "if" whose branches both interrupt are dropped,
+  since they never run. But a "yield" makes its function a generator
+  even if it never runs, so the statements containing one are kept.
+- A "continue" at the end of a loop body and a "return" (without value)
+  at the end of a function body do nothing, so they are replaced by "pass".
+
+Moving statements into a branch nests them deeper,
+so it stops at `max_depth` nested "if"s, and the guards are used again.
+"""
+
+from ast import *
+
+from oneliner.yields import has_yield
+
+__all__ = ["always_interrupts", "simplify_block"]
+
+_interrupt_types = (Break, Continue, Return)
+
+
+def always_interrupts(stmts: list[stmt]) -> dict[int, bool]:
+    """
+    Check if the "if"s nested in the statements (not in loops/functions)
+    always interrupt. Return a dict mapping the id of the "if"s to results.
+    """
+    ifs: list[If] = []
+    stack = [stmts]
+    while stack:
+        for node in stack.pop():
+            if isinstance(node, If):
+                ifs.append(node)
+                stack.append(node.body)
+                stack.append(node.orelse)
+
+    results: dict[int, bool] = {}
+
+    def block_interrupts(block: list[stmt]) -> bool:
+        # the statements before an interrupt run or interrupt earlier
+        return any(
+            isinstance(node, _interrupt_types) or results.get(id(node), False)
+            for node in block
+        )
+
+    # the inner "if"s are found after the outer ones
+    for node in reversed(ifs):
+        results[id(node)] = block_interrupts(node.body) and block_interrupts(
+            node.orelse
+        )
+    return results
+
+
+def _is_tail_noop(node: stmt, tail: type[stmt] | None) -> bool:
+    if tail is None or not isinstance(node, tail):
+        return False
+    return not isinstance(node, Return) or node.value is None
+
+
+def simplify_block(
+    stmts: list[stmt], tail: type[stmt] | None, max_depth: int
+) -> list[stmt]:
+    """
+    Simplify the control flow of a block, the nodes are not modified.
+    `tail` is the interrupt which does nothing at the end of the block,
+    `Continue` for loop bodies, `Return` for function bodies, otherwise None.
+    """
+    interrupts = always_interrupts(stmts)
+    block_interrupts = lambda block: any(
+        isinstance(node, _interrupt_types) or interrupts.get(id(node), False)
+        for node in block
+    )
+
+    result: list[stmt] = []
+    # (statements, output list, tail of the block, nesting depth of "if"s)
+    stack: list[tuple[list[stmt], list[stmt], type[stmt] | None, int]] = [
+        (stmts, result, tail, 0)
+    ]
+    while stack:
+        block, out, block_tail, depth = stack.pop()
+        for index, node in enumerate(block):
+            is_last = index == len(block) - 1
+            if isinstance(node, _interrupt_types):
+                if is_last and _is_tail_noop(node, block_tail):
+                    out.append(copy_location(Pass(), node))
+                else:
+                    out.append(node)
+                if not has_yield(block[index + 1 :]):
+                    # the statements after it never run
+                    break
+                continue
+
+            if not isinstance(node, If):
+                out.append(node)
+                continue
+
+            rest = block[index + 1 :]
+            body, orelse = node.body, node.orelse
+            if rest and interrupts[id(node)]:
+                if not has_yield(rest):
+                    # both branches interrupt, the rest never runs
+                    rest = []
+            elif rest and depth < max_depth:
+                if block_interrupts(body) and not block_interrupts(orelse):
+                    orelse = orelse + rest
+                    rest = []
+                elif block_interrupts(orelse) and not block_interrupts(body):
+                    body = body + rest
+                    rest = []
+
+            new_if = copy_location(If(test=node.test, body=[], orelse=[]), node)
+            out.append(new_if)
+            # the branches are the end of the block if nothing follows the "if"
+            branch_tail = None if rest else block_tail
+            stack.append((body, new_if.body, branch_tail, depth + 1))
+            stack.append((orelse, new_if.orelse, branch_tail, depth + 1))
+            if not rest:
+                break
+    return result
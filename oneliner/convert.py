@@ -3,7 +3,7 @@ import symtable
 
 import oneliner.utils as utils
 from oneliner.config import Configs
-from oneliner.namespaces import Namespace, generate_nsp
+from oneliner.namespaces import Namespace, NamespaceGlobal, generate_nsp
 from oneliner.pending_nodes import *
 
 ast2pending: dict[type[ast.AST], type[PendingNode]] = {
@@ -28,11 +28,20 @@ ast2pending: dict[type[ast.AST], type[PendingNode]] = {
 }
 
 
-def convert(
-    ast_root: ast.Module, symtable_root: symtable.SymbolTable, configs: Configs
-) -> ast.expr:
+def analyze(symtable_root: symtable.SymbolTable, configs: Configs) -> NamespaceGlobal:
+    """Generate the namespaces of the module"""
+    utils.seed_unique_id("namespace")
+    return generate_nsp(symtable_root, configs)
+
+
+def convert_stmt(index: int, node: ast.stmt, nsp_global: NamespaceGlobal):
+    """Convert the top-level statement at `index` of the module body"""
+    utils.seed_unique_id("stmt", index)
+    return convert_node(node, nsp_global)
+
+
+def convert_node(node: ast.AST, nsp_global: NamespaceGlobal) -> list[ast.expr]:
     pending_node_stack: list[PendingNode] = []
-    nsp_global = generate_nsp(symtable_root, configs)
     nsp_stack: list[Namespace] = [nsp_global]
 
     def pending_top() -> PendingNode:
@@ -52,7 +61,7 @@ def convert(
                 + f"Unable to convert node '{type(node).__name__}'"
             ) from err
 
-    tobe_converted: None | ast.AST = ast_root
+    tobe_converted: None | ast.AST = node
     result_nodes = None
     while True:
         assert tobe_converted is not None  # to make type checker happy
@@ -75,7 +84,20 @@ def convert(
                 if complete_node.has_internal_namespace:
                     nsp_stack.pop()
                 result_nodes = complete_node.get_result()
+                if isinstance(complete_node.node, ast.stmt):
+                    # the converted nodes take the location of the statement,
+                    # which is used by source maps
+                    for result_node in result_nodes:
+                        if not hasattr(result_node, "lineno"):
+                            ast.copy_location(result_node, complete_node.node)
 
                 if len(pending_node_stack) == 0:
                     assert len(nsp_stack) == 1
-                    return nsp_global.expr_wraper(result_nodes)
+                    return result_nodes
+
+
+def convert(
+    ast_root: ast.Module, symtable_root: symtable.SymbolTable, configs: Configs
+) -> ast.expr:
+    nsp_global = analyze(symtable_root, configs)
+    return nsp_global.module_wraper(convert_node(ast_root, nsp_global))
@@ -1,3 +1,4 @@
+import itertools
 import typing
 from ast import *
 
@@ -124,11 +125,70 @@ class PendingComp(PendingExprGeneric[_CompNode]):
             raise RuntimeError("Unknown comprehension target")
 
 
+# nodes that never contain anything to be transformed
+_leaf_types = {Constant, Load, Store, Del}
+
+
+def _is_leaf(node: typing.Any) -> bool:
+    node_type = type(node)
+    if node_type is UnaryOp:
+        # negative numbers in literals
+        return type(node.operand) is Constant
+    return node_type in _leaf_types or not isinstance(node, AST)
+
+
+def _get_child_nodes(node: AST) -> list[AST]:
+    if type(node) in (List, Tuple, Set):
+        # fast path for literals
+        return list(itertools.filterfalse(_is_leaf, node.elts))  # type: ignore
+    children: list[AST] = []
+    for field_name in node._fields:
+        field: typing.Any = getattr(node, field_name, None)
+        if isinstance(field, list):
+            children.extend(itertools.filterfalse(_is_leaf, field))
+        elif not _is_leaf(field):
+            children.append(field)
+    return children
+
+
 class ExpressionTransformer:
     def __init__(self, nsp: Namespace):
         self.pending_stack: list[PendingExprGeneric] = []
         self.nsp = nsp
 
+    def needs_transform(self, node: AST) -> bool:
+        if isinstance(node, Name):
+            return not isinstance(node.ctx, Store) and not self.nsp.is_plain_name(
+                node.id
+            )
+        elif isinstance(node, NamedExpr):
+            return not self.nsp.is_plain_name(node.target.id)
+        return False
+
+    def find_dirty_nodes(self, root: expr) -> set[int]:
+        """
+        Get the ids of the nodes whose subtree contains a node to be transformed.
+        Other subtrees are reused without being copied.
+        """
+        dirty: set[int] = set()
+        # post-order traversal, leaves are not visited
+        stack: list[tuple[AST, list[AST] | None]] = [(root, None)]
+        while stack:
+            node, children = stack.pop()
+            if children is None:
+                children = _get_child_nodes(node)
+                if not children:
+                    if self.needs_transform(node):
+                        dirty.add(id(node))
+                    continue
+                stack.append((node, children))
+                stack.extend((child, None) for child in children)
+            elif self.needs_transform(node) or any(
+                id(child) in dirty for child in children
+            ):
+                dirty.add(id(node))
+        return dirty
+
     def get_pending(self, node: expr) -> PendingExprGeneric:
         if isinstance(node, NamedExpr):
             return PendingNamedExpr(node, self.nsp)
@@ -140,12 +200,20 @@ class ExpressionTransformer:
             return PendingExpr(node)
 
     def cvt(self, node: expr):
+        dirty = self.find_dirty_nodes(node)
+        if id(node) not in dirty:
+            return node
+
         unconverted: expr | None = node
         converted = None
         while True:
             assert unconverted is not None
-            pending_node = self.get_pending(unconverted)
-            self.pending_stack.append(pending_node)
+            if id(unconverted) in dirty:
+                pending_node = self.get_pending(unconverted)
+                self.pending_stack.append(pending_node)
+            else:
+                # reuse the subtree as it is
+                converted = unconverted
             unconverted = None
             while unconverted is None:
                 try:
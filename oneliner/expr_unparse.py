@@ -4,6 +4,13 @@ import typing
 import warnings
 from ast import *
 
+from oneliner.string_literal import (
+    choose_quote_mark,
+    escape_str,
+    quote_mark_t,
+    str_literal,
+)
+
 operator_map: dict[type[operator], str] = {
     Add: "+",
     BitAnd: "&",
@@ -208,34 +215,25 @@ def unparse_Name(node: Name) -> unparse_gen_t:
     yield
 
 
-def get_unescaped_str(string: str, qm: str) -> str:
-    out = []
-    for i in string:
-        if i == qm:
-            out.append(f"\\{qm}")
-        elif ord(i) > 255:
-            out.append(i)
-        else:
-            out.append(ascii(i)[1:-1])
-    return "".join(out)
-
-
-def unparse_Constant(node: Constant, qm: typing.Literal["'", '"']) -> unparse_gen_t:
+def unparse_Constant(node: Constant, qm: quote_mark_t | None) -> unparse_gen_t:
+    """
+    qm is None if the constant is not inside of a f-string,
+    and the quote mark of a str is free to choose
+    """
     if node.value is ...:
         return "..."
     if isinstance(node.value, str):
-        value = get_unescaped_str(node.value, qm)
-        return f"{qm}{value}{qm}"
+        return str_literal(node.value, qm)
     return repr(node.value)
     yield
 
 
-def _unparse_JoinedStr(node: JoinedStr, qm: typing.Literal["'", '"']) -> unparse_gen_t:
+def _unparse_JoinedStr(node: JoinedStr, qm: quote_mark_t) -> unparse_gen_t:
     contents = []
     for v in node.values:
         if isinstance(v, Constant):
             assert isinstance(v.value, str)
-            s = get_unescaped_str(v.value, qm)
+            s = escape_str(v.value, qm)
             s = s.replace("{", "{{").replace("}", "}}")
             contents.append(s)
         elif isinstance(v, FormattedValue):
@@ -243,7 +241,7 @@ def _unparse_JoinedStr(node: JoinedStr, qm: typing.Literal["'", '"']) -> unparse
     return "".join(contents)
 
 
-def unparse_JoinedStr(node: JoinedStr, qm: typing.Literal["'", '"']) -> unparse_gen_t:
+def unparse_JoinedStr(node: JoinedStr, qm: quote_mark_t) -> unparse_gen_t:
     contents = yield from _unparse_JoinedStr(node, qm)
     if sys.version_info < (3, 12) and "\\" in contents:  # pragma: no cover
         raise SyntaxError("Back slash is included in a f-string")
@@ -540,6 +538,97 @@ def unparse_Await(node: Await) -> unparse_gen_t:
     return f"await {value}"
 
 
+def _unparse_literal_constant(value: typing.Any, qm: quote_mark_t | None) -> str:
+    if type(value) is str:
+        return str_literal(value, qm)
+    if value is ...:
+        return "..."
+    return repr(value)
+
+
+def _unparse_literal_constants(
+    nodes: list[Constant], qm: quote_mark_t | None
+) -> list[str]:
+    values = [node.value for node in nodes]
+    value_types = set(map(type, values))
+    if str not in value_types and type(...) not in value_types:
+        return list(map(repr, values))
+    return [_unparse_literal_constant(value, qm) for value in values]
+
+
+def _get_literal_children(node: expr) -> list[expr] | None:
+    node_type = type(node)
+    if node_type is List or node_type is Tuple or node_type is Set:
+        return node.elts  # type: ignore
+    if node_type is Dict:
+        assert isinstance(node, Dict)
+        if any(key is None for key in node.keys):
+            return None
+        children: list[expr] = []
+        for key, value in zip(node.keys, node.values):
+            children.append(key)  # type: ignore
+            children.append(value)
+        return children
+    return None
+
+
+def _join_literal(node: expr, parts: list[str]) -> str:
+    node_type = type(node)
+    if node_type is List:
+        return f"[{','.join(parts)}]"
+    if node_type is Tuple:
+        if len(parts) == 1:
+            return f"({parts[0]},)"
+        return f"({','.join(parts)})"
+    if node_type is Set:
+        return f"{{{','.join(parts)}}}"
+    items = (f"{key}:{value}" for key, value in zip(parts[::2], parts[1::2]))
+    return f"{{{','.join(items)}}}"
+
+
+def unparse_literal(node: expr, qm: quote_mark_t | None) -> str | None:
+    """
+    Unparse a list/tuple/set/dict that only contains constants
+    (or unary operations on constants, or other such containers) in bulk.
+    Return None if the node is not such a container.
+    The result is the same as the one of the generic unparser.
+    """
+    children = _get_literal_children(node)
+    if children is None:
+        return None
+    # the number of unparsed parts is the index of the next child
+    stack: list[tuple[expr, list[expr], list[str]]] = [(node, children, [])]
+    while True:
+        container, children, parts = stack[-1]
+        if not parts and all(type(child) is Constant for child in children):
+            # flat container, the most common case of lookup tables
+            parts.extend(_unparse_literal_constants(children, qm))  # type: ignore
+        while len(parts) < len(children):
+            child = children[len(parts)]
+            if isinstance(child, Constant):
+                parts.append(_unparse_literal_constant(child.value, qm))
+            elif isinstance(child, UnaryOp) and isinstance(child.operand, Constant):
+                operand = _unparse_literal_constant(child.operand.value, qm)
+                parts.append(f"{unaryop_map[type(child.op)]}{operand}")
+            else:
+                grandchildren = _get_literal_children(child)
+                if grandchildren is None:
+                    return None
+                stack.append((child, grandchildren, []))
+                break
+        else:
+            stack.pop()
+            result = _join_literal(container, parts)
+            if not stack:
+                return result
+            stack[-1][2].append(result)
+
+
+def unparse_result(result: str) -> unparse_gen_t:
+    return result
+    yield
+
+
 class _Node:
     gen: unparse_gen_t
 
@@ -573,23 +662,52 @@ class _Node:
         Await: unparse_Await,
     }
 
-    def __init__(self, outer_precedence: prec_t, node: expr, outer_str_qm: str):
+    literal_gen_funcs = (unparse_List, unparse_Tuple, unparse_Set, unparse_Dict)
+
+    def __init__(
+        self, outer_precedence: prec_t, node: expr, outer_str_qm: quote_mark_t | None
+    ):
+        """
+        outer_str_qm is the quote mark of the f-string that the node is in,
+        or None if the node is not inside of a f-string.
+        """
         self.outer_precedence = outer_precedence
         self.node_precedence = get_node_precedence(node)
         gen_func = self.gen_map.get(type(node), unparse_generic)
 
-        if gen_func in [unparse_Constant, unparse_JoinedStr]:
-            if outer_str_qm == "'":
-                self.qm = '"'
-            elif outer_str_qm == '"':
-                self.qm = "'"
+        self.qm: quote_mark_t | None
+        if gen_func is unparse_Constant:
+            self.qm = self.get_inner_qm(outer_str_qm)
+            self.gen = gen_func(node, self.qm)
+        elif gen_func is unparse_JoinedStr:
+            assert isinstance(node, JoinedStr)
+            self.qm = self.get_inner_qm(outer_str_qm)
+            if self.qm is None:
+                literals = (
+                    str(v.value) for v in node.values if isinstance(v, Constant)
+                )
+                self.qm = choose_quote_mark("".join(literals))
             self.gen = gen_func(node, self.qm)
         elif gen_func is unparse_FormattedValue:
             self.qm = outer_str_qm
             self.gen = gen_func(node, self.qm)
         else:
             self.qm = outer_str_qm
-            self.gen = gen_func(node)
+            literal = None
+            if gen_func in self.literal_gen_funcs:
+                literal = unparse_literal(node, self.get_inner_qm(self.qm))
+            if literal is not None:
+                self.gen = unparse_result(literal)
+            else:
+                self.gen = gen_func(node)
+
+    @staticmethod
+    def get_inner_qm(outer_str_qm: quote_mark_t | None) -> quote_mark_t | None:
+        if outer_str_qm == "'":
+            return '"'
+        elif outer_str_qm == '"':
+            return "'"
+        return None
 
 
 """
@@ -610,9 +728,9 @@ they may have multiple slots with different slot precedence value.
 """
 
 
-def expr_unparse(node: expr) -> str:
+def expr_unparse(node: expr, outer_precedence: prec_t = PREC_EXPR_SLOT) -> str:
     stack: list[_Node] = []
-    stack.append(_Node(PREC_EXPR_SLOT, node, '"'))
+    stack.append(_Node(outer_precedence, node, None))
     converted: str | None = None
     while stack:
         try:
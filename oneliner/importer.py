@@ -0,0 +1,173 @@
+"""
+Convert modules to oneliners when they are imported.
+
+Modules are marked by a file suffix (e.g. `module.olpy`)
+or by a package allow-list:
+
+    import oneliner.importer
+
+    oneliner.importer.install(suffixes=[".olpy"], packages=["mypkg"])
+
+The compiled code of a converted module is cached in `__pycache__`
+like `.pyc` files. The name of the cache file contains a fingerprint of
+the version of Oneliner-Py and the configs, and the cache is invalidated
+when the mtime or size of the source changes.
+"""
+
+import hashlib
+import importlib.machinery
+import importlib.util
+import marshal
+import os
+import sys
+import typing
+
+from oneliner.config import Configs
+from oneliner.version import __version__
+
+__all__ = ["OnelinerLoader", "OnelinerFinder", "install", "uninstall"]
+
+
+def get_fingerprint(configs: Configs) -> str:
+    configs_items = sorted(configs.to_dict().items())
+    return hashlib.sha256(repr((__version__, configs_items)).encode()).hexdigest()[:16]
+
+
+class OnelinerLoader(importlib.machinery.SourceFileLoader):
+    configs: Configs
+    fingerprint: str
+
+    def __init__(self, fullname: str, path: str, configs: Configs):
+        super().__init__(fullname, path)
+        self.configs = configs
+        self.fingerprint = get_fingerprint(configs)
+
+    def get_cache_path(self, source_path: str) -> str:
+        # __pycache__/name.cpython-XY.oneliner-<fingerprint>.pyc
+        base, ext = os.path.splitext(importlib.util.cache_from_source(source_path))
+        return f"{base}.oneliner-{self.fingerprint}{ext}"
+
+    def get_cache_header(self, source_path: str) -> bytes:
+        stats = self.path_stats(source_path)
+        return b"".join(
+            [
+                importlib.util.MAGIC_NUMBER,
+                bytes.fromhex(self.fingerprint),
+                int(stats["mtime"]).to_bytes(8, "little", signed=True),
+                (stats["size"] & 0xFFFFFFFF).to_bytes(4, "little"),
+            ]
+        )
+
+    def source_to_code(self, data, path, *, _optimize=-1):  # type: ignore
+        from oneliner import convert_code_string
+
+        source = importlib.util.decode_source(data)
+        converted = convert_code_string(source, path, self.configs)
+        return compile(converted, path, "exec", dont_inherit=True, optimize=_optimize)
+
+    def get_code(self, fullname: str):
+        source_path = self.get_filename(fullname)
+        cache_path = self.get_cache_path(source_path)
+        header = self.get_cache_header(source_path)
+        try:
+            data = self.get_data(cache_path)
+        except OSError:
+            pass
+        else:
+            if data[: len(header)] == header:
+                return marshal.loads(data[len(header) :])
+
+        code = self.source_to_code(self.get_data(source_path), source_path)
+        if not sys.dont_write_bytecode:
+            try:
+                self.set_data(cache_path, header + marshal.dumps(code))
+            except NotImplementedError:  # pragma: no cover
+                pass
+        return code
+
+
+class OnelinerFinder:
+    """
+    A meta path finder of the modules to be converted.
+    """
+
+    suffixes: list[str]
+    packages: list[str]
+    configs: Configs
+
+    def __init__(
+        self,
+        suffixes: typing.Iterable[str] = (),
+        packages: typing.Iterable[str] = (),
+        configs: Configs | None = None,
+    ):
+        self.suffixes = list(suffixes)
+        self.packages = list(packages)
+        self.configs = Configs() if configs is None else configs
+
+    def is_allowed(self, fullname: str) -> bool:
+        for package in self.packages:
+            if fullname == package or fullname.startswith(f"{package}."):
+                return True
+        return False
+
+    def _spec_from_file(self, fullname: str, filename: str, is_package: bool):
+        loader = OnelinerLoader(fullname, filename, self.configs)
+        spec = importlib.util.spec_from_file_location(
+            fullname,
+            filename,
+            loader=loader,
+            submodule_search_locations=(
+                [os.path.dirname(filename)] if is_package else None
+            ),
+        )
+        assert spec is not None
+        spec.cached = loader.get_cache_path(filename)
+        return spec
+
+    def find_spec(self, fullname: str, path=None, target=None):
+        if self.is_allowed(fullname):
+            spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+            if spec is None or not isinstance(
+                spec.loader, importlib.machinery.SourceFileLoader
+            ):
+                return spec
+            assert spec.origin is not None
+            return self._spec_from_file(
+                fullname, spec.origin, spec.submodule_search_locations is not None
+            )
+
+        if not self.suffixes:
+            return None
+        tail_name = fullname.rpartition(".")[2]
+        for entry in sys.path if path is None else path:
+            entry = entry or os.getcwd()
+            for suffix in self.suffixes:
+                init_filename = os.path.join(entry, tail_name, f"__init__{suffix}")
+                if os.path.isfile(init_filename):
+                    return self._spec_from_file(fullname, init_filename, True)
+                filename = os.path.join(entry, f"{tail_name}{suffix}")
+                if os.path.isfile(filename):
+                    return self._spec_from_file(fullname, filename, False)
+        return None
+
+    def invalidate_caches(self):
+        pass
+
+
+def install(
+    suffixes: typing.Iterable[str] = (),
+    packages: typing.Iterable[str] = (),
+    configs: Configs | None = None,
+) -> OnelinerFinder:
+    """
+    Convert the modules with the file `suffixes`
+    and the modules in the `packages` when they are imported.
+    """
+    finder = OnelinerFinder(suffixes, packages, configs)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def uninstall(finder: OnelinerFinder):
+    sys.meta_path.remove(finder)
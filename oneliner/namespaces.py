@@ -1,3 +1,4 @@
+import collections
 import itertools
 import symtable
 import sys
@@ -27,6 +28,11 @@ class Namespace(typing.Generic[T]):
     loop_stack: list["oneliner.pending_nodes._PendingLoop"]
     comp_stack: list["oneliner.expr_transform.PendingComp"]
 
+    # `globals()` and `globals().__setitem__` are bound once
+    # per activation of the namespace, see `get_globals_bindings`
+    globals_expr: Name | None = None
+    globals_setitem_expr: Name | None = None
+
     def __init__(self, symt: T, stack: list["Namespace"]):
         self.loop_stack = []
         self.comp_stack = []
@@ -48,18 +54,89 @@ class Namespace(typing.Generic[T]):
         """
         raise NotImplementedError()  # pragma: no cover
 
+    def is_plain_name(self, name: str) -> bool:
+        """
+        Whether the name is loaded as a plain Name and assigned by a plain NamedExpr.
+        Expressions that only contain plain names need no transformation.
+        The result may be False for a plain name, but never True for others.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_globals_expr(self) -> expr:
+        """Get the expr of the dict `globals()`"""
+        if self.globals_expr is None:
+            self.globals_expr = Name(id=ol_name(OL_GLOBALS))
+        return self.globals_expr
+
+    def get_globals_setitem_expr(self) -> expr:
+        """Get the expr of the method `globals().__setitem__`"""
+        if self.globals_setitem_expr is None:
+            self.globals_setitem_expr = Name(id=ol_name(OL_GLOBALS_SETITEM))
+        return self.globals_setitem_expr
+
+    def get_globals_bindings(self) -> list[expr]:
+        """
+        Get the nodes binding the used globals exprs,
+        which should run at the start of the namespace
+        """
+        bindings: list[expr] = []
+        globals_dict: expr = Call(
+            func=Name(id="globals", ctx=Load()), args=[], keywords=[]
+        )
+        if self.globals_expr is not None:
+            bindings.append(NamedExpr(target=self.globals_expr, value=globals_dict))
+            globals_dict = self.globals_expr
+        if self.globals_setitem_expr is not None:
+            bindings.append(
+                NamedExpr(
+                    target=self.globals_setitem_expr,
+                    value=Attribute(value=globals_dict, attr="__setitem__", ctx=Load()),
+                )
+            )
+        return bindings
+
 
 class NamespaceGlobal(Namespace[symtable.SymbolTable]):
     use_itertools: bool = False
     use_importlib: bool = False
     use_preset_iter_wrapper: bool = False
+    use_preset_chain_runner: bool = False
+    # the flags above, a module uses the libraries and presets of its statements
+    usage_flags = (
+        "use_itertools",
+        "use_importlib",
+        "use_preset_iter_wrapper",
+        "use_preset_chain_runner",
+    )
+    # the line before the first converted line, when the statements are
+    # analyzed without the lines before them (see oneliner.stream)
+    line_offset: int = 0
+    # the statements run behind the guards of interrupts (see oneliner.stats)
+    guarded_stmt_cnt: int = 0
 
     configs: Configs
     expr_wraper: typing.Callable[[list[expr]], expr]
+    module_wraper: typing.Callable[[list[expr]], expr]
 
     def load_configs(self, configs: Configs):
         self.configs = configs
-        self.expr_wraper = utils.get_expr_wrapper(configs)
+        # the module body runs before the preset runner exists,
+        # so its chain creates its own runner
+        self.module_wraper = utils.get_expr_wrapper(configs)
+        if configs.expr_wrapper != "chain_call":
+            self.expr_wraper = self.module_wraper
+            return
+
+        from oneliner.presets import chain_runner_name
+
+        wraper = utils.get_expr_wrapper(configs, chain_runner_name)
+
+        def expr_wraper(nodes: list[expr]) -> expr:
+            if len(nodes) > 1:
+                self.use_preset_chain_runner = True
+            return wraper(nodes)
+
+        self.expr_wraper = expr_wraper
 
     def get_assign(self, name: str, value_expr: expr) -> NamedExpr:
         return NamedExpr(target=Name(id=name, ctx=Store()), value=value_expr)
@@ -67,6 +144,13 @@ class NamespaceGlobal(Namespace[symtable.SymbolTable]):
     def get_load_name(self, name: str) -> Name:
         return Name(id=name, ctx=Load())
 
+    def is_plain_name(self, name: str) -> bool:
+        return True
+
+    def get_globals_expr(self) -> expr:
+        # the module runs once, so there is nothing to hoist
+        return Call(func=Name(id="globals", ctx=Load()), args=[], keywords=[])
+
 
 class NamespaceFunction(Namespace[symtable.Function]):
     inner_nonlocal_names: set[str]  # names that is nonlocal in INNER namespace
@@ -77,10 +161,14 @@ class NamespaceFunction(Namespace[symtable.Function]):
 
     is_method: bool = False  # whether the function is a method
     zero_arg_super_used: bool = False  # whether the method uses a zero-argument super
+    is_generator: bool = False  # whether the function contains "yield"s
 
     # list of bodies of converted return nodes
     return_node_bodies: list[list[expr]]
 
+    func_node: FunctionDef | None = None  # set by PendingFunctionDef
+    _name_counts: collections.Counter[str] | None = None
+
     def __init__(self, symt: symtable.Function, stack: list[Namespace]):
         # don't push/pop the stack in this function
         super().__init__(symt, stack)
@@ -150,13 +238,7 @@ class NamespaceFunction(Namespace[symtable.Function]):
         symbol = self.symt.lookup(name)
         if symbol.is_declared_global():
             return Call(
-                func=Attribute(
-                    value=Call(
-                        func=Name(id="globals", ctx=Load()), args=[], keywords=[]
-                    ),
-                    attr="__setitem__",
-                    ctx=Load(),
-                ),
+                func=self.get_globals_setitem_expr(),
                 args=[Constant(value=name), value_expr],
                 keywords=[],
             )
@@ -204,6 +286,24 @@ class NamespaceFunction(Namespace[symtable.Function]):
         else:  # globals or locals except free
             return Name(id=name, ctx=Load())
 
+    def is_plain_name(self, name: str) -> bool:
+        if name in self.inner_nonlocal_names or name in self.outer_nonlocal_map:
+            return False
+        try:
+            return not self.symt.lookup(name).is_declared_global()
+        except KeyError:
+            # names that only exist in the scope of a comprehension
+            return True
+
+    def get_name_counts(self) -> collections.Counter[str]:
+        """Count the names in the function, including its inner scopes"""
+        if self._name_counts is None:
+            assert self.func_node is not None
+            self._name_counts = collections.Counter(
+                node.id for node in walk(self.func_node) if isinstance(node, Name)
+            )
+        return self._name_counts
+
 
 class NamespaceClass(Namespace[symtable.Class]):
     # NamespaceClass doesn't have inner_nonlocal_names
@@ -258,13 +358,7 @@ class NamespaceClass(Namespace[symtable.Class]):
         symbol = self.symt.lookup(name)
         if symbol.is_declared_global():
             return Call(
-                func=Attribute(
-                    value=Call(
-                        func=Name(id="globals", ctx=Load()), args=[], keywords=[]
-                    ),
-                    attr="__setitem__",
-                    ctx=Load(),
-                ),
+                func=self.get_globals_setitem_expr(),
                 args=[Constant(value=name), value_expr],
                 keywords=[],
             )
@@ -313,6 +407,10 @@ class NamespaceClass(Namespace[symtable.Class]):
                 ctx=Load(),
             )
 
+    def is_plain_name(self, name: str) -> bool:
+        # names are never assigned by a NamedExpr in class body
+        return False
+
 
 if sys.version_info < (3, 12):
 
@@ -0,0 +1,113 @@
+"""
+Convert the independent top-level definitions of a module in worker processes.
+
+Each worker generates the namespaces of the module from the source.
+The workers are not forked from the converting process, which can have
+other threads (like the thread pool of `convert_async`), they are started
+by a fork server, or spawned where it isn't available.
+The unique ids are seeded by the position of the nodes,
+so the output is identical to the sequential conversion.
+
+Workers unparse the converted definitions themselves,
+since sending back strings is much cheaper than sending back ASTs.
+"""
+
+import ast
+import concurrent.futures
+import multiprocessing
+import symtable
+import typing
+
+import oneliner.utils as utils
+from oneliner.config import Configs
+from oneliner.convert import analyze, convert_node, convert_stmt
+from oneliner.namespaces import NamespaceGlobal
+from oneliner.pending_nodes import PendingModule
+
+__all__ = ["convert_parallel"]
+
+# (ast_root, nsp_global) of the module being converted by the worker
+_module_state: tuple[ast.Module, NamespaceGlobal] | None = None
+
+
+def _analyze_module(code: str, filename: str, configs: Configs):
+    ast_root = ast.parse(code, filename, "exec")
+    symtable_root = symtable.symtable(code, filename, "exec")
+    return ast_root, analyze(symtable_root, configs)
+
+
+def _init_worker(code: str, filename: str, configs: dict[str, typing.Any]):
+    global _module_state
+    _module_state = _analyze_module(code, filename, Configs(**configs))
+
+
+def _convert_to_elements(index: int, node: ast.stmt, nsp_global: NamespaceGlobal):
+    return [
+        utils.unparse_element(converted, nsp_global.configs)
+        for converted in convert_stmt(index, node, nsp_global)
+    ]
+
+
+def _convert_batch(indices: list[int]):
+    assert _module_state is not None
+    ast_root, nsp_global = _module_state
+    results = [_convert_to_elements(i, ast_root.body[i], nsp_global) for i in indices]
+    flags = tuple(getattr(nsp_global, flag) for flag in NamespaceGlobal.usage_flags)
+    return results, flags
+
+
+def _get_mp_context():
+    # forking a process with threads can deadlock the child
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()  # pragma: no cover
+
+
+def convert_parallel(code: str, filename: str, configs: Configs, jobs: int) -> str:
+    ast_root, nsp_global = _analyze_module(code, filename, configs)
+    definitions = [
+        i
+        for i, node in enumerate(ast_root.body)
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef))
+    ]
+    if len(definitions) < 2:
+        # nothing to be parallelized
+        return utils.unparse_expr(
+            nsp_global.module_wraper(convert_node(ast_root, nsp_global)),
+            configs,
+        )
+
+    batch_cnt = min(len(definitions), jobs * 4)
+    batches = [definitions[i::batch_cnt] for i in range(batch_cnt)]
+
+    converted: list[list[str]] = [[] for _ in ast_root.body]
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=_get_mp_context(),
+        initializer=_init_worker,
+        initargs=(code, filename, configs.to_dict()),
+    ) as executor:
+        futures = {executor.submit(_convert_batch, batch): batch for batch in batches}
+
+        # convert the other statements while the workers are running
+        definition_set = set(definitions)
+        for index, node in enumerate(ast_root.body):
+            if index not in definition_set:
+                converted[index] = _convert_to_elements(index, node, nsp_global)
+
+        for future in concurrent.futures.as_completed(futures):
+            results, flags = future.result()
+            for index, result in zip(futures[future], results):
+                converted[index] = result
+            # the flags are OR-ed together
+            for flag, value in zip(NamespaceGlobal.usage_flags, flags):
+                if value:
+                    setattr(nsp_global, flag, True)
+
+    elements = [
+        utils.unparse_element(node, configs)
+        for node in PendingModule.get_preamble(nsp_global)
+    ]
+    for result in converted:
+        elements.extend(result)
+    return utils.join_elements(elements, configs)
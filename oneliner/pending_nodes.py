@@ -1,7 +1,9 @@
+import collections
 import typing
 from ast import *
 
 import oneliner.utils as utils
+from oneliner.control_flow import simplify_block
 from oneliner.expr_transform import expr_transf
 from oneliner.namespaces import (
     Namespace,
@@ -10,6 +12,13 @@ from oneliner.namespaces import (
     NamespaceGlobal,
 )
 from oneliner.reserved_identifiers import *
+from oneliner.yields import (
+    check_loop_yields,
+    has_yield,
+    is_generator,
+    lazy_block,
+    lazy_loop,
+)
 
 __all__ = [
     "PendingNode",
@@ -85,11 +94,13 @@ class PendingModule(PendingNode[Module]):
         self.converted_body = []
 
     def _iter_nodes(self) -> typing.Generator[AST, list[expr], None]:
-        for node in self.node.body:
+        for index, node in enumerate(self.node.body):
+            utils.seed_unique_id("stmt", index)
             self.converted_body.extend((yield node))
 
-    def _insert_import_lib(self, libname, asname):
-        import_itertools_ast = NamedExpr(
+    @staticmethod
+    def _import_lib(libname, asname) -> expr:
+        return NamedExpr(
             target=Name(id=asname, ctx=Store()),
             value=Call(
                 func=Name(id="__import__", ctx=Load()),
@@ -97,20 +108,27 @@ class PendingModule(PendingNode[Module]):
                 keywords=[],
             ),
         )
-        self.converted_body.insert(0, import_itertools_ast)
 
-    def get_result(self) -> list[expr]:
-        if self.nsp_global.use_itertools:
-            self._insert_import_lib("itertools", "itertools")
-        if self.nsp_global.use_importlib:
-            self._insert_import_lib("importlib", "importlib")
+    @staticmethod
+    def get_preamble(nsp_global: NamespaceGlobal) -> list[expr]:
+        """Get the libraries and presets used by the converted module"""
+        preamble: list[expr] = []
+        if nsp_global.use_preset_chain_runner:
+            from .presets import chain_runner_body
 
-        if self.nsp_global.use_preset_iter_wrapper:
+            preamble.append(chain_runner_body)
+        if nsp_global.use_preset_iter_wrapper:
             from .presets import iter_wrapper_body
 
-            self.converted_body.insert(0, iter_wrapper_body)
+            preamble.append(iter_wrapper_body)
+        if nsp_global.use_importlib:
+            preamble.append(PendingModule._import_lib("importlib", "importlib"))
+        if nsp_global.use_itertools:
+            preamble.append(PendingModule._import_lib("itertools", "itertools"))
+        return preamble
 
-        return self.converted_body
+    def get_result(self) -> list[expr]:
+        return self.get_preamble(self.nsp_global) + self.converted_body
 
 
 class PendingExpr(PendingNode[Expr]):
@@ -131,6 +149,18 @@ class _PendingCompoundStmt(PendingNode[T]):
     So _PendingCompoundStmt is created
     """
 
+    def _in_generator(self) -> bool:
+        return isinstance(self.nsp, NamespaceFunction) and self.nsp.is_generator
+
+    def _wrap_branch(self, nodes: list[expr]) -> expr:
+        """
+        Wrap the converted nodes of a branch as one expr,
+        the "yield"s in the loops of a generator function are yielded lazily
+        """
+        if self.nsp.loop_stack and self._in_generator() and has_yield(nodes):
+            return YieldFrom(value=lazy_block(nodes))
+        return self.nsp_global.expr_wraper(nodes)
+
     def _iter_branch(
         self,
         converted_branch: list[expr],
@@ -142,29 +172,41 @@ class _PendingCompoundStmt(PendingNode[T]):
 
         converting: list[expr] = []
         stack = [converting]
-        for node in branch:
+        for index, node in enumerate(branch):
             if get_interrupt_cnt() > initial_interrupt_cnt:
                 converting = []
                 stack.append(converting)
                 initial_interrupt_cnt = get_interrupt_cnt()
+            if len(stack) > 1:
+                self.nsp_global.guarded_stmt_cnt += 1
 
             converting.extend((yield node))
 
-            if isinstance(node, (Break, Continue, Return)):
+            if isinstance(node, (Break, Continue, Return)) and not has_yield(
+                branch[index + 1 :]
+            ):
                 # remove nodes after an "interrupt operation"
-                # since they never run
+                # since they never run (but a "yield" makes a generator)
                 break
 
-        while len(stack) > 1:
-            # wrap nodes with an "if" to check interrupt at run time
-            wrapped = stack.pop()
-            stack[-1].append(
-                IfExp(
-                    test=UnaryOp(op=Not(), operand=get_flow_control_expr()),
-                    body=self.nsp_global.expr_wraper(wrapped),
-                    orelse=Constant(value=...),
-                )
-            )
+        # wrap nodes with an "if" to check interrupt at run time
+        guard = lambda wrapped: IfExp(
+            test=UnaryOp(op=Not(), operand=get_flow_control_expr()),
+            body=self._wrap_branch(wrapped),
+            orelse=Constant(value=...),
+        )
+        # each guard is nested in the previous one, but at most max_depth
+        # guards are nested, the next ones start a new run after it.
+        # The interrupt flag stays set until the end of the branch,
+        # so an interrupt skips the rest of its run and the next runs
+        max_depth = self.nsp_global.configs.max_depth
+        guarded = stack[1:]
+        for run_start in range(0, len(guarded), max_depth):
+            run = guarded[run_start : run_start + max_depth]
+            while len(run) > 1:
+                wrapped = run.pop()
+                run[-1].append(guard(wrapped))
+            stack[0].append(guard(run[0]))
         converted_branch.extend(stack[0])
 
 
@@ -180,12 +222,18 @@ class PendingIf(_PendingCompoundStmt[If]):
 
     def get_result(self) -> list[expr]:
         test = expr_transf(self.nsp, self.node.test)
-        body = self.nsp_global.expr_wraper(self.converted_body)
-        orelse = self.nsp_global.expr_wraper(self.converted_orelse)
-        if self.nsp_global.configs.if_style == "short_circuit":
+        body = self._wrap_branch(self.converted_body)
+        orelse = self._wrap_branch(self.converted_orelse)
+        # the lazy "yield"s are only routed through conditional expressions
+        lazy = isinstance(body, YieldFrom) or isinstance(orelse, YieldFrom)
+        if self.nsp_global.configs.if_style == "short_circuit" and not lazy:
             if len(self.converted_orelse) > 0:
                 body_or_true = BoolOp(op=Or(), values=[body, Constant(value=1)])
                 semi_if = BoolOp(op=And(), values=[test, body_or_true])
+                if isinstance(orelse, BoolOp) and isinstance(orelse.op, Or):
+                    # `a or (b or c)` is `a or b or c`,
+                    # so "elif" chains don't get deeper with their length
+                    return [BoolOp(op=Or(), values=[semi_if, *orelse.values])]
                 return [BoolOp(op=Or(), values=[semi_if, orelse])]
             else:
                 return [BoolOp(op=And(), values=[test, body])]
@@ -220,6 +268,75 @@ class PendingIf(_PendingCompoundStmt[If]):
         )
 
 
+def _get_loop_unpacks(loop: While | For, body: list[stmt], nsp: Namespace):
+    """
+    Get the destructuring assignments at the start of a loop body,
+    which assign local names that are only used after them in the body.
+    The names can be the targets of the comprehension of the loop.
+    """
+    if not isinstance(nsp, NamespaceFunction) or nsp.func_node is None:
+        return []
+
+    body_counts: collections.Counter[str] = collections.Counter()
+    store_counts: collections.Counter[str] = collections.Counter()
+    inner_scope_names: set[str] = set()
+    for body_node in loop.body:
+        for node in walk(body_node):
+            if isinstance(node, Name):
+                body_counts[node.id] += 1
+                if not isinstance(node.ctx, Load):
+                    store_counts[node.id] += 1
+            elif isinstance(node, (Lambda, FunctionDef, ClassDef)):
+                inner_scope_names.update(
+                    name.id for name in walk(node) if isinstance(name, Name)
+                )
+    function_counts = nsp.get_name_counts()
+
+    def is_loop_local(name: str) -> bool:
+        if name in nsp.inner_nonlocal_names or name in nsp.outer_nonlocal_map:
+            return False
+        symbol = nsp.symt.lookup(name)
+        return (
+            symbol.is_local()
+            and not symbol.is_parameter()
+            # not used out of the body, or in the inner scopes
+            and function_counts[name] == body_counts[name]
+            and name not in inner_scope_names
+            # assigned only once, assigning a target of a comprehension
+            # by an assignment expression is a syntax error
+            and store_counts[name] == 1
+        )
+
+    unpacks: list[Assign] = []
+    unpacked_names: list[set[str]] = []
+    for node in body:
+        if not (
+            isinstance(node, Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], (Tuple, List))
+        ):
+            break
+        target_nodes = list(walk(node.targets[0]))
+        names = {name.id for name in target_nodes if isinstance(name, Name)}
+        if not all(
+            isinstance(target_node, (Name, Tuple, List, Starred, expr_context))
+            for target_node in target_nodes
+        ) or not all(map(is_loop_local, names)):
+            break
+        # an iterable of a comprehension can't contain assignment expressions
+        if any(isinstance(value_node, NamedExpr) for value_node in walk(node.value)):
+            break
+        unpacks.append(node)
+        unpacked_names.append(names)
+
+    # a value can't read the names before they are unpacked
+    for index, node in enumerate(unpacks):
+        value_names = {name.id for name in walk(node.value) if isinstance(name, Name)}
+        if any(value_names & names for names in unpacked_names[index:]):
+            return unpacks[:index]
+    return unpacks
+
+
 class _PendingLoop(_PendingCompoundStmt[L]):
     node: L  # Original node
     flow_ctrl_interrupt_expr: Name
@@ -231,15 +348,43 @@ class _PendingLoop(_PendingCompoundStmt[L]):
     converted_orelse: list[expr]  # converted orelse branch
     interrupt_cnt: int = 0  # Continue, Break and Return will increase this counter
     break_cnt: int = 0  # Break and Return will increase this counter
+    # destructuring assignments unpacked by the comprehension of the loop
+    unpack_assigns: list[Assign]
 
     def get_flow_ctrl_expr(self):
         self.flow_ctrl_interrupt_used = True
         return self.flow_ctrl_interrupt_expr
 
+    def get_unpack_generators(self) -> list[comprehension]:
+        """
+        `a, (b, *c) = value` as `for a, (b, *c) in [value]`,
+        which unpacks at C speed without a temporary
+        """
+        return [
+            comprehension(
+                target=node.targets[0],
+                iter=List(elts=[expr_transf(self.nsp, node.value)], ctx=Load()),
+                ifs=[],
+                is_async=0,
+            )
+            for node in self.unpack_assigns
+        ]
+
+    def is_lazy(self) -> bool:
+        """Whether the loop yields, it is converted by `lazy_loop`"""
+        return self._in_generator() and has_yield(self.converted_body)
+
     def _iter_nodes(self) -> typing.Generator[AST, list[expr], None]:
+        if len(self.nsp.loop_stack) == 1 and self._in_generator():
+            # the outermost loop, the inner ones are checked with it
+            check_loop_yields(self.node)
+        body = simplify_block(
+            self.node.body, Continue, self.nsp_global.configs.max_depth
+        )
+        self.unpack_assigns = _get_loop_unpacks(self.node, body, self.nsp)
         yield from self._iter_branch(
             self.converted_body,
-            self.node.body,
+            body[len(self.unpack_assigns) :],
             lambda: self.interrupt_cnt,
             self.get_flow_ctrl_expr,
         )
@@ -282,8 +427,6 @@ class PendingWhile(_PendingLoop[While]):
 
         self.nsp.loop_stack.append(self)
 
-        self.nsp_global.use_itertools = True
-
     def get_result(self) -> list[expr]:
         while_loop_final: list[expr] = []
 
@@ -333,52 +476,84 @@ class PendingWhile(_PendingLoop[While]):
         if self.break_cnt:
             while_loop_orelse = IfExp(
                 test=UnaryOp(op=Not(), operand=self.flow_ctrl_break_expr),
-                body=self.nsp_global.expr_wraper(self.converted_orelse),
+                body=self._wrap_branch(self.converted_orelse),
                 orelse=Constant(value=...),
             )
         else:
-            while_loop_orelse = self.nsp_global.expr_wraper(self.converted_orelse)
-
-        # the main body of the oneliner while loop
-        while_loop_body = ListComp(
-            elt=self.nsp_global.expr_wraper(self.converted_body),
-            generators=[
-                comprehension(
-                    target=Name(id="_", ctx=Store()),
-                    iter=Call(
+            while_loop_orelse = self._wrap_branch(self.converted_orelse)
+
+        # the iterator runs until the test is false
+        while_loop_iter: expr
+        if self.nsp_global.configs.target_version_info >= (3, 12):
+            # `iter(lambda: not test, True)` is faster since 3.12,
+            # before it `itertools.takewhile` is as fast (see bench/target_version.py)
+            while_loop_iter = Call(
+                func=Name(id="iter", ctx=Load()),
+                args=[
+                    Lambda(
+                        args=arguments(
+                            posonlyargs=[],
+                            args=[],
+                            kwonlyargs=[],
+                            kw_defaults=[],
+                            defaults=[],
+                        ),
+                        # "not" makes a bool, which is compared with the sentinel
+                        body=UnaryOp(op=Not(), operand=while_loop_test),
+                    ),
+                    Constant(value=True),
+                ],
+                keywords=[],
+            )
+        else:
+            self.nsp_global.use_itertools = True
+            while_loop_iter = Call(
+                func=Attribute(
+                    value=Name(id="itertools", ctx=Load()),
+                    attr="takewhile",
+                    ctx=Load(),
+                ),
+                args=[
+                    Lambda(
+                        args=arguments(
+                            posonlyargs=[],
+                            args=[arg(arg="_")],
+                            kwonlyargs=[],
+                            kw_defaults=[],
+                            defaults=[],
+                        ),
+                        body=while_loop_test,
+                    ),
+                    Call(
                         func=Attribute(
                             value=Name(id="itertools", ctx=Load()),
-                            attr="takewhile",
+                            attr="count",
                             ctx=Load(),
                         ),
-                        args=[
-                            Lambda(
-                                args=arguments(
-                                    posonlyargs=[],
-                                    args=[arg(arg="_")],
-                                    kwonlyargs=[],
-                                    kw_defaults=[],
-                                    defaults=[],
-                                ),
-                                body=while_loop_test,
-                            ),
-                            Call(
-                                func=Attribute(
-                                    value=Name(id="itertools", ctx=Load()),
-                                    attr="count",
-                                    ctx=Load(),
-                                ),
-                                args=[],
-                                keywords=[],
-                            ),
-                        ],
+                        args=[],
                         keywords=[],
                     ),
-                    ifs=[],
-                    is_async=0,
-                )
-            ],
-        )
+                ],
+                keywords=[],
+            )
+
+        # the main body of the oneliner while loop
+        generators = [
+            comprehension(
+                target=Name(id="_", ctx=Store()),
+                iter=while_loop_iter,
+                ifs=[],
+                is_async=0,
+            ),
+            *self.get_unpack_generators(),
+        ]
+        while_loop_body: expr
+        if self.is_lazy():
+            while_loop_body = lazy_loop(generators, self.converted_body)
+        else:
+            while_loop_body = _loop_comp(
+                self.nsp_global.expr_wraper(self.converted_body), generators
+            )
 
         # assemble all parts together and return
         while_loop_final.append(while_loop_body)
@@ -389,6 +564,86 @@ class PendingWhile(_PendingLoop[While]):
         return while_loop_final
 
 
+def _loop_comp(elt: expr, generators: list[comprehension]) -> ListComp:
+    """
+    `[... for ... if elt in ()]`, the comprehension of a loop runs `elt`
+    in an "if" clause which is always false, so it doesn't collect a list.
+    The loops take O(1) memory, and it is as fast as collecting the list
+    """
+    generators = utils.add_comprehension_ifs(
+        generators,
+        [Compare(left=elt, ops=[In()], comparators=[Tuple(elts=[], ctx=Load())])],
+    )
+    return ListComp(elt=Constant(value=...), generators=generators)
+
+
+def _is_loop_comp(node: ListComp) -> bool:
+    last_if = node.generators[-1].ifs[-1] if node.generators[-1].ifs else None
+    return (
+        isinstance(last_if, Compare)
+        and isinstance(last_if.ops[0], In)
+        and isinstance(last_if.comparators[0], Tuple)
+        and not last_if.comparators[0].elts
+    )
+
+
+def _can_flatten(
+    before: list[expr], generators: list[comprehension], inner: ListComp
+) -> bool:
+    """
+    Check if the inner comprehension of a loop body can be merged
+    into the comprehension of the loop
+    """
+    if any(generator.is_async for generator in inner.generators):
+        return False
+    # an iterable of a comprehension can't contain assignment expressions
+    for generator in inner.generators:
+        if any(isinstance(node, NamedExpr) for node in walk(generator.iter)):
+            return False
+
+    target_names = {
+        node.id
+        for generator in inner.generators
+        for node in walk(generator.target)
+        if isinstance(node, Name)
+    }
+    # the statements before the inner loop don't see its targets,
+    # except the names of the lambdas in them
+    name_stack: list[tuple[AST, set[str]]] = [(node, set()) for node in before]
+    while name_stack:
+        node, bound = name_stack.pop()
+        if isinstance(node, Lambda):
+            bound = bound | {a.arg for a in walk(node.args) if isinstance(a, arg)}
+            body_stack: list[AST] = [node.body]
+            while body_stack:
+                body_node = body_stack.pop()
+                if isinstance(body_node, NamedExpr):
+                    bound.add(body_node.target.id)
+                if not isinstance(body_node, Lambda):
+                    body_stack.extend(iter_child_nodes(body_node))
+        elif isinstance(node, Name) and node.id in target_names - bound:
+            return False
+        name_stack.extend((child, bound) for child in iter_child_nodes(node))
+    # the iteration variables can't be assigned by assignment expressions
+    for generator in generators:
+        target_names.update(
+            node.id for node in walk(generator.target) if isinstance(node, Name)
+        )
+    checked: list[AST] = [*before, inner.elt]
+    for generator in inner.generators:
+        checked.extend(generator.ifs)
+
+    # assignment expressions in lambdas assign the names of the lambdas
+    stack = checked
+    while stack:
+        node = stack.pop()
+        if isinstance(node, NamedExpr) and node.target.id in target_names:
+            return False
+        if not isinstance(node, Lambda):
+            stack.extend(iter_child_nodes(node))
+    return True
+
+
 class PendingFor(_PendingLoop[For]):
     def __init__(self, node: For, nsp: Namespace, nsp_global: NamespaceGlobal):
         super().__init__(node, nsp, nsp_global)
@@ -408,18 +663,36 @@ class PendingFor(_PendingLoop[For]):
         # if no break/continue/return used
         # use the simplest list comprehension
         if self.interrupt_cnt == 0 and len(self.node.orelse) == 0:
+            generators = [
+                comprehension(
+                    target=self.node.target,
+                    iter=expr_transf(self.nsp, self.node.iter),
+                    ifs=[],
+                    is_async=0,
+                ),
+                *self.get_unpack_generators(),
+            ]
+            if self.is_lazy():
+                return [lazy_loop(generators, self.converted_body)]
+            inner = self.converted_body[-1] if self.converted_body else None
+            if isinstance(inner, ListComp) and _can_flatten(
+                self.converted_body[:-1], generators, inner
+            ):
+                # `[[... for j in b if e in ()] for i in a if f in ()]`
+                # is `[... for i in a for j in b if e in ()]`,
+                # the statements before the inner loop run in an "if" clause.
+                # It saves a list for each iteration, and before 3.12
+                # also a function of the inner comprehension (PEP 709)
+                if len(self.converted_body) > 1:
+                    generators = utils.add_comprehension_ifs(
+                        generators, [List(elts=self.converted_body[:-1], ctx=Load())]
+                    )
+                generators = generators + inner.generators
+                if _is_loop_comp(inner):
+                    return [ListComp(elt=inner.elt, generators=generators)]
+                return [_loop_comp(inner.elt, generators)]
             return [
-                ListComp(
-                    elt=self.nsp_global.expr_wraper(self.converted_body),
-                    generators=[
-                        comprehension(
-                            target=self.node.target,
-                            iter=expr_transf(self.nsp, self.node.iter),
-                            ifs=[],
-                            is_async=0,
-                        )
-                    ],
-                )
+                _loop_comp(self.nsp_global.expr_wraper(self.converted_body), generators)
             ]
 
         for_loop_final: list[expr] = []
@@ -473,24 +746,29 @@ class PendingFor(_PendingLoop[For]):
                         ctx=Load(),
                     ),
                 ),
-                body=self.nsp_global.expr_wraper(self.converted_orelse),
+                body=self._wrap_branch(self.converted_orelse),
                 orelse=Constant(value=...),
             )
         else:
-            for_loop_orelse = self.nsp_global.expr_wraper(self.converted_orelse)
+            for_loop_orelse = self._wrap_branch(self.converted_orelse)
 
         # the main body of the oneliner for loop
-        for_loop_body = ListComp(
-            elt=self.nsp_global.expr_wraper(self.converted_body),
-            generators=[
-                comprehension(
-                    target=self.node.target,
-                    iter=for_loop_iter,
-                    ifs=[],
-                    is_async=0,
-                )
-            ],
-        )
+        generators = [
+            comprehension(
+                target=self.node.target,
+                iter=for_loop_iter,
+                ifs=[],
+                is_async=0,
+            ),
+            *self.get_unpack_generators(),
+        ]
+        for_loop_body: expr
+        if self.is_lazy():
+            for_loop_body = lazy_loop(generators, self.converted_body)
+        else:
+            for_loop_body = _loop_comp(
+                self.nsp_global.expr_wraper(self.converted_body), generators
+            )
 
         # assemble all parts together and return
 
@@ -612,6 +890,22 @@ class PendingAssign(PendingNode[Assign | AnnAssign]):
         value_subscript: expr
         slice_upper: Constant | None
 
+        if (
+            isinstance(value, (Tuple, List))
+            and target.elts
+            and len(value.elts) == len(target.elts)
+            and not any(isinstance(elt, Starred) for elt in target.elts + value.elts)
+            # the first value runs before any assignment (but after the
+            # subscripts of its target), and the later values can't
+            # observe the assignments
+            and (isinstance(target.elts[0], Name) or utils.is_pure(value.elts[0]))
+            and all(utils.is_pure(elt) for elt in value.elts[1:])
+        ):
+            # assign the elements of a literal directly, without a tmp
+            for sub_target, sub_value in zip(target.elts, value.elts):
+                return_list.extend(self.assign_auto(sub_target, sub_value))
+            return return_list
+
         # save the assign value to a tmp var
         # to make sure the value expr only runs once.
         tmp_value_name = Name(id=ol_name(OL_ASSIGN_TMP))
@@ -685,6 +979,12 @@ class PendingAssign(PendingNode[Assign | AnnAssign]):
         else:
             assign_targets = self.node.targets
 
+        if len(assign_targets) > 1 and not utils.is_pure(assign_value):
+            # `a = b = f()` runs `f()` only once
+            tmp_value_name = Name(id=ol_name(OL_ASSIGN_TMP))
+            return_list.append(NamedExpr(target=tmp_value_name, value=assign_value))
+            assign_value = tmp_value_name
+
         for target in assign_targets:
             return_list.extend(self.assign_auto(target, assign_value))
 
@@ -749,22 +1049,22 @@ class PendingAugAssign(PendingNode[AugAssign]):
                 )
             ]
         elif isinstance(self.node.target, Subscript):
-            # todo: could be optimized if slice is const
-            tmp_slice_name = Name(id=ol_name(OL_AUGASSIGN_SLICE_TMP))
             target = self.node.target
             subscript_parent = expr_transf(self.nsp, target.value)
 
             slice_expr = target.slice
             if isinstance(slice_expr, Slice):
                 slice_expr = utils.convert_slice(slice_expr)
+            slice_expr = expr_transf(self.nsp, slice_expr)
 
-            # save slice expr to a tmp
-            return_list.append(
-                NamedExpr(
-                    target=tmp_slice_name,
-                    value=expr_transf(self.nsp, slice_expr),
-                )
-            )
+            tmp_slice_name: expr
+            if utils.is_pure(slice_expr):
+                # a const slice is used directly
+                tmp_slice_name = slice_expr
+            else:
+                # save slice expr to a tmp
+                tmp_slice_name = Name(id=ol_name(OL_AUGASSIGN_SLICE_TMP))
+                return_list.append(NamedExpr(target=tmp_slice_name, value=slice_expr))
 
             # load subscript value to a tmp
             return_list.append(
@@ -839,7 +1139,7 @@ class PendingFunctionDef(_PendingCompoundStmt[FunctionDef]):
 
         for tmp_nsp in self.nsp.inner_nsp:
             if (
-                tmp_nsp.symt.get_lineno() == node.lineno
+                tmp_nsp.symt.get_lineno() + nsp_global.line_offset == node.lineno
                 and tmp_nsp.symt.get_name() == node.name
             ):
                 assert isinstance(tmp_nsp, NamespaceFunction)
@@ -847,6 +1147,8 @@ class PendingFunctionDef(_PendingCompoundStmt[FunctionDef]):
                 break
         else:
             raise RuntimeError("Namespace not found")
+        self.internal_nsp.func_node = node
+        self.internal_nsp.is_generator = is_generator(node)
 
         # copy args and filter annotations
         original_args = node.args
@@ -893,7 +1195,7 @@ class PendingFunctionDef(_PendingCompoundStmt[FunctionDef]):
     def _iter_nodes(self) -> typing.Generator[AST, list[expr], None]:
         yield from self._iter_branch(
             self.converted_body,
-            self.node.body,
+            simplify_block(self.node.body, Return, self.nsp_global.configs.max_depth),
             lambda: self.internal_nsp.return_cnt,
             self.internal_nsp.get_flow_ctrl_expr,
         )
@@ -907,6 +1209,8 @@ class PendingFunctionDef(_PendingCompoundStmt[FunctionDef]):
             )
         )
 
+        body.extend(self.internal_nsp.get_globals_bindings())
+
         if self.internal_nsp.zero_arg_super_used:
             # inject free __class__
             body.append(Name(id="__class__", ctx=Load()))
@@ -930,7 +1234,7 @@ class PendingFunctionDef(_PendingCompoundStmt[FunctionDef]):
         if len(self.internal_nsp.inner_nonlocal_names):
             nonlocal_dict_keys: list[expr] = []
             nonlocal_dict_values: list[expr] = []
-            for nonlocal_param in self.internal_nsp.nonlocal_parameters:
+            for nonlocal_param in sorted(self.internal_nsp.nonlocal_parameters):
                 nonlocal_dict_keys.append(Constant(value=nonlocal_param))
                 nonlocal_dict_values.append(Name(id=nonlocal_param, ctx=Load()))
             body.append(
@@ -958,6 +1262,8 @@ class PendingFunctionDef(_PendingCompoundStmt[FunctionDef]):
                 ctx=Load(),
             ),
         )
+        # source maps name the function by the location of its lambda
+        copy_location(body_expr, self.node)
         for dec_expr in reversed(self.node.decorator_list):
             body_expr = Call(
                 func=expr_transf(self.nsp, dec_expr),
@@ -1046,7 +1352,7 @@ class PendingClassDef(_PendingCompoundStmt[ClassDef]):
 
         for tmp_nsp in self.nsp.inner_nsp:
             if (
-                tmp_nsp.symt.get_lineno() == node.lineno
+                tmp_nsp.symt.get_lineno() + nsp_global.line_offset == node.lineno
                 and tmp_nsp.symt.get_name() == node.name
             ):
                 assert isinstance(tmp_nsp, NamespaceClass)
@@ -1118,6 +1424,7 @@ class PendingClassDef(_PendingCompoundStmt[ClassDef]):
                 value=Dict(keys=[], values=[]),
             )
         )
+        class_body.extend(self.internal_nsp.get_globals_bindings())
         class_body.extend(self.converted_body)
         class_body.append(self.internal_nsp.class_member_dict_expr)
 
@@ -1189,6 +1496,21 @@ class PendingImport(PendingNode[Import]):
     def get_result(self) -> list[expr]:
         result = []
         for _alias in self.node.names:
+            if _alias.asname is None and "." in _alias.name:
+                # `import a.b` binds the top level package `a`,
+                # which is what `__import__('a.b')` returns
+                result.append(
+                    self.nsp.get_assign(
+                        _alias.name.partition(".")[0],
+                        Call(
+                            func=Name(id="__import__", ctx=Load()),
+                            args=[Constant(value=_alias.name)],
+                            keywords=[],
+                        ),
+                    )
+                )
+                continue
+
             if _alias.asname is None:
                 asname = _alias.name
             else:
@@ -1228,21 +1550,32 @@ class PendingImportFrom(PendingNode[ImportFrom]):
         for _alias in self.node.names:
             from_list.append(Constant(value=_alias.name))
 
-        import_body = NamedExpr(
-            target=Name(id=tmp_mod_name, ctx=Store()),
-            value=Call(
-                func=Name(id="__import__", ctx=Load()),
-                args=[
-                    Constant(value=mod_name),
-                    Call(func=Name(id="globals", ctx=Load()), args=[], keywords=[]),
-                    Call(func=Name(id="locals", ctx=Load()), args=[], keywords=[]),
-                    List(elts=from_list, ctx=Load()),
-                    Constant(value=self.node.level),
-                ],
-                keywords=[],
-            ),
+        if isinstance(self.nsp, NamespaceGlobal):
+            locals_expr: expr = Call(
+                func=Name(id="locals", ctx=Load()), args=[], keywords=[]
+            )
+        else:
+            # like the "import" statement in functions,
+            # the default `__import__` doesn't use the locals
+            locals_expr = Constant(value=None)
+
+        import_body: expr = Call(
+            func=Name(id="__import__", ctx=Load()),
+            args=[
+                Constant(value=mod_name),
+                self.nsp.get_globals_expr(),
+                locals_expr,
+                List(elts=from_list, ctx=Load()),
+                Constant(value=self.node.level),
+            ],
+            keywords=[],
         )
-        result.append(import_body)
+        if len(self.node.names) > 1:
+            # the module is used once for each name
+            result.append(
+                NamedExpr(target=Name(id=tmp_mod_name, ctx=Store()), value=import_body)
+            )
+            import_body = Name(id=tmp_mod_name, ctx=Load())
 
         for _alias in self.node.names:
             if _alias.asname is None:
@@ -1258,10 +1591,7 @@ class PendingImportFrom(PendingNode[ImportFrom]):
             result.append(
                 self.nsp.get_assign(
                     asname,
-                    Attribute(
-                        value=Name(id=tmp_mod_name, ctx=Store()),
-                        attr=_alias.name,
-                    ),
+                    Attribute(value=import_body, attr=_alias.name),
                 )
             )
 
@@ -1,6 +1,9 @@
+from .chain_runner import chain_runner_body, chain_runner_name
 from .iter_wrapper import iter_wrapper_body, iter_wrapper_name
 
 __all__ = [
+    "chain_runner_name",
+    "chain_runner_body",
     "iter_wrapper_name",
     "iter_wrapper_body",
 ]
@@ -0,0 +1,28 @@
+"""
+Preset "chain_runner"
+Used by the "chain_call" expr_wrapper, `__ol_chain(a)(b)(c)` runs a, b and c.
+The module creates it once, instead of each chain creating its own runner
+(which is slow in loops)
+"""
+
+# This is the original code of __ol_chain
+"""
+def __ol_chain(_):
+    return __ol_chain
+"""
+
+# This is the oneliner version __ol_chain
+"""
+(__ol_chain := (lambda: (_ := lambda __: _))())
+"""
+
+from ast import *
+
+from oneliner.reserved_identifiers import OL_CHAIN_RUNNER
+from oneliner.utils import chain_runner
+
+chain_runner_name = Name(id=OL_CHAIN_RUNNER, ctx=Load())
+chain_runner_body = NamedExpr(
+    target=Name(id=OL_CHAIN_RUNNER, ctx=Store()),
+    value=chain_runner(),
+)
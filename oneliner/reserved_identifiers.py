@@ -9,6 +9,7 @@ OL_BREAK: _ol_reserved_name = "__ol_break_{}"
 OL_INTERRUPT: _ol_reserved_name = "__ol_interrupt_{}"
 OL_WRAPPED_ITER: _ol_reserved_name = "__ol_it_{}"
 OL_ITER_WRAPPER: _ol_reserved_name = "__ol_iter_wrapper"  # don't need format here
+OL_CHAIN_RUNNER: _ol_reserved_name = "__ol_chain"  # don't need format here
 OL_ASSIGN_TMP: _ol_reserved_name = "__ol_assign_{}"
 OL_AUGASSIGN_TMP: _ol_reserved_name = "__ol_augass_{}"
 OL_AUGASSIGN_SLICE_TMP: _ol_reserved_name = "__ol_sllice_{}"
@@ -18,6 +19,11 @@ OL_NONLOCAL_DICT: _ol_reserved_name = "__ol_nonlocal_{}"
 OL_CLASS_DICT: _ol_reserved_name = "__ol_classnsp_{}"
 OL_CLASS_LOADER: _ol_reserved_name = "__ol_loader_{}"
 OL_IMPORT_TMP: _ol_reserved_name = "__ol_mod_{}"
+OL_YIELD_ITER: _ol_reserved_name = "__ol_yit_{}"
+OL_YIELD_STEP: _ol_reserved_name = "__ol_ystep_{}"
+OL_YIELD_VALUE: _ol_reserved_name = "__ol_yv_{}"
+OL_GLOBALS: _ol_reserved_name = "__ol_globals_{}"
+OL_GLOBALS_SETITEM: _ol_reserved_name = "__ol_gset_{}"
 
 
 def ol_name(name: _ol_reserved_name):
@@ -0,0 +1,151 @@
+"""
+A long-running conversion server, to skip the startup of the interpreter
+and the imports for every conversion.
+
+Usage: python -m oneliner serve [--socket PATH]
+
+The server reads JSON-lines requests from stdin (or from the clients
+of a Unix socket) and writes a JSON-line response for each request.
+
+Request:  {"id": 1, "source": "...", "configs": {"unparser": "oneliner"}}
+Response: {"id": 1, "ok": true, "output": "..."}
+Error:    {"id": 1, "ok": false, "error": {"type": "SyntaxError", "message": "..."}}
+
+"filename" and "configs" of the request are optional.
+Results are cached, so a repeated request is answered without converting.
+"""
+
+import argparse
+import functools
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import typing
+
+from oneliner import convert_code_string
+from oneliner.config import Configs
+
+__all__ = ["ConversionServer"]
+
+
+class ConversionServer:
+    def __init__(self, cache_size: int = 256):
+        self.convert = functools.lru_cache(maxsize=cache_size)(self._convert)
+
+    @staticmethod
+    def _convert(
+        source: str, filename: str, configs_items: tuple[tuple[str, typing.Any], ...]
+    ) -> str:
+        return convert_code_string(source, filename, Configs(**dict(configs_items)))
+
+    @staticmethod
+    def get_error(err: Exception) -> dict[str, typing.Any]:
+        error: dict[str, typing.Any] = {
+            "type": type(err).__name__,
+            "message": str(err),
+        }
+        if isinstance(err, SyntaxError):
+            error["lineno"] = err.lineno
+            error["offset"] = err.offset
+        return error
+
+    def handle_request(self, request: typing.Any) -> dict[str, typing.Any]:
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise TypeError("A request should be a JSON object")
+            source = request["source"]
+            filename = request.get("filename", "<string>")
+            configs = request.get("configs", {})
+            if not isinstance(source, str) or not isinstance(filename, str):
+                raise TypeError("'source' and 'filename' should be strings")
+            if not isinstance(configs, dict):
+                raise TypeError("'configs' should be a JSON object")
+            output = self.convert(source, filename, tuple(sorted(configs.items())))
+        except Exception as err:
+            return {"id": request_id, "ok": False, "error": self.get_error(err)}
+        return {"id": request_id, "ok": True, "output": output}
+
+    def handle_line(self, line: str | bytes) -> str:
+        try:
+            # bytes are decoded as utf-8 (or utf-16/32) by json
+            request = json.loads(line)
+        except ValueError as err:
+            response = {"id": None, "ok": False, "error": self.get_error(err)}
+        else:
+            response = self.handle_request(request)
+        return json.dumps(response, ensure_ascii=False)
+
+    def serve_stream(self, infile: typing.TextIO, outfile: typing.TextIO):
+        for line in infile:
+            if not line.strip():
+                continue
+            outfile.write(self.handle_line(line) + "\n")
+            outfile.flush()
+
+    def serve_unix(self, path: str):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    response = server.handle_line(line)
+                    self.wfile.write(response.encode("utf8") + b"\n")
+                    self.wfile.flush()
+
+        try:
+            mode = os.lstat(path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{path!r} exists and is not a socket")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                if probe.connect_ex(path) == 0:
+                    raise FileExistsError(f"{path!r} is used by a running server")
+            # left by a previous server
+            os.unlink(path)
+        # clients are served one by one, which keeps the conversions sequential
+        with socketserver.UnixStreamServer(path, Handler) as unix_server:
+            self.unix_server = unix_server
+            try:
+                unix_server.serve_forever()
+            finally:
+                os.unlink(path)
+
+
+def cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oneliner serve",
+        description="Serve JSON-lines conversion requests "
+        "from stdin or from a Unix socket.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        help="The path of the Unix socket to listen. "
+        "If this argument is not specified, requests are read from stdin.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="The number of cached conversion results (default: 256)",
+    )
+    args = parser.parse_args(argv)
+
+    server = ConversionServer(args.cache_size)
+    try:
+        if args.socket is None:
+            server.serve_stream(sys.stdin, sys.stdout)
+        else:
+            server.serve_unix(args.socket)
+    except FileExistsError as err:
+        parser.error(str(err))
+    except KeyboardInterrupt:
+        pass
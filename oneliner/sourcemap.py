@@ -0,0 +1,468 @@
+"""
+Source maps from the columns of a converted script to the original source.
+
+A converted script is a single line, so tracebacks and profiles of it
+point at line 1. The source map records, for the nodes of the output,
+the span of the output they occupy and their location in the source.
+The offsets of the output are UTF-8 byte offsets, like the columns in
+code objects and in `ast`.
+
+The map is built by parsing the output again and walking it together with
+the converted tree, so it works with both unparsers.
+Mapping frames and code objects needs `co_positions` (python 3.11+),
+on older versions they are left as they are.
+
+Usage: python -m oneliner run [converted script] --source-map PATH [--profile]
+"""
+
+import argparse
+import ast
+import bisect
+import cProfile
+import json
+import os
+import pstats
+import symtable
+import sys
+import traceback
+import types
+import typing
+
+from oneliner.config import Configs
+
+__all__ = [
+    "SourceMap",
+    "SourceLocation",
+    "convert_with_source_map",
+    "format_exception",
+    "MappedProfile",
+]
+
+SOURCE_MAP_VERSION = 1
+
+
+class SourceLocation(typing.NamedTuple):
+    lineno: int
+    col_offset: int
+    end_lineno: int
+    end_col_offset: int
+
+
+class SourceMap:
+    source_filename: str
+    output_filename: str | None
+    starts: list[int]  # start offsets of the spans in the output, sorted
+    ends: list[int]
+    locations: list[SourceLocation]
+    parents: list[int]  # index of the innermost span containing the span, or -1
+    function_starts: list[int]  # spans of the functions (lambdas) in the output
+    function_ends: list[int]
+    function_names: list[tuple[int, str]]  # source line and name of the functions
+    function_parents: list[int]
+
+    def __init__(
+        self,
+        source_filename: str,
+        output_filename: str | None,
+        mappings: list[tuple[int, int, SourceLocation]],
+        functions: list[tuple[int, int, int, str]],
+    ):
+        self.source_filename = source_filename
+        self.output_filename = output_filename
+
+        mappings = sorted(mappings, key=lambda m: (m[0], -m[1]))
+        self.starts = [m[0] for m in mappings]
+        self.ends = [m[1] for m in mappings]
+        self.locations = [m[2] for m in mappings]
+        self.parents = self._get_parents(self.starts, self.ends)
+
+        functions = sorted(functions, key=lambda f: (f[0], -f[1]))
+        self.function_starts = [f[0] for f in functions]
+        self.function_ends = [f[1] for f in functions]
+        self.function_names = [(f[2], f[3]) for f in functions]
+        self.function_parents = self._get_parents(
+            self.function_starts, self.function_ends
+        )
+
+    @staticmethod
+    def _get_parents(starts: list[int], ends: list[int]) -> list[int]:
+        # the spans are nested or disjoint, like the nodes they come from
+        parents = []
+        stack: list[int] = []
+        for i, (start, end) in enumerate(zip(starts, ends)):
+            while stack and ends[stack[-1]] < end:
+                stack.pop()
+            parents.append(stack[-1] if stack else -1)
+            stack.append(i)
+        return parents
+
+    @staticmethod
+    def _find(
+        starts: list[int], ends: list[int], parents: list[int], offset: int
+    ) -> int:
+        """Get the index of the innermost span containing the offset, or -1"""
+        # the last span starting before the offset, if it doesn't contain
+        # the offset, the innermost span containing it is one of its parents
+        index = bisect.bisect_right(starts, offset) - 1
+        while index >= 0 and ends[index] <= offset:
+            index = parents[index]
+        return index
+
+    def lookup(self, offset: int) -> SourceLocation | None:
+        """Get the source location of the node at the offset of the output"""
+        index = self._find(self.starts, self.ends, self.parents, offset)
+        return None if index < 0 else self.locations[index]
+
+    def lookup_function(self, offset: int) -> tuple[int, str] | None:
+        """
+        Get the source line and the name of the function (lambda)
+        which contains the offset of the output
+        """
+        index = self._find(
+            self.function_starts, self.function_ends, self.function_parents, offset
+        )
+        return None if index < 0 else self.function_names[index]
+
+    def is_output(self, filename: str) -> bool:
+        """Check if the filename of a frame or a code object is the output"""
+        if self.output_filename is None:
+            return False
+        return os.path.abspath(filename) == os.path.abspath(self.output_filename)
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        return {
+            "version": SOURCE_MAP_VERSION,
+            "source": self.source_filename,
+            "output": self.output_filename,
+            "mappings": [
+                [start, end, *location]
+                for start, end, location in zip(self.starts, self.ends, self.locations)
+            ],
+            "functions": [
+                [start, end, lineno, name]
+                for start, end, (lineno, name) in zip(
+                    self.function_starts, self.function_ends, self.function_names
+                )
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, typing.Any]) -> "SourceMap":
+        if data.get("version") != SOURCE_MAP_VERSION:
+            raise ValueError(f"Unsupported source map version {data.get('version')}")
+        return cls(
+            data["source"],
+            data["output"],
+            [(m[0], m[1], SourceLocation(*m[2:])) for m in data["mappings"]],
+            [tuple(f) for f in data["functions"]],  # type: ignore
+        )
+
+    def save(self, filename: str):
+        with open(filename, "w", encoding="utf8") as file:
+            json.dump(self.to_dict(), file, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, filename: str) -> "SourceMap":
+        with open(filename, "r", encoding="utf8") as file:
+            return cls.from_dict(json.load(file))
+
+
+def build_source_map(
+    converted: ast.expr,
+    output: str,
+    source_root: ast.Module,
+    source_filename: str,
+    output_filename: str | None = None,
+) -> SourceMap:
+    """
+    Build the source map of `output`, which is the unparsed `converted` tree.
+    `source_root` is used to name the converted functions.
+    """
+    defs = {
+        (node.lineno, node.col_offset): node.name
+        for node in ast.walk(source_root)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+    output_root = ast.parse(output, mode="eval").body
+
+    mappings: list[tuple[int, int, SourceLocation]] = []
+    functions: list[tuple[int, int, int, str]] = []
+    default_location = SourceLocation(1, 0, 1, 0)
+    stack: list[tuple[ast.AST, ast.AST, SourceLocation]] = [
+        (converted, output_root, default_location)
+    ]
+    while stack:
+        node, out_node, location = stack.pop()
+        if type(node) is not type(out_node):
+            # unparsed differently, like `Constant(-1)` which is parsed as
+            # `UnaryOp(USub, Constant(1))`, the subtree is not mapped
+            continue
+
+        has_location = hasattr(node, "lineno") and hasattr(out_node, "col_offset")
+        if has_location:
+            location = SourceLocation(
+                node.lineno,  # type: ignore
+                node.col_offset,  # type: ignore
+                getattr(node, "end_lineno", None) or node.lineno,  # type: ignore
+                getattr(node, "end_col_offset", None) or node.col_offset,  # type: ignore
+            )
+            mappings.append(
+                (out_node.col_offset, out_node.end_col_offset, location)  # type: ignore
+            )
+        if isinstance(out_node, ast.Lambda):
+            name = "<lambda>"
+            if has_location:
+                name = defs.get((location.lineno, location.col_offset), name)
+            functions.append(
+                (
+                    out_node.col_offset,
+                    out_node.end_col_offset,  # type: ignore
+                    location.lineno,
+                    name,
+                )
+            )
+
+        children = list(ast.iter_child_nodes(node))
+        out_children = list(ast.iter_child_nodes(out_node))
+        if len(children) == len(out_children):
+            for child, out_child in zip(children, out_children):
+                stack.append((child, out_child, location))
+
+    return SourceMap(source_filename, output_filename, mappings, functions)
+
+
+def convert_with_source_map(
+    code: str,
+    filename: str = "<string>",
+    configs: Configs | None = None,
+    output_filename: str | None = None,
+) -> tuple[str, SourceMap]:
+    """
+    Convert the code like `convert_code_string`,
+    and get the source map of the output
+    """
+    from oneliner.convert import convert
+    from oneliner.utils import unparse_expr
+
+    if configs is None:
+        configs = Configs()
+    if configs.output != "plain":
+        raise ValueError("A source map needs the plain output")
+
+    ast_root = ast.parse(code, filename, "exec")
+    symtable_root = symtable.symtable(code, filename, "exec")
+    converted = convert(ast_root, symtable_root, configs)
+    output = unparse_expr(converted, configs)
+    source_map = build_source_map(
+        converted, output, ast_root, filename, output_filename
+    )
+    return output, source_map
+
+
+def _get_code_offset(code: types.CodeType) -> int | None:
+    """Get the offset of the first located instruction of the code object"""
+    for lineno, _, col, end_col in getattr(code, "co_positions", lambda: ())():
+        # skip the instructions at (1, 0) like RESUME and MAKE_CELL
+        if lineno is not None and col is not None and end_col:
+            return col
+    return None
+
+
+def _read_source_lines(filename: str) -> list[str]:
+    try:
+        with open(filename, "r", encoding="utf8") as file:
+            return file.read().splitlines()
+    except OSError:
+        return []
+
+
+def _map_frame(
+    frame: traceback.FrameSummary, source_map: SourceMap, source_lines: list[str]
+) -> traceback.FrameSummary:
+    colno = getattr(frame, "colno", None)
+    if not source_map.is_output(frame.filename) or colno is None:
+        return frame
+    location = source_map.lookup(colno)
+    if location is None:
+        return frame
+    function = source_map.lookup_function(colno)
+    name = frame.name if function is None else function[1]
+    line = ""
+    if 0 < location.lineno <= len(source_lines):
+        line = source_lines[location.lineno - 1]
+    end_colno = None
+    if location.end_lineno == location.lineno:
+        end_colno = location.end_col_offset
+    return traceback.FrameSummary(
+        source_map.source_filename,
+        location.lineno,
+        name,
+        lookup_line=False,
+        line=line,
+        end_lineno=location.end_lineno,
+        colno=location.col_offset if end_colno is not None else None,
+        end_colno=end_colno,
+    )
+
+
+def format_exception(
+    exc: BaseException, source_map: SourceMap, source: str | None = None
+) -> list[str]:
+    """
+    Format the exception like `traceback.format_exception`,
+    with the frames of the converted script mapped to the source.
+    The source lines are read from the source file if `source` is not given.
+    """
+    if source is None:
+        source_lines = _read_source_lines(source_map.source_filename)
+    else:
+        source_lines = source.splitlines()
+    tb_exc = traceback.TracebackException.from_exception(exc)
+
+    # map the frames of the chained exceptions too
+    stack = [tb_exc]
+    seen = set()
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        current.stack = traceback.StackSummary.from_list(
+            [_map_frame(frame, source_map, source_lines) for frame in current.stack]
+        )
+        for chained in current.__cause__, current.__context__:
+            if chained is not None:
+                stack.append(chained)
+    return list(tb_exc.format())
+
+
+class MappedProfile(cProfile.Profile):
+    """
+    A profiler which labels the functions of the converted script
+    by their source lines and names.
+
+    The stats of a dumped profile can't be mapped afterwards,
+    since all the functions of the output are merged as `<lambda>` of line 1.
+    """
+
+    def __init__(self, source_map: SourceMap, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.source_map = source_map
+
+    def label(self, code: types.CodeType | str) -> tuple[str, int, str]:
+        if isinstance(code, str):
+            return ("~", 0, code)  # built-in functions
+        label = (code.co_filename, code.co_firstlineno, code.co_name)
+        if not self.source_map.is_output(code.co_filename):
+            return label
+        if code.co_name == "<module>":
+            return (self.source_map.source_filename, 1, code.co_name)
+        offset = _get_code_offset(code)
+        if offset is None:
+            return label
+        if code.co_name == "<lambda>":
+            function = self.source_map.lookup_function(offset)
+            if function is not None:
+                return (self.source_map.source_filename, *function)
+        location = self.source_map.lookup(offset)
+        if location is None:
+            return label
+        return (self.source_map.source_filename, location.lineno, code.co_name)
+
+    def snapshot_stats(self):
+        # like `cProfile.Profile.snapshot_stats`, but the entries with
+        # the same label are merged instead of replaced
+        entries = self.getstats()
+        labels = {id(entry.code): self.label(entry.code) for entry in entries}
+        self.stats = {}
+        callers_dicts = {}
+        for entry in entries:
+            func = labels[id(entry.code)]
+            nc = entry.callcount
+            cc = nc - entry.reccallcount
+            tt = entry.inlinetime
+            ct = entry.totaltime
+            if func in self.stats:
+                prev_cc, prev_nc, prev_tt, prev_ct, callers = self.stats[func]
+                cc, nc, tt, ct = cc + prev_cc, nc + prev_nc, tt + prev_tt, ct + prev_ct
+            else:
+                callers = {}
+            callers_dicts[id(entry.code)] = callers
+            self.stats[func] = cc, nc, tt, ct, callers
+        for entry in entries:
+            func = labels[id(entry.code)]
+            for subentry in entry.calls or ():
+                try:
+                    callers = callers_dicts[id(subentry.code)]
+                except KeyError:
+                    continue
+                nc = subentry.callcount
+                cc = nc - subentry.reccallcount
+                tt = subentry.inlinetime
+                ct = subentry.totaltime
+                if func in callers:
+                    prev = callers[func]
+                    nc, cc, tt, ct = (
+                        nc + prev[0],
+                        cc + prev[1],
+                        tt + prev[2],
+                        ct + prev[3],
+                    )
+                callers[func] = nc, cc, tt, ct
+
+
+def cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oneliner run",
+        description="Run a converted script, with its tracebacks "
+        "(and its profile) mapped to the source by a source map.",
+    )
+    parser.add_argument("filename", type=str, help="The converted script")
+    parser.add_argument(
+        "--source-map",
+        type=str,
+        required=True,
+        help="The source map written by `python -m oneliner --source-map`",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Profile the script with cProfile"
+    )
+    parser.add_argument(
+        "--sort",
+        type=str,
+        default="cumulative",
+        help="The sort key of the profile (default: cumulative)",
+    )
+    args = parser.parse_args(argv)
+
+    source_map = SourceMap.load(args.source_map)
+    source_map.output_filename = args.filename
+    with open(args.filename, "r", encoding="utf8") as file:
+        code = compile(file.read(), args.filename, "exec")
+
+    profile = MappedProfile(source_map) if args.profile else None
+    sys.argv = [args.filename]
+    globals_dict = {"__name__": "__main__", "__file__": args.filename}
+    try:
+        if profile is not None:
+            profile.enable()
+        try:
+            exec(code, globals_dict)
+        finally:
+            # not profiling the handling of its exception
+            if profile is not None:
+                profile.disable()
+    except SystemExit:
+        raise
+    except BaseException as exc:
+        # hide the frames of the runner
+        tb = exc.__traceback__
+        while tb is not None and not source_map.is_output(
+            tb.tb_frame.f_code.co_filename
+        ):
+            tb = tb.tb_next
+        sys.stderr.write("".join(format_exception(exc.with_traceback(tb), source_map)))
+        sys.exit(1)
+    finally:
+        if profile is not None:
+            pstats.Stats(profile).sort_stats(args.sort).print_stats()
@@ -0,0 +1,181 @@
+"""
+Statistics of a conversion, to tune the inputs of the converter.
+
+The constructs are counted on the source tree, the temporaries on the
+converted tree (by the `OL_*` templates of `oneliner.reserved_identifiers`),
+and the injected libraries and presets come from the flags of the
+global namespace.
+A statement is guarded when it runs behind the guard of an interrupt
+(`break`, `continue` or `return` in a branch before it),
+the statements nested in a guarded statement are not counted again.
+"""
+
+import ast
+import collections
+import re
+import symtable
+import typing
+
+import oneliner.reserved_identifiers as reserved_identifiers
+from oneliner.config import Configs
+
+__all__ = ["ConversionStats", "convert_with_stats"]
+
+
+def _template_pattern(template: str) -> re.Pattern:
+    # the ids are 10 lowercase letters, see `utils.unique_id`
+    return re.compile(
+        "[a-z]{10}".join(re.escape(part) for part in template.split("{}"))
+    )
+
+
+_temporary_patterns = {
+    name: _template_pattern(template)
+    for name, template in vars(reserved_identifiers).items()
+    if name.startswith("OL_")
+}
+
+# the preamble of the module, see `PendingModule.get_preamble`
+_injection_flags = {
+    "chain_runner": "use_preset_chain_runner",
+    "iter_wrapper": "use_preset_iter_wrapper",
+    "importlib": "use_importlib",
+    "itertools": "use_itertools",
+}
+
+
+def _get_nesting_depth(root: ast.AST) -> int:
+    depth = 0
+    stack = [(root, 1)]
+    while stack:
+        node, node_depth = stack.pop()
+        depth = max(depth, node_depth)
+        stack.extend((child, node_depth + 1) for child in ast.iter_child_nodes(node))
+    return depth
+
+
+class ConversionStats:
+    constructs: dict[str, int]  # statements by type, like {"For": 2, "Break": 1}
+    temporaries: dict[str, int]  # distinct generated names by `OL_*` kind
+    injections: list[str]  # libraries and presets in the preamble
+    input_size: int  # characters
+    output_size: int
+    nesting_depth: int  # the depth of the converted tree
+    statements: int
+    guarded_statements: int
+
+    def __init__(
+        self,
+        constructs: dict[str, int],
+        temporaries: dict[str, int],
+        injections: list[str],
+        input_size: int,
+        output_size: int,
+        nesting_depth: int,
+        guarded_statements: int,
+    ):
+        self.constructs = constructs
+        self.temporaries = temporaries
+        self.injections = injections
+        self.input_size = input_size
+        self.output_size = output_size
+        self.nesting_depth = nesting_depth
+        self.statements = sum(constructs.values())
+        self.guarded_statements = guarded_statements
+
+    @property
+    def size_ratio(self) -> float:
+        """The size of the output divided by the size of the input"""
+        return self.output_size / self.input_size if self.input_size else 0.0
+
+    @property
+    def guarded_share(self) -> float:
+        """The share of the statements behind the guards of interrupts"""
+        return self.guarded_statements / self.statements if self.statements else 0.0
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        return {
+            "constructs": self.constructs,
+            "temporaries": self.temporaries,
+            "injections": self.injections,
+            "input_size": self.input_size,
+            "output_size": self.output_size,
+            "size_ratio": self.size_ratio,
+            "nesting_depth": self.nesting_depth,
+            "statements": self.statements,
+            "guarded_statements": self.guarded_statements,
+            "guarded_share": self.guarded_share,
+        }
+
+    def format(self) -> str:
+        lines = ["constructs:"]
+        lines.extend(
+            f"  {name:<14}{count:>8}" for name, count in self.constructs.items()
+        )
+        lines.append("temporaries:")
+        lines.extend(
+            f"  {name:<24}{count:>8}" for name, count in self.temporaries.items()
+        )
+        lines.append(f"injections:     {', '.join(self.injections) or '-'}")
+        lines.append(
+            f"size:           {self.input_size} -> {self.output_size}"
+            f" ({self.size_ratio:.2f}x)"
+        )
+        lines.append(f"nesting depth:  {self.nesting_depth}")
+        lines.append(
+            f"guarded:        {self.guarded_statements}/{self.statements}"
+            f" ({self.guarded_share:.1%})"
+        )
+        return "\n".join(lines)
+
+
+def convert_with_stats(
+    code: str, filename: str = "<string>", configs: Configs | None = None
+) -> tuple[str, ConversionStats]:
+    """
+    Convert the code like `convert_code_string`,
+    and get the statistics of the conversion
+    """
+    from oneliner.convert import analyze, convert_node
+    from oneliner.utils import unparse_expr
+
+    if configs is None:
+        configs = Configs()
+
+    ast_root = ast.parse(code, filename, "exec")
+    symtable_root = symtable.symtable(code, filename, "exec")
+    nsp_global = analyze(symtable_root, configs)
+    converted = nsp_global.module_wraper(convert_node(ast_root, nsp_global))
+    output = unparse_expr(converted, configs)
+    if configs.output == "compressed":
+        from oneliner.compress import compress_output
+
+        output = compress_output(output, configs)
+
+    constructs = collections.Counter(
+        type(node).__name__ for node in ast.walk(ast_root) if isinstance(node, ast.stmt)
+    )
+    names: set[str] = set()
+    for node in ast.walk(converted):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+    temporaries = collections.Counter(
+        kind
+        for name in names
+        for kind, pattern in _temporary_patterns.items()
+        if pattern.fullmatch(name)
+    )
+    stats = ConversionStats(
+        constructs=dict(constructs.most_common()),
+        temporaries=dict(temporaries.most_common()),
+        injections=[
+            name for name, flag in _injection_flags.items() if getattr(nsp_global, flag)
+        ],
+        input_size=len(code),
+        output_size=len(output),
+        nesting_depth=_get_nesting_depth(converted),
+        guarded_statements=nsp_global.guarded_stmt_cnt,
+    )
+    return output, stats
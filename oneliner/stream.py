@@ -0,0 +1,164 @@
+"""
+Convert huge scripts with bounded memory.
+
+The script is read and split into top-level statements by the tokenizer,
+each statement is parsed, converted, unparsed and written as soon as it
+is read, so only one statement is in memory at a time.
+
+The statements are analyzed one by one. The names of a module-level
+statement only depend on the statement itself, so its symbol table is
+the same as the one from the whole module. The line numbers are shifted
+to the positions in the script (see `NamespaceGlobal.line_offset`).
+
+The output is a flat list of the converted statements, since a chain
+gets deeper with its length. The libraries and presets used by the
+statements are known after all of them are converted, so a slot is
+reserved at the start of the output for them, which is filled at the end.
+An output which is not seekable gets all of the presets instead.
+"""
+
+import ast
+import symtable
+import tokenize
+import typing
+
+import oneliner.utils as utils
+from oneliner.config import Configs
+from oneliner.convert import convert_stmt
+from oneliner.namespaces import NamespaceGlobal, generate_nsp
+from oneliner.pending_nodes import PendingModule
+
+__all__ = ["convert_stream", "iter_statements"]
+
+# the clauses of compound statements which start at the first column
+_continuations = ("else", "elif", "except", "finally")
+
+
+class _Reader(typing.Protocol):
+    def readline(self) -> str: ...
+
+
+def iter_statements(infile: _Reader) -> typing.Iterator[tuple[int, str]]:
+    """
+    Split the script into the sources of the top-level statements,
+    yield the line number where each source starts and the source.
+    Comments and blank lines stay with the next statement.
+    """
+    lines: list[str] = []
+    start = 1  # the line number of lines[0]
+
+    def readline() -> str:
+        line = infile.readline()
+        lines.append(line)
+        return line
+
+    in_statement = False  # the source contains a statement
+    line_start = True  # the next token starts a logical line
+    decorated = False  # the last top-level line is a decorator
+    try:
+        for token in tokenize.generate_tokens(readline):
+            if token.type == tokenize.NEWLINE:
+                line_start = True
+                continue
+            if token.type in (
+                tokenize.NL,
+                tokenize.COMMENT,
+                tokenize.INDENT,
+                tokenize.DEDENT,
+                tokenize.ENDMARKER,
+            ):
+                continue
+            if not line_start:
+                continue
+            line_start = False
+            row, col = token.start
+            if col != 0:
+                continue
+            if in_statement and not decorated and token.string not in _continuations:
+                # the lines before the token are the previous statement
+                yield start, "".join(lines[: row - start])
+                del lines[: row - start]
+                start = row
+            in_statement = True
+            decorated = token.string == "@"
+    except tokenize.TokenError:
+        # let the parser report the error
+        pass
+    yield start, "".join(lines)
+
+
+def _unparse_element(node: ast.expr, configs: Configs) -> str:
+    """Unparse a node as an element of a list"""
+    if configs.unparser == "oneliner":
+        from oneliner.expr_unparse import PREC_EXPR_SLOT, expr_unparse
+
+        return expr_unparse(node, PREC_EXPR_SLOT)
+    return utils.unparse_expr(node, configs)
+
+
+def _get_preamble(nsp_global: NamespaceGlobal, separator: str) -> str:
+    return "".join(
+        _unparse_element(node, nsp_global.configs) + separator
+        for node in PendingModule.get_preamble(nsp_global)
+    )
+
+
+def convert_stream(
+    infile: _Reader,
+    outfile: typing.TextIO,
+    filename: str = "<stream>",
+    configs: Configs | None = None,
+) -> None:
+    """
+    Convert the script read from `infile` and write the result to `outfile`,
+    the result runs like the output of `convert_code_string`
+    """
+    if configs is None:
+        configs = Configs()
+    if configs.output != "plain":
+        raise ValueError("Only the plain output can be streamed")
+    separator = "," if configs.unparser == "oneliner" else ", "
+
+    # the flags of the used libraries and presets of all statements
+    used = generate_nsp(symtable.symtable("", filename, "exec"), configs)
+    for flag in NamespaceGlobal.usage_flags:
+        setattr(used, flag, True)
+    outfile.write("[")
+    seekable = outfile.seekable()
+    if seekable:
+        slot = outfile.tell()
+        slot_size = len(_get_preamble(used, separator))
+        outfile.write(" " * slot_size)
+        for flag in NamespaceGlobal.usage_flags:
+            setattr(used, flag, False)
+    else:
+        outfile.write(_get_preamble(used, separator))
+
+    index = 0  # the index of the statement in the module
+    for first_line, source in iter_statements(infile):
+        try:
+            ast_root = ast.parse(source, filename, "exec")
+            symtable_root = symtable.symtable(source, filename, "exec")
+        except SyntaxError as err:
+            if err.lineno is not None:
+                err.lineno += first_line - 1
+            raise
+        ast.increment_lineno(ast_root, first_line - 1)
+
+        utils.seed_unique_id("namespace", index)
+        nsp_global = generate_nsp(symtable_root, configs)
+        nsp_global.line_offset = first_line - 1
+        for node in ast_root.body:
+            for converted in convert_stmt(index, node, nsp_global):
+                outfile.write(_unparse_element(converted, configs) + separator)
+            index += 1
+        for flag in NamespaceGlobal.usage_flags:
+            if getattr(nsp_global, flag):
+                setattr(used, flag, True)
+    outfile.write("]")
+
+    if seekable:
+        end = outfile.tell()
+        outfile.seek(slot)
+        outfile.write(_get_preamble(used, separator).ljust(slot_size))
+        outfile.seek(end)
@@ -0,0 +1,81 @@
+"""
+Encode str constants as string literals.
+
+Characters are escaped in bulk by `str.translate`,
+with the same escapes as `ascii()` for characters in range(256).
+Other characters are kept as they are, except lone surrogates,
+which can't be encoded by utf-8.
+
+Encoded strings are memoized, since docstrings and templates
+tend to be repeated in the converted scripts. Only short strings are,
+so the caches stay small while converting huge scripts.
+"""
+
+import functools
+import typing
+
+__all__ = ["escape_str", "str_literal", "choose_quote_mark"]
+
+quote_mark_t: typing.TypeAlias = typing.Literal["'", '"']
+
+_escape_table: dict[int, str] = {}
+for _code in range(256):
+    _escaped = ascii(chr(_code))[1:-1]
+    if _escaped != chr(_code):
+        _escape_table[_code] = _escaped
+for _code in range(0xD800, 0xE000):
+    _escape_table[_code] = f"\\u{_code:04x}"
+del _code, _escaped
+
+_quote_escape_tables: dict[str, dict[int, str]] = {
+    "'": {**_escape_table, ord("'"): "\\'"},
+    '"': {**_escape_table, ord('"'): '\\"'},
+}
+
+
+# the longest memoized string
+_MAX_CACHED_LENGTH = 256
+
+
+def _escape_str(string: str, qm: quote_mark_t) -> str:
+    return string.translate(_quote_escape_tables[qm])
+
+
+_escape_str_cached = functools.lru_cache(maxsize=4096)(_escape_str)
+
+
+def escape_str(string: str, qm: quote_mark_t) -> str:
+    """
+    Escape the string to be put between the quote marks `qm`
+    """
+    if len(string) > _MAX_CACHED_LENGTH:
+        return _escape_str(string, qm)
+    return _escape_str_cached(string, qm)
+
+
+def choose_quote_mark(string: str) -> quote_mark_t:
+    """
+    Choose the quote mark that requires less escapes, prefer `'`
+    """
+    if string.count("'") > string.count('"'):
+        return '"'
+    return "'"
+
+
+def _str_literal(string: str, qm: quote_mark_t | None) -> str:
+    if qm is None:
+        qm = choose_quote_mark(string)
+    return f"{qm}{escape_str(string, qm)}{qm}"
+
+
+_str_literal_cached = functools.lru_cache(maxsize=4096)(_str_literal)
+
+
+def str_literal(string: str, qm: quote_mark_t | None = None) -> str:
+    """
+    Get the string literal of the string.
+    If `qm` is None, the quote mark requires less escapes is used.
+    """
+    if len(string) > _MAX_CACHED_LENGTH:
+        return _str_literal(string, qm)
+    return _str_literal_cached(string, qm)
@@ -1,12 +1,33 @@
 import random
+import threading
 import typing
 from ast import *
+from ast import unparse as unparse_ast
 
 from oneliner.config import Configs
 
 
+class _IdRandom(threading.local):
+    # each thread has its own generator,
+    # so concurrent conversions don't reseed each other
+    def __init__(self):
+        self.random = random.Random()
+
+
+_id_random = _IdRandom()
+
+
+def seed_unique_id(*key: object) -> None:
+    """
+    Reseed the generator of unique ids.
+    Seeding with the position of a node in the source makes
+    the generated names independent of the conversion order.
+    """
+    _id_random.random.seed(":".join(map(str, key)))
+
+
 def unique_id() -> str:
-    return "".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=10))
+    return "".join(_id_random.random.choices("abcdefghijklmnopqrstuvwxyz", k=10))
 
 
 def convert_slice(_slice: Slice) -> Call:
@@ -26,11 +47,73 @@ def convert_slice(_slice: Slice) -> Call:
     )
 
 
+def is_pure(node: expr) -> bool:
+    """
+    Check if the expr has no side effects and can't raise,
+    so it can be evaluated again instead of being saved to a tmp
+    """
+    if isinstance(node, Constant):
+        return True
+    if isinstance(node, UnaryOp) and isinstance(node.op, (UAdd, USub)):
+        # `-1` is not folded by the parser
+        return isinstance(node.operand, Constant) and type(node.operand.value) in (
+            int,
+            float,
+            complex,
+        )
+    if isinstance(node, Tuple):
+        return all(is_pure(elt) for elt in node.elts)
+    return False
+
+
+def add_comprehension_ifs(
+    generators: list[comprehension], ifs: list[expr]
+) -> list[comprehension]:
+    """
+    Add "if" clauses to the last generator, which is copied
+    since it can be a node of the script being converted
+    """
+    last = generators[-1]
+    return [
+        *generators[:-1],
+        comprehension(
+            target=last.target,
+            iter=last.iter,
+            ifs=[*last.ifs, *ifs],
+            is_async=last.is_async,
+        ),
+    ]
+
+
 def list_wrapper(nodes: list[expr]) -> expr:
     return List(elts=nodes, ctx=Load())
 
 
-def chain_call_wrapper(nodes: list[expr]) -> expr:
+def chain_call_wrapper(
+    nodes: list[expr], max_depth: int | None = None, runner: expr | None = None
+) -> expr:
+    """
+    Chain the nodes as `runner(a)(b)(c)`.
+    The depth of a chain grows with its length, so when a max_depth is given,
+    longer chains are split into sub-chains of at most max_depth nodes,
+    which are chained again as the arguments of the outer chain.
+    The runner is created by the chain, unless an expr of it is given.
+    """
+    if max_depth is not None:
+        while len(nodes) > max_depth:
+            nodes = [
+                (
+                    _chain_call(nodes[i : i + max_depth], runner)
+                    if len(nodes) - i > 1
+                    else nodes[i]
+                )
+                for i in range(0, len(nodes), max_depth)
+            ]
+    return _chain_call(nodes, runner)
+
+
+def chain_runner() -> expr:
+    """The runner of chains, `(lambda:(_:=lambda __:_))()`"""
     runner_body = NamedExpr(
         target=Name(id="_", ctx=Store()),
         value=Lambda(
@@ -45,7 +128,7 @@ def chain_call_wrapper(nodes: list[expr]) -> expr:
         ),
     )
 
-    runner = Call(
+    return Call(
         func=Lambda(
             args=arguments(
                 posonlyargs=[],
@@ -60,8 +143,10 @@ def chain_call_wrapper(nodes: list[expr]) -> expr:
         keywords=[],
     )
 
+
+def _chain_call(nodes: list[expr], runner: expr | None) -> expr:
     call = Call(
-        func=runner,
+        func=chain_runner() if runner is None else runner,
         args=[nodes[0]],
         keywords=[],
     )
@@ -72,9 +157,10 @@ def chain_call_wrapper(nodes: list[expr]) -> expr:
     return call
 
 
-def get_expr_wrapper(configs: Configs):
+def get_expr_wrapper(configs: Configs, runner: expr | None = None):
     if configs.expr_wrapper == "chain_call":
-        _wrapper_internal = chain_call_wrapper
+        max_depth = configs.max_depth
+        _wrapper_internal = lambda nodes: chain_call_wrapper(nodes, max_depth, runner)
     else:
         _wrapper_internal = list_wrapper
 
@@ -90,6 +176,57 @@ def get_expr_wrapper(configs: Configs):
     return wraper
 
 
+def unparse_expr(node: expr, configs: Configs) -> str:
+    if configs.unparser == "oneliner":
+        from oneliner.expr_unparse import expr_unparse
+
+        return expr_unparse(node)
+    else:
+        return unparse_ast(node).replace("\n", "")
+
+
+def unparse_element(node: expr, configs: Configs) -> str:
+    """Unparse a node as one of the nodes wrapped by the expr_wrapper"""
+    if configs.unparser == "oneliner":
+        from oneliner.expr_unparse import (
+            PREC_CALL_SLOT_ONLYARG,
+            PREC_EXPR_SLOT,
+            expr_unparse,
+        )
+
+        if configs.expr_wrapper == "chain_call":
+            return expr_unparse(node, PREC_CALL_SLOT_ONLYARG)
+        return expr_unparse(node, PREC_EXPR_SLOT)
+    else:
+        return unparse_ast(node).replace("\n", "")
+
+
+def join_elements(elements: list[str], configs: Configs) -> str:
+    """
+    Join the unparsed nodes as the expr_wrapper does.
+    The result is the same as unparsing the wrapped nodes.
+    Joining a single node is not supported,
+    since it is unparsed in a different slot.
+    """
+    assert len(elements) != 1
+    if len(elements) == 0:
+        return unparse_expr(Constant(value=...), configs)
+
+    # the wrapper may split long chains, so each element gets its own slot
+    placeholder = "__ol_slot__"
+    skeleton = unparse_expr(
+        get_expr_wrapper(configs)([Name(id=placeholder) for _ in elements]),
+        configs,
+    )
+    parts = skeleton.split(placeholder)
+    assert len(parts) == len(elements) + 1
+    joined = [parts[0]]
+    for element, part in zip(elements, parts[1:]):
+        joined.append(element)
+        joined.append(part)
+    return "".join(joined)
+
+
 def never_call(*args, **kwargs) -> typing.NoReturn:
     raise RuntimeError("this function should never be called")  # pragma: no cover
 
@@ -0,0 +1,212 @@
+"""
+Lazy lowering of the loops in generator functions.
+
+A converted generator function is a lambda containing the "yield"s,
+which is a generator itself, so the statements between the "yield"s
+run lazily as in the original function.
+But the loops are converted to comprehensions, where "yield" is
+a syntax error. So a loop containing "yield"s is converted to
+`(yield from <generator expression>)`, the generator expression runs
+the body of the loop and produces the yielded values:
+
+- `yield x` at the end of the body is the element of the generator
+  expression, the statements before it run in an "if" clause.
+- Otherwise the body is split into steps, each step runs the statements
+  before a "yield" and makes an iterable of the yielded values,
+  `(x,)` for `yield x`, and the generator expression of an inner loop.
+  The steps run one by one in a generator expression,
+  so the statements after a "yield" don't run before it is consumed.
+
+An assignment expression can't be in the iterable of a comprehension,
+so the iterable of a step is assigned in an "if" clause
+and the next "for" clause loops over the assigned name.
+`send()` doesn't reach the "yield"s in loops, so they can only be
+"yield" statements. The "yield"s out of loops are not changed.
+"""
+
+import typing
+from ast import *
+
+import oneliner.utils as utils
+from oneliner.reserved_identifiers import *
+
+__all__ = ["is_generator", "has_yield", "check_loop_yields", "lazy_block", "lazy_loop"]
+
+_scope_types = (FunctionDef, AsyncFunctionDef, Lambda, ClassDef)
+
+
+def _iter_scope(nodes: typing.Iterable[AST]) -> typing.Iterator[AST]:
+    """Walk the nodes, but not the nodes in their inner scopes"""
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        yield node
+        if not isinstance(node, _scope_types):
+            stack.extend(iter_child_nodes(node))
+
+
+def is_generator(node: FunctionDef) -> bool:
+    """Check if the function is a generator function"""
+    return any(isinstance(n, (Yield, YieldFrom)) for n in _iter_scope(node.body))
+
+
+def has_yield(nodes: typing.Iterable[AST]) -> bool:
+    """Check if the nodes contain "yield"s, not in their inner scopes"""
+    return any(isinstance(n, (Yield, YieldFrom)) for n in _iter_scope(nodes))
+
+
+def check_loop_yields(loop: For | While) -> None:
+    """Check if the "yield"s in the loop are statements"""
+    nodes: list[AST] = [*loop.body, *loop.orelse]
+    if isinstance(loop, While):
+        # the test runs in a lambda, which a "yield" makes a generator
+        nodes.append(loop.test)
+    statements = {
+        id(node.value) for node in _iter_scope(nodes) if isinstance(node, Expr)
+    }
+    for node in _iter_scope(nodes):
+        if isinstance(node, (Yield, YieldFrom)) and id(node) not in statements:
+            raise NotImplementedError(
+                utils.ast_debug_info(node)
+                + "Unable to convert a 'yield' expression in a loop, "
+                "only 'yield' statements are supported"
+            )
+
+
+def _run_then(nodes: list[expr], value: expr) -> expr:
+    """`[*nodes, value][-1]`"""
+    if not nodes:
+        return value
+    return Subscript(
+        value=List(elts=[*nodes, value], ctx=Load()),
+        slice=Constant(value=-1),
+        ctx=Load(),
+    )
+
+
+def _lazy_iter(node: expr) -> expr:
+    """Get the iterable of the values yielded by a converted node"""
+    if not has_yield([node]):
+        if isinstance(node, Constant) and node.value is ...:
+            return Tuple(elts=[], ctx=Load())
+        return _run_then([node], Tuple(elts=[], ctx=Load()))
+    if isinstance(node, Yield):
+        value = Constant(value=None) if node.value is None else node.value
+        return Tuple(elts=[value], ctx=Load())
+    if isinstance(node, YieldFrom):
+        return node.value
+    if isinstance(node, IfExp) and not has_yield([node.test]):
+        # the "if"s and the guards of interrupts
+        return IfExp(
+            test=node.test,
+            body=_lazy_iter(node.body),
+            orelse=_lazy_iter(node.orelse),
+        )
+    raise NotImplementedError(  # pragma: no cover
+        f"Unable to convert the 'yield' in '{type(node).__name__}' lazily"
+    )
+
+
+def _split_steps(nodes: list[expr]) -> list[tuple[list[expr], expr | None]]:
+    """
+    Split the nodes into steps, the nodes before a yielding node
+    and the yielding node. The last step may have no yielding node
+    """
+    steps: list[tuple[list[expr], expr | None]] = []
+    before: list[expr] = []
+    for node in nodes:
+        if has_yield([node]):
+            steps.append((before, node))
+            before = []
+        else:
+            before.append(node)
+    if before:
+        steps.append((before, None))
+    return steps
+
+
+def lazy_block(nodes: list[expr]) -> expr:
+    """
+    Get the iterable of the values yielded by the converted nodes,
+    the nodes run when it is iterated
+    """
+    steps = _split_steps(nodes)
+    if len(steps) == 1:
+        before, node = steps[0]
+        if node is not None:
+            return _run_then(before, _lazy_iter(node))
+
+    step = Name(id=ol_name(OL_YIELD_STEP))
+    step_iter = Name(id=ol_name(OL_YIELD_ITER))
+    value = Name(id=ol_name(OL_YIELD_VALUE))
+    # `step == 0 and [..., (it := ...)] or step == 1 and [...] or ...`,
+    # the lists are never empty, so only the matched step runs
+    dispatch: list[expr] = []
+    for index, (before, node) in enumerate(steps):
+        iterable = Tuple(elts=[], ctx=Load()) if node is None else _lazy_iter(node)
+        run = List(
+            elts=[*before, NamedExpr(target=step_iter, value=iterable)], ctx=Load()
+        )
+        if index == len(steps) - 1:
+            dispatch.append(run)
+            break
+        match_step = Compare(left=step, ops=[Eq()], comparators=[Constant(value=index)])
+        dispatch.append(BoolOp(op=And(), values=[match_step, run]))
+    return GeneratorExp(
+        elt=value,
+        generators=[
+            comprehension(
+                target=step,
+                iter=Call(
+                    func=Name(id="range", ctx=Load()),
+                    args=[Constant(value=len(steps))],
+                    keywords=[],
+                ),
+                ifs=[BoolOp(op=Or(), values=dispatch)],
+                is_async=0,
+            ),
+            comprehension(target=value, iter=step_iter, ifs=[], is_async=0),
+        ],
+    )
+
+
+def lazy_loop(generators: list[comprehension], body: list[expr]) -> expr:
+    """
+    Convert a loop with "yield"s in its body
+    to `(yield from <generator expression>)`
+    """
+    steps = _split_steps(body)
+    if len(steps) == 1 and steps[0][1] is not None:
+        before, node = steps[0]
+        # `for ...: [stmts; ][if test: ]yield x` is `(x for ... if [stmts] if test)`
+        tests: list[expr] = []
+        while (
+            isinstance(node, IfExp)
+            and isinstance(node.orelse, Constant)
+            and node.orelse.value is ...
+            and not has_yield([node.test])
+        ):
+            tests.append(node.test)
+            node = node.body
+        if isinstance(node, Yield):
+            if before:
+                tests.insert(0, List(elts=before, ctx=Load()))
+            generators = utils.add_comprehension_ifs(generators, tests)
+            value = Constant(value=None) if node.value is None else node.value
+            return YieldFrom(value=GeneratorExp(elt=value, generators=generators))
+
+    body_iter = Name(id=ol_name(OL_YIELD_ITER))
+    value = Name(id=ol_name(OL_YIELD_VALUE))
+    generators = utils.add_comprehension_ifs(
+        generators,
+        [List(elts=[NamedExpr(target=body_iter, value=lazy_block(body))], ctx=Load())],
+    )
+    return YieldFrom(
+        value=GeneratorExp(
+            elt=value,
+            generators=[
+                *generators,
+                comprehension(target=value, iter=body_iter, ifs=[], is_async=0),
+            ],
+        )
+    )
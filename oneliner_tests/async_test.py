@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import unittest
+import unittest.mock
+
+import oneliner
+import oneliner.async_convert
+from oneliner.async_convert import AsyncConverter, ConversionQueueFull
+
+script = "for i in range(3):\n    print(i)\n"
+
+
+class TestAsyncConvert(unittest.IsolatedAsyncioTestCase):
+    async def test_convert_async(self):
+        self.assertEqual(
+            await oneliner.convert_async(script), oneliner.convert_code_string(script)
+        )
+
+    async def test_latency(self):
+        latencies = []
+        async with AsyncConverter(on_latency=latencies.append) as converter:
+            results = await asyncio.gather(
+                *(converter.convert(script) for _ in range(5))
+            )
+        self.assertEqual(set(results), {oneliner.convert_code_string(script)})
+        self.assertEqual(len(latencies), 5)
+        self.assertEqual(list(converter.latencies), latencies)
+        for latency in latencies:
+            self.assertGreaterEqual(latency.total, latency.running)
+            self.assertAlmostEqual(latency.total, latency.queued + latency.running)
+
+    async def test_process_executor(self):
+        async with AsyncConverter("process", max_workers=1) as converter:
+            self.assertEqual(
+                await converter.convert(script), oneliner.convert_code_string(script)
+            )
+
+
+class TestAsyncConvertLimits(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # block the conversions until the event is set
+        self.event = threading.Event()
+        convert = oneliner.async_convert._convert
+
+        self.active = self.max_active = 0
+        lock = threading.Lock()
+
+        def blocked_convert(*args):
+            nonlocal lock
+            with lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            self.event.wait()
+            with lock:
+                self.active -= 1
+            return convert(*args)
+
+        self.patcher = unittest.mock.patch.object(
+            oneliner.async_convert, "_convert", blocked_convert
+        )
+        self.patcher.start()
+        self.converter = AsyncConverter(max_workers=2, max_queue=2)
+
+    async def asyncTearDown(self):
+        self.event.set()
+        self.converter.close()
+        self.patcher.stop()
+
+    async def wait_until(self, predicate):
+        # the executor threads may start slowly on a busy machine
+        for _ in range(500):
+            if predicate():
+                return
+            await asyncio.sleep(0.01)
+
+    async def test_back_pressure(self):
+        tasks = [asyncio.create_task(self.converter.convert(script)) for _ in range(4)]
+        await self.wait_until(lambda: self.converter.running == 2)
+        self.assertEqual(self.converter.running, 2)
+        self.assertEqual(self.converter.waiting, 2)
+        with self.assertRaises(ConversionQueueFull):
+            await self.converter.convert(script)
+
+        self.event.set()
+        results = await asyncio.gather(*tasks)
+        self.assertEqual(set(results), {oneliner.convert_code_string(script)})
+        self.assertEqual(self.converter.running, 0)
+
+    async def test_cancel(self):
+        tasks = [asyncio.create_task(self.converter.convert(script)) for _ in range(3)]
+        await self.wait_until(lambda: self.converter.waiting == 1)
+
+        # cancel a waiting request
+        tasks[2].cancel()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.converter.waiting, 0)
+
+        # a running conversion keeps its slot until it finishes
+        tasks[0].cancel()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.converter.running, 2)
+
+        self.event.set()
+        self.assertEqual(await tasks[1], oneliner.convert_code_string(script))
+        for task in tasks[0], tasks[2]:
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.converter.running, 0)
+
+    async def test_event_loops_share_limits(self):
+        # two requests on another event loop in another thread
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever)
+        thread.start()
+        try:
+            other = [
+                asyncio.run_coroutine_threadsafe(
+                    self.converter.convert(script), other_loop
+                )
+                for _ in range(2)
+            ]
+            await self.wait_until(lambda: self.converter.running == 2)
+            tasks = [
+                asyncio.create_task(self.converter.convert(script)) for _ in range(2)
+            ]
+            await self.wait_until(lambda: self.converter.waiting == 2)
+            self.assertEqual(self.converter.running, 2)
+            self.assertEqual(self.converter.waiting, 2)
+            with self.assertRaises(ConversionQueueFull):
+                await self.converter.convert(script)
+
+            self.event.set()
+            results = await asyncio.gather(*tasks, *map(asyncio.wrap_future, other))
+            self.assertEqual(set(results), {oneliner.convert_code_string(script)})
+            self.assertEqual(self.max_active, 2)
+            self.assertEqual(self.converter.running, 0)
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
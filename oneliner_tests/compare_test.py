@@ -0,0 +1,40 @@
+import contextlib
+import io
+import math
+import unittest
+
+from oneliner.bench.compare import compare, mann_whitney_greater
+
+baseline = [1.0, 1.02, 0.98, 1.01, 0.99, 1.03, 0.97]
+
+
+class TestCompare(unittest.TestCase):
+    def test_mann_whitney(self):
+        slower = [2.0, 3.0, 4.0, 5.0, 6.0]
+        faster = [0.1, 0.2, 0.3, 0.4, 0.5]
+        # all of the orderings but one have a smaller U
+        self.assertAlmostEqual(
+            mann_whitney_greater(slower, faster), 1 / math.comb(10, 5)
+        )
+        self.assertEqual(mann_whitney_greater(faster, slower), 1.0)
+        self.assertGreater(mann_whitney_greater(baseline, baseline), 0.4)
+        # the normal approximation for the large samples
+        self.assertLess(mann_whitney_greater(slower * 10, faster * 10), 1e-6)
+        self.assertGreater(mann_whitney_greater(faster * 10, slower * 10), 0.99)
+
+    def compare(self, current: list[float]) -> list[str]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return compare(
+                {"bench": current, "new": current},
+                {"bench": baseline},
+                tolerance=0.1,
+                alpha=0.05,
+            )
+
+    def test_gate(self):
+        self.assertEqual(self.compare([t * 1.3 for t in baseline]), ["bench"])
+        # within the tolerance
+        self.assertEqual(self.compare([t * 1.05 for t in baseline]), [])
+        self.assertEqual(self.compare([t * 0.5 for t in baseline]), [])
+        # slower median, but not significant
+        self.assertEqual(self.compare([0.5, 0.6, 2.0, 2.0]), [])
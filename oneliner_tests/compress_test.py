@@ -0,0 +1,133 @@
+import io
+import marshal
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import oneliner
+from oneliner.stream import convert_stream
+
+test_cases_dir = os.path.join(os.path.split(__file__)[0], "test_cases")
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        patcher = unittest.mock.patch.dict(os.environ, ONELINER_CACHE=self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def run_script(self, code: str) -> str:
+        output = io.StringIO()
+        _print = lambda *args, **kwargs: print(*args, file=output, **kwargs)
+        exec(code, {"print": _print, "__builtins__": __builtins__})
+        return output.getvalue()
+
+    def test_test_cases(self):
+        for test_case_filename in sorted(os.listdir(test_cases_dir)):
+            with open(
+                os.path.join(test_cases_dir, test_case_filename), encoding="utf8"
+            ) as f:
+                script = f.read()
+            try:
+                expected = self.run_script(script)
+            except NameError:
+                # the test case needs the globals of its test
+                continue
+            for compression in ("zlib", "lzma"):
+                with self.subTest(test_case_filename, compression=compression):
+                    output = oneliner.convert_code_string(
+                        script,
+                        configs=oneliner.Configs(
+                            output="compressed", compression=compression
+                        ),
+                    )
+                    self.assertEqual(len(output.splitlines()), 1)
+                    # compiled, then loaded from the cache
+                    self.assertEqual(self.run_script(output), expected)
+                    self.assertEqual(self.run_script(output), expected)
+
+    def test_cache(self):
+        output = oneliner.convert_code_string(
+            "print('hello')", configs=oneliner.Configs(output="compressed")
+        )
+        self.assertEqual(self.run_script(output), "hello\n")
+        (cached,) = os.listdir(self.cache_dir)
+        # the next runs use the cached code object
+        with open(os.path.join(self.cache_dir, cached), "wb") as f:
+            f.write(marshal.dumps(compile("print('cached')", "<test>", "exec")))
+        self.assertEqual(self.run_script(output), "cached\n")
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "the cache needs os.getuid")
+    def test_untrusted_cache(self):
+        output = oneliner.convert_code_string(
+            "print('hello')", configs=oneliner.Configs(output="compressed")
+        )
+        self.assertEqual(self.run_script(output), "hello\n")
+        (cached,) = os.listdir(self.cache_dir)
+        cached = os.path.join(self.cache_dir, cached)
+        self.assertEqual(os.stat(cached).st_mode & 0o777, 0o600)
+
+        with open(cached, "wb") as f:
+            f.write(marshal.dumps(compile("print('injected')", "<test>", "exec")))
+        # a cached file writable by the others is not loaded
+        os.chmod(cached, 0o666)
+        self.assertEqual(self.run_script(output), "hello\n")
+        # but replaced
+        self.assertEqual(os.stat(cached).st_mode & 0o777, 0o600)
+
+        with open(cached, "wb") as f:
+            f.write(marshal.dumps(compile("print('injected')", "<test>", "exec")))
+        # neither is a cache directory writable by the others
+        os.chmod(self.cache_dir, 0o777)
+        self.assertEqual(self.run_script(output), "hello\n")
+
+    @unittest.skipIf(
+        not hasattr(os, "geteuid") or os.geteuid() == 0,
+        "the permissions don't apply to root",
+    )
+    def test_read_only_cache(self):
+        output = oneliner.convert_code_string(
+            "print('hello')", configs=oneliner.Configs(output="compressed")
+        )
+        os.makedirs(self.cache_dir)
+        os.chmod(self.cache_dir, 0o500)
+        self.addCleanup(os.chmod, self.cache_dir, 0o700)
+        self.assertEqual(self.run_script(output), "hello\n")
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_failed_cache_write(self):
+        output = oneliner.convert_code_string(
+            "print('hello')", configs=oneliner.Configs(output="compressed")
+        )
+        with unittest.mock.patch("os.open", side_effect=PermissionError):
+            self.assertEqual(self.run_script(output), "hello\n")
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        # cached by the next run
+        self.assertEqual(self.run_script(output), "hello\n")
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_unwritable_cache(self):
+        cache_dir = os.path.join(self.tmp_dir.name, "missing", "cache")
+        output = oneliner.convert_code_string(
+            "print('hello')", configs=oneliner.Configs(output="compressed")
+        )
+        with unittest.mock.patch.dict(os.environ, ONELINER_CACHE=cache_dir):
+            self.assertEqual(self.run_script(output), "hello\n")
+        self.assertFalse(os.path.exists(cache_dir))
+
+    def test_size(self):
+        script = "".join(f"def f{i}(x):\n    return x + {i}\n" for i in range(200))
+        plain = oneliner.convert_code_string(script)
+        compressed = oneliner.convert_code_string(
+            script, configs=oneliner.Configs(output="compressed")
+        )
+        self.assertLess(len(compressed), len(plain) / 3)
+
+    def test_plain_only(self):
+        configs = oneliner.Configs(output="compressed")
+        with self.assertRaises(ValueError):
+            convert_stream(io.StringIO("x = 1\n"), io.StringIO(), configs=configs)
@@ -0,0 +1,86 @@
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+import oneliner.importer
+from oneliner.importer import OnelinerLoader
+
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        sys.path.insert(0, self.tmp_dir.name)
+        self.finder = oneliner.importer.install(
+            suffixes=[".olpy"], packages=["ol_test_pkg"]
+        )
+        self.dont_write_bytecode = sys.dont_write_bytecode
+        sys.dont_write_bytecode = False
+
+    def tearDown(self):
+        sys.dont_write_bytecode = self.dont_write_bytecode
+        oneliner.importer.uninstall(self.finder)
+        sys.path.remove(self.tmp_dir.name)
+        for name in list(sys.modules):
+            if name.startswith("ol_test_"):
+                del sys.modules[name]
+        self.tmp_dir.cleanup()
+
+    def write_file(self, filename: str, source: str):
+        filename = os.path.join(self.tmp_dir.name, filename)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, "w", encoding="utf8") as f:
+            f.write(source)
+
+    def reimport(self, name: str):
+        for module_name in list(sys.modules):
+            if module_name.startswith("ol_test_"):
+                del sys.modules[module_name]
+        importlib.invalidate_caches()
+        return importlib.import_module(name)
+
+    def test_suffix(self):
+        self.write_file("ol_test_mod.olpy", "def f(x):\n    return x * 2\ny = f(21)\n")
+        module = importlib.import_module("ol_test_mod")
+        self.assertEqual(module.y, 42)
+        self.assertIsInstance(module.__loader__, OnelinerLoader)
+        self.assertIn(".oneliner-", module.__cached__)
+        self.assertTrue(os.path.isfile(module.__cached__))
+
+    def test_package_allow_list(self):
+        self.write_file("ol_test_pkg/__init__.py", "from . import sub\n")
+        self.write_file("ol_test_pkg/sub.py", "z = 0\nfor i in range(3):\n    z += i\n")
+        self.write_file("ol_test_other.py", "z = 1\n")
+        module = importlib.import_module("ol_test_pkg.sub")
+        self.assertEqual(module.z, 3)
+        self.assertIsInstance(module.__loader__, OnelinerLoader)
+        self.assertIsInstance(sys.modules["ol_test_pkg"].__loader__, OnelinerLoader)
+        other = importlib.import_module("ol_test_other")
+        self.assertNotIsInstance(other.__loader__, OnelinerLoader)
+
+    def test_cache(self):
+        self.write_file("ol_test_cached.olpy", "value = 'first'\n")
+        self.assertEqual(importlib.import_module("ol_test_cached").value, "first")
+
+        # loaded from the cache without converting
+        with unittest.mock.patch.object(
+            OnelinerLoader, "source_to_code", side_effect=AssertionError
+        ):
+            self.assertEqual(self.reimport("ol_test_cached").value, "first")
+
+        # the size of the source changes
+        self.write_file("ol_test_cached.olpy", "value = 'second'\n")
+        self.assertEqual(self.reimport("ol_test_cached").value, "second")
+
+    def test_cache_keyed_by_configs(self):
+        loader_a = OnelinerLoader("m", "m.py", oneliner.Configs())
+        loader_b = OnelinerLoader("m", "m.py", oneliner.Configs(expr_wrapper="list"))
+        self.assertNotEqual(
+            loader_a.get_cache_path("m.py"), loader_b.get_cache_path("m.py")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
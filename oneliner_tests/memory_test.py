@@ -0,0 +1,23 @@
+import unittest
+
+from oneliner.bench.memory import bytes_per_line, generate_script, measure_phases
+
+# about 5.2k-5.9k bytes per line on python 3.10-3.13,
+# see `python -m oneliner.bench memory`
+max_bytes_per_line = 8000
+
+
+class TestMemory(unittest.TestCase):
+    def test_bytes_per_line(self):
+        script = generate_script(30)
+        memory = measure_phases(script)
+        self.assertEqual(
+            [phase.phase for phase in memory],
+            ["parse", "symtable", "analyze", "convert", "unparse"],
+        )
+        per_line = bytes_per_line(script, memory)
+        self.assertLess(
+            per_line,
+            max_bytes_per_line,
+            "The memory of the conversion per source line regressed",
+        )
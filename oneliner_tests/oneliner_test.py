@@ -1,3 +1,6 @@
+import ast
+import os
+import tracemalloc
 import unittest
 
 import oneliner_test_utils as test_utils
@@ -172,3 +175,528 @@ class TestClassMetaclass(test_utils.OnelinerTestCaseBase):
 
 class Testimport(test_utils.OnelinerTestCaseBase):
     test_case_filename = "import.py"
+
+
+class TestTemporaries(test_utils.OnelinerTestCaseBase):
+    test_case_filename = "temporaries.py"
+
+    def test_eliminated(self):
+        for script in (
+            "a, (b, c) = f(), (1, -2)\n",
+            "a[0] += 1\n",
+            "a[-1, 2] += 1\n",
+            "from os import path\n",
+            "a = b = 1\n",
+        ):
+            with self.subTest(script):
+                output = oneliner.convert_code_string(script)
+                self.assertNotIn("__ol_assign_", output)
+                self.assertNotIn("__ol_sllice_", output)
+                self.assertNotIn("__ol_mod_", output)
+
+    def test_kept(self):
+        for script, tmp in (
+            # the values are evaluated before the assignments
+            ("a, b = b, a\n", "__ol_assign_"),
+            ("a[f()], b = g(), 0\n", "__ol_assign_"),
+            ("a, *b = 1, 2\n", "__ol_assign_"),
+            ("a = b = f()\n", "__ol_assign_"),
+            ("a[i] += 1\n", "__ol_sllice_"),
+            ("from os import path, sep\n", "__ol_mod_"),
+        ):
+            with self.subTest(script):
+                self.assertIn(tmp, oneliner.convert_code_string(script))
+
+
+class TestNestedLoop(test_utils.OnelinerTestCaseBase):
+    test_case_filename = "nested_loop.py"
+
+
+class TestUnpackInLoop(test_utils.OnelinerTestCaseBase):
+    test_case_filename = "unpack_in_loop.py"
+
+    def test_unpacked_by_comprehension(self):
+        script = (
+            "def f(pairs):\n"
+            "    for pair in pairs:\n"
+            "        a, (b, *c) = pair\n"
+            "        print(a, b, c)\n"
+        )
+        output = oneliner.convert_code_string(script)
+        self.assertIn("for a, (b, *c) in [pair]", output)
+        self.assertNotIn("__ol_assign_", output)
+
+
+class TestGenerator(test_utils.OnelinerTestCaseBase):
+    test_case_filename = "generator.py"
+
+    def test_streaming(self):
+        script = (
+            "def parse(n):\n"
+            "    for i in range(n):\n"
+            "        line = str(i)\n"
+            "        yield len(line)\n"
+            "def total(n):\n"
+            "    count = 0\n"
+            "    for length in parse(n):\n"
+            "        count += length\n"
+            "    return count\n"
+            "result = total(200000)\n"
+        )
+        output = oneliner.convert_code_string(script)
+        self.assertIn("yield from (", output)
+
+        # the values are not collected in lists
+        tracemalloc.start()
+        try:
+            result = self.run_code(output)["result"]
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(result, sum(len(str(i)) for i in range(200000)))
+        self.assertLess(peak, 500_000)
+
+    def test_yield_expression_in_loop(self):
+        script = "def f():\n    while True:\n        x = yield\n"
+        with self.assertRaises(NotImplementedError):
+            oneliner.convert_code_string(script)
+
+    def test_yield_in_while_test(self):
+        script = (
+            "def g():\n"
+            "    n = 0\n"
+            "    while (yield n) is None:\n"
+            "        n += 1\n"
+            "        if n > 3:\n"
+            "            break\n"
+        )
+        with self.assertRaises(NotImplementedError):
+            oneliner.convert_code_string(script)
+
+
+class TestControlFlow(test_utils.OnelinerTestCaseBase):
+    test_case_filename = "control_flow.py"
+
+    def test_no_flags(self):
+        script = (
+            "def f(x):\n"
+            "    if x:\n"
+            "        return 1\n"
+            "    print(x)\n"
+            "    return\n"
+            "for i in range(3):\n"
+            "    if i:\n"
+            "        print(i)\n"
+            "        continue\n"
+            "    print(-i)\n"
+        )
+        output = oneliner.convert_code_string(script)
+        self.assertNotIn("__ol_ret_", output)
+        self.assertNotIn("__ol_interrupt_", output)
+
+    def test_guards_kept(self):
+        # the loop may or may not return
+        script = (
+            "def f(x):\n"
+            "    for i in x:\n"
+            "        if i:\n"
+            "            return i\n"
+            "    print(x)\n"
+        )
+        self.assertIn("__ol_ret_", oneliner.convert_code_string(script))
+
+
+class TestParallel(unittest.TestCase):
+    def test_parallel_output_identical(self):
+        test_cases_dir = os.path.join(os.path.split(__file__)[0], "test_cases")
+        for test_case_filename in sorted(os.listdir(test_cases_dir)):
+            with self.subTest(test_case_filename):
+                with open(
+                    os.path.join(test_cases_dir, test_case_filename), encoding="utf8"
+                ) as f:
+                    script = f.read()
+                self.assertEqual(
+                    oneliner.convert_code_string(script),
+                    oneliner.convert_code_string(script, jobs=2),
+                )
+
+
+class TestExprTransform(unittest.TestCase):
+    def get_namespaces(self, script: str):
+        import symtable
+
+        from oneliner.namespaces import generate_nsp
+
+        nsp_global = generate_nsp(
+            symtable.symtable(script, "<string>", "exec"), oneliner.Configs()
+        )
+        return nsp_global, nsp_global.inner_nsp[0].inner_nsp[0]
+
+    def test_input_unchanged(self):
+        import symtable
+
+        from oneliner.convert import convert
+
+        test_cases_dir = os.path.join(os.path.split(__file__)[0], "test_cases")
+        scripts = {
+            "inner_comprehension": (
+                "def f():\n"
+                "    out = []\n"
+                "    for i in range(2):\n"
+                "        [out.append(j) for j in range(2)]\n"
+            ),
+            "lazy_loop": (
+                "def g(pairs):\n"
+                "    for a, b in pairs:\n"
+                "        if a:\n"
+                "            yield b\n"
+            ),
+        }
+        for test_case_filename in sorted(os.listdir(test_cases_dir)):
+            with open(
+                os.path.join(test_cases_dir, test_case_filename), encoding="utf8"
+            ) as f:
+                scripts[test_case_filename] = f.read()
+        for name, script in scripts.items():
+            with self.subTest(name):
+                root = ast.parse(script)
+                before = ast.dump(root)
+                convert(
+                    root,
+                    symtable.symtable(script, "<string>", "exec"),
+                    oneliner.Configs(),
+                )
+                # the reused nodes of the script are not modified
+                self.assertEqual(ast.dump(root), before)
+
+    def test_plain_expr_reused(self):
+        from oneliner.expr_transform import expr_transf
+
+        nsp_global, nsp_inner = self.get_namespaces(
+            "def f():\n    a = 1\n    def g():\n        nonlocal a\n"
+        )
+        node = ast.parse("[b + 1, {'k': (c := b)}]", mode="eval").body
+        self.assertIs(expr_transf(nsp_global, node), node)
+        self.assertIs(expr_transf(nsp_inner, node), node)
+
+    def test_changed_path_rebuilt(self):
+        from oneliner.expr_transform import expr_transf
+
+        _, nsp_inner = self.get_namespaces(
+            "def f():\n    a = 1\n    def g():\n        nonlocal a\n"
+        )
+        node = ast.parse("[a + 1, (b, c)]", mode="eval").body
+        result = expr_transf(nsp_inner, node)
+        self.assertIsNot(result, node)
+        self.assertIsInstance(result.elts[0].left, ast.Subscript)
+        # the unchanged sibling is shared
+        self.assertIs(result.elts[1], node.elts[1])
+
+
+class TestBundle(unittest.TestCase):
+    package_files = {
+        "__init__.py": "from . import core\nVERSION = '1.0'\n",
+        "core.py": (
+            "from tool.sub import helpers\n"
+            "import tool.sub.helpers\n"
+            "def run(name):\n"
+            "    return helpers.greet(name) + str(tool.sub.helpers is helpers)\n"
+        ),
+        "sub/__init__.py": "",
+        "sub/helpers.py": (
+            "from .. import sub\n"
+            "def greet(name):\n"
+            "    return f'hello {name} from {__name__} '\n"
+        ),
+        "__main__.py": (
+            "import sys\n"
+            "from . import core, VERSION\n"
+            "print(core.run('world'), VERSION)\n"
+            "print(sorted(m for m in sys.modules if m.startswith('tool')))\n"
+        ),
+    }
+
+    def test_bundle(self):
+        import subprocess
+        import sys
+        import tempfile
+
+        from oneliner.bundle import bundle_package
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            package_dir = os.path.join(tmp_dir, "src", "tool")
+            for filename, source in self.package_files.items():
+                filename = os.path.join(package_dir, filename)
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                with open(filename, "w", encoding="utf8") as f:
+                    f.write(source)
+
+            bundle_filename = os.path.join(tmp_dir, "tool.py")
+            with open(bundle_filename, "w", encoding="utf8") as f:
+                f.write(bundle_package(package_dir))
+
+            # the package is not importable from tmp_dir
+            process = subprocess.run(
+                [sys.executable, bundle_filename],
+                cwd=tmp_dir,
+                capture_output=True,
+                text=True,
+            )
+        self.assertEqual(process.stderr, "")
+        self.assertEqual(
+            process.stdout.splitlines(),
+            [
+                "hello world from tool.sub.helpers True 1.0",
+                "['tool', 'tool.core', 'tool.sub', 'tool.sub.helpers']",
+            ],
+        )
+
+    def test_import_on_demand(self):
+        import subprocess
+        import sys
+        import tempfile
+
+        from oneliner.bundle import bundle_package
+
+        package_files = {
+            "__init__.py": "print('init')\n",
+            "unused.py": "print('unused')\n",
+            "broken.py": "print(1 / 0)\n",
+            "late.py": "print('late', __name__, __file__, __package__)\n",
+            "__main__.py": (
+                "print('main')\n" "from . import late\n" "import tool.late\n"
+            ),
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            package_dir = os.path.join(tmp_dir, "src", "tool")
+            os.makedirs(package_dir)
+            for filename, source in package_files.items():
+                with open(
+                    os.path.join(package_dir, filename), "w", encoding="utf8"
+                ) as f:
+                    f.write(source)
+
+            bundle_filename = os.path.join(tmp_dir, "tool.py")
+            with open(bundle_filename, "w", encoding="utf8") as f:
+                f.write(bundle_package(package_dir))
+            process = subprocess.run(
+                [sys.executable, bundle_filename],
+                cwd=tmp_dir,
+                capture_output=True,
+                text=True,
+            )
+        self.assertEqual(process.stderr, "")
+        # the modules run when they are imported, once,
+        # and the modules which are not imported don't run
+        self.assertEqual(
+            process.stdout.splitlines(),
+            [
+                "main",
+                "init",
+                f"late tool.late {os.path.join('tool', 'late.py')} tool",
+            ],
+        )
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_lazy_import(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, oneliner\n"
+            "print(sorted(m for m in sys.modules if m.startswith('oneliner')))\n"
+            "oneliner.Configs\n"
+            "print('oneliner.config' in sys.modules)\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        loaded, config_loaded = proc.stdout.splitlines()
+        self.assertEqual(loaded, "['oneliner', 'oneliner.version']")
+        self.assertEqual(config_loaded, "True")
+
+        with self.assertRaises(AttributeError):
+            oneliner.no_such_attribute
+
+    def test_not_hidden_by_submodule(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import oneliner\n"
+            "oneliner.convert_code_string('x = 1')\n"
+            "print(callable(oneliner.convert), callable(oneliner.expr_unparse))\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(proc.stdout, "True True\n")
+
+    def test_expr_unparse(self):
+        node = ast.parse("(a, b)", mode="eval").body
+        self.assertEqual(oneliner.expr_unparse(node), "(a,b)")
+
+
+class TestConfigs(unittest.TestCase):
+    def test_per_instance(self):
+        cfg_list = oneliner.Configs(expr_wrapper="list")
+        cfg_default = oneliner.Configs()
+        self.assertEqual(cfg_list.expr_wrapper, "list")
+        self.assertEqual(cfg_default.expr_wrapper, "chain_call")
+        self.assertEqual(oneliner.Configs.expr_wrapper.default, "chain_call")
+        with self.assertRaises(ValueError):
+            cfg_default.expr_wrapper = "x"
+        self.assertEqual(cfg_default.expr_wrapper, "chain_call")
+
+    def test_threads(self):
+        import concurrent.futures
+
+        script = "x = 1\nif x:\n    print(x)\n"
+        configs = [
+            oneliner.Configs(expr_wrapper=expr_wrapper, if_style=if_style)
+            for expr_wrapper in ("list", "chain_call")
+            for if_style in ("if_expr", "short_circuit")
+        ]
+        expected = [oneliner.convert_code_string(script, configs=c) for c in configs]
+        self.assertEqual(len(set(expected)), len(configs))
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            results = list(
+                executor.map(
+                    lambda cfg: oneliner.convert_code_string(script, configs=cfg),
+                    configs * 8,
+                )
+            )
+        self.assertEqual(results, expected * 8)
+
+
+class TestTargetVersion(unittest.TestCase):
+    script = (
+        "def count(n):\n"
+        "    i = 0\n"
+        "    while i < n:\n"
+        "        i = i + 1\n"
+        "        if i == 3:\n"
+        "            break\n"
+        "        for j in range(i):\n"
+        "            print(i, j)\n"
+        "    else:\n"
+        "        print('else')\n"
+        "count(2)\n"
+        "count(5)\n"
+    )
+
+    def run_script(self, script: str) -> str:
+        import contextlib
+        import io
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            exec(script, {})
+        return out.getvalue()
+
+    def test_lowerings(self):
+        from oneliner.config import target_versions
+
+        expected = self.run_script(self.script)
+        for target_version in target_versions:
+            for expr_wrapper in ("list", "chain_call"):
+                configs = oneliner.Configs(
+                    target_version=target_version, expr_wrapper=expr_wrapper
+                )
+                output = oneliner.convert_code_string(self.script, configs=configs)
+                self.assertEqual(self.run_script(output), expected)
+                self.assertEqual(
+                    "itertools.takewhile" in output,
+                    configs.target_version_info < (3, 12),
+                )
+
+    def test_chain_runner(self):
+        output = oneliner.convert_code_string(self.script)
+        # the runner is created once, by the module
+        self.assertEqual(output.count("lambda __:"), 2)
+        self.assertIn("__ol_chain(", output)
+        output = oneliner.convert_code_string(
+            self.script, configs=oneliner.Configs(expr_wrapper="list")
+        )
+        self.assertNotIn("__ol_chain", output)
+
+    def test_config(self):
+        import sys
+
+        from oneliner.config import parse_config_args
+
+        configs = parse_config_args(["target_version=3.12"])
+        self.assertEqual(configs.target_version_info, (3, 12))
+        with self.assertRaises(ValueError):
+            oneliner.Configs(target_version="3.9")
+        self.assertEqual(
+            oneliner.Configs().target_version_info,
+            min(sys.version_info[:2], (3, 14)),
+        )
+
+
+class TestMaxDepth(unittest.TestCase):
+    def run_script(self, script: str, configs: oneliner.Configs) -> str:
+        import contextlib
+        import io
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            exec(oneliner.convert_code_string(script, configs=configs), {})
+        return out.getvalue()
+
+    def test_long_chain(self):
+        script = "".join(f"x{i} = {i}\n" for i in range(2000)) + "print(x1999)\n"
+        for unparser in ("ast.unparse", "oneliner"):
+            configs = oneliner.Configs(unparser=unparser)
+            self.assertEqual(self.run_script(script, configs), "1999\n")
+        # the joined output of the workers is split in the same way
+        configs = oneliner.Configs(max_depth=4)
+        script = "".join(f"def f{i}(): pass\n" for i in range(20))
+        self.assertEqual(
+            oneliner.convert_code_string(script, configs=configs),
+            oneliner.convert_code_string(script, configs=configs, jobs=2),
+        )
+
+    def test_guards(self):
+        script = (
+            "def f(x):\n"
+            + "".join(
+                f"    if x == {i}:\n        return {i}\n    print({i})\n"
+                for i in range(300)
+            )
+            + "f(5)\n"
+            + "for x in range(3):\n"
+            + "".join(
+                f"    if x == {i}:\n        continue\n    print('c', {i})\n"
+                for i in range(300)
+            )
+        )
+        # `continue` at `i == x` skips the rest of the prints
+        expected = "".join(f"{i}\n" for i in range(5)) + "c 0\nc 0\nc 1\n"
+        for max_depth in (2, 32, 1000):
+            configs = oneliner.Configs(max_depth=max_depth, unparser="oneliner")
+            if max_depth == 1000:
+                with self.assertRaises((SyntaxError, MemoryError, RecursionError)):
+                    self.run_script(script, configs)
+            else:
+                self.assertEqual(self.run_script(script, configs), expected)
+
+    def test_elif_chain(self):
+        script = (
+            "x = 250\nif x == -1:\n    print(-1)\n"
+            + "".join(f"elif x == {i}:\n    print({i})\n" for i in range(300))
+            + "else:\n    print('else')\n"
+        )
+        configs = oneliner.Configs(if_style="short_circuit", unparser="oneliner")
+        self.assertEqual(self.run_script(script, configs), "250\n")
+
+    def test_config(self):
+        from oneliner.config import parse_config_args
+
+        self.assertEqual(parse_config_args(["max_depth=8"]).max_depth, 8)
+        with self.assertRaises(ValueError):
+            oneliner.Configs(max_depth=1)
+        with self.assertRaises(ValueError):
+            oneliner.Configs(max_depth="x")
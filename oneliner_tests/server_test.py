@@ -0,0 +1,144 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+import oneliner
+from oneliner.client import ConversionClient, ConversionError
+from oneliner.server import ConversionServer
+
+script = "for i in range(3):\n    print(i)\n"
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.server = ConversionServer()
+
+    def request(self, request) -> dict:
+        return json.loads(self.server.handle_line(json.dumps(request)))
+
+    def test_convert(self):
+        response = self.request(
+            {"id": 1, "source": script, "configs": {"expr_wrapper": "list"}}
+        )
+        self.assertEqual(
+            response,
+            {
+                "id": 1,
+                "ok": True,
+                "output": oneliner.convert_code_string(
+                    script, configs=oneliner.Configs(expr_wrapper="list")
+                ),
+            },
+        )
+
+    def test_errors(self):
+        response = self.request({"id": "a", "source": "x = ("})
+        self.assertFalse(response["ok"])
+        self.assertEqual(response["id"], "a")
+        self.assertEqual(response["error"]["type"], "SyntaxError")
+        self.assertEqual(response["error"]["lineno"], 1)
+
+        response = self.request({"id": 2, "source": "", "configs": {"x": "y"}})
+        self.assertEqual(response["error"]["type"], "ValueError")
+
+        response = self.request({"id": 3})
+        self.assertEqual(response["error"]["type"], "KeyError")
+
+        response = json.loads(self.server.handle_line("{"))
+        self.assertEqual(response["id"], None)
+        self.assertEqual(response["error"]["type"], "JSONDecodeError")
+
+    def test_not_utf8(self):
+        response = json.loads(self.server.handle_line(b'{"source": "\xff"}\n'))
+        self.assertFalse(response["ok"])
+        self.assertEqual(response["error"]["type"], "UnicodeDecodeError")
+
+    def test_cache(self):
+        for _ in range(3):
+            self.assertTrue(self.request({"id": 1, "source": script})["ok"])
+        self.assertEqual(self.server.convert.cache_info().hits, 2)
+
+    def test_stream(self):
+        infile = io.StringIO(
+            json.dumps({"id": 1, "source": script})
+            + "\n\n"
+            + json.dumps({"id": 2, "source": "x = 1"})
+            + "\n"
+        )
+        outfile = io.StringIO()
+        self.server.serve_stream(infile, outfile)
+        responses = [json.loads(line) for line in outfile.getvalue().splitlines()]
+        self.assertEqual([response["id"] for response in responses], [1, 2])
+
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            socket_path = os.path.join(tmp_dir, "oneliner.sock")
+            thread = threading.Thread(target=self.server.serve_unix, args=[socket_path])
+            thread.start()
+            try:
+                while not os.path.exists(socket_path):
+                    time.sleep(0.01)
+                with ConversionClient(socket_path) as client:
+                    self.assertEqual(
+                        client.convert(script), oneliner.convert_code_string(script)
+                    )
+                    with self.assertRaises(ConversionError) as ctx:
+                        client.convert("x = (")
+                    self.assertEqual(ctx.exception.error_type, "SyntaxError")
+
+                # a bad line is answered, and the connection is kept
+                request = json.dumps({"id": 2, "source": script}).encode("utf8")
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(socket_path)
+                    sock.sendall(b"\xff\n" + request + b"\n")
+                    with sock.makefile("rb") as reader:
+                        responses = [json.loads(reader.readline()) for _ in range(2)]
+                self.assertEqual(responses[0]["error"]["type"], "UnicodeDecodeError")
+                self.assertEqual(responses[1]["id"], 2)
+                self.assertTrue(responses[1]["ok"])
+
+                # the socket of a running server is not replaced
+                with self.assertRaises(FileExistsError):
+                    ConversionServer().serve_unix(socket_path)
+                with ConversionClient(socket_path) as client:
+                    client.convert(script)
+            finally:
+                self.server.unix_server.shutdown()
+                thread.join()
+
+    def test_stale_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            socket_path = os.path.join(tmp_dir, "oneliner.sock")
+            # left by a server which is not running
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.bind(socket_path)
+            thread = threading.Thread(target=self.server.serve_unix, args=[socket_path])
+            thread.start()
+            try:
+                while not hasattr(self.server, "unix_server"):
+                    time.sleep(0.01)
+                with ConversionClient(socket_path) as client:
+                    client.convert(script)
+            finally:
+                self.server.unix_server.shutdown()
+                thread.join()
+
+    def test_unix_socket_path_not_socket(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "file")
+            with open(path, "w") as f:
+                f.write("data")
+            with self.assertRaises(FileExistsError):
+                self.server.serve_unix(path)
+            # not removed
+            with open(path) as f:
+                self.assertEqual(f.read(), "data")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import oneliner
+from oneliner.sourcemap import (
+    MappedProfile,
+    SourceMap,
+    convert_with_source_map,
+    format_exception,
+)
+
+script = """\
+def work(n):
+    total = 0
+    for i in range(n):
+        total += i
+    return total
+
+def fail(x):
+    return 1 / x
+
+work(10)
+print(fail(0))
+"""
+
+
+@unittest.skipIf(sys.version_info < (3, 11), "co_positions is required")
+class TestSourceMap(unittest.TestCase):
+    def convert(self, unparser: str) -> tuple[str, SourceMap]:
+        return convert_with_source_map(
+            script, "src.py", oneliner.Configs(unparser=unparser), "out.py"
+        )
+
+    def test_output(self):
+        for unparser in ("ast.unparse", "oneliner"):
+            output, _ = self.convert(unparser)
+            self.assertEqual(
+                output,
+                oneliner.convert_code_string(
+                    script, configs=oneliner.Configs(unparser=unparser)
+                ),
+            )
+
+    def test_traceback(self):
+        for unparser in ("ast.unparse", "oneliner"):
+            output, source_map = self.convert(unparser)
+            # assertRaises drops the traceback
+            try:
+                exec(compile(output, "out.py", "exec"), {})
+            except ZeroDivisionError as err:
+                formatted = "".join(format_exception(err, source_map, script))
+            else:
+                self.fail("ZeroDivisionError not raised")
+            self.assertIn('File "src.py", line 11, in <module>', formatted)
+            self.assertIn('File "src.py", line 8, in fail', formatted)
+            self.assertIn("    return 1 / x\n", formatted)
+            self.assertNotIn('File "out.py"', formatted)
+
+    def test_profile(self):
+        output, source_map = self.convert("oneliner")
+        profile = MappedProfile(source_map)
+        with self.assertRaises(ZeroDivisionError):
+            profile.runctx(compile(output, "out.py", "exec"), {}, None)
+        stats = pstats.Stats(profile).stats  # type: ignore
+        self.assertEqual(stats[("src.py", 1, "work")][:2], (1, 1))
+        self.assertEqual(stats[("src.py", 7, "fail")][:2], (1, 1))
+        self.assertIn(("src.py", 3, "<listcomp>"), stats)
+
+    def test_run_profile(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = [os.path.join(tmp_dir, name) for name in ("src.py", "out.py")]
+            with open(paths[0], "w", encoding="utf8") as f:
+                f.write(script)
+            map_path = os.path.join(tmp_dir, "out.map.json")
+            subprocess.run(
+                [sys.executable, "-m", "oneliner", paths[0], "-o", paths[1]]
+                + ["--source-map", map_path],
+                check=True,
+            )
+            proc = subprocess.run(
+                [sys.executable, "-m", "oneliner", "run", paths[1]]
+                + ["--source-map", map_path, "--profile"],
+                capture_output=True,
+                text=True,
+            )
+        self.assertEqual(proc.returncode, 1)
+        self.assertIn("ZeroDivisionError", proc.stderr)
+        self.assertIn("(fail)", proc.stdout)
+        # the traceback is formatted after the profiling
+        self.assertNotIn("format_exception", proc.stdout)
+
+    def test_lookup(self):
+        output, source_map = self.convert("oneliner")
+        offset = output.encode("utf8").index(b"1/x")
+        location = source_map.lookup(offset)
+        assert location is not None
+        self.assertEqual(location.lineno, 8)
+        self.assertEqual(script.splitlines()[7][location.col_offset :], "1 / x")
+        self.assertEqual(source_map.lookup_function(offset), (7, "fail"))
+        self.assertIsNone(source_map.lookup(len(output) + 10))
+
+    def test_dict(self):
+        _, source_map = self.convert("oneliner")
+        data = source_map.to_dict()
+        self.assertEqual(SourceMap.from_dict(data).to_dict(), data)
+        with self.assertRaises(ValueError):
+            SourceMap.from_dict({**data, "version": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
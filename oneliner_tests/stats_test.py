@@ -0,0 +1,92 @@
+import unittest
+
+import oneliner
+from oneliner.stats import convert_with_stats
+
+script = """\
+import os
+from os import path
+
+def f(items):
+    count = 0
+    for item in items:
+        if item:
+            if item < 0:
+                break
+            count += 1
+        print(item)
+        print(count)
+    a, b = count, 0
+    return a
+
+class A:
+    def g(self):
+        c = 0
+        def h():
+            nonlocal c
+            c += 1
+        h()
+        return c
+
+print(f([1, 2, -1, 3]), A().g())
+"""
+
+
+class TestStats(unittest.TestCase):
+    def test_output(self):
+        for unparser in ("ast.unparse", "oneliner"):
+            configs = oneliner.Configs(unparser=unparser)
+            output, _ = convert_with_stats(script, configs=configs)
+            self.assertEqual(
+                output, oneliner.convert_code_string(script, configs=configs)
+            )
+
+    def test_stats(self):
+        output, stats = oneliner.convert_with_stats(script)
+        self.assertEqual(stats.constructs["For"], 1)
+        self.assertEqual(stats.constructs["Break"], 1)
+        self.assertEqual(stats.constructs["Nonlocal"], 1)
+        self.assertEqual(stats.constructs["ClassDef"], 1)
+        self.assertEqual(stats.constructs["FunctionDef"], 3)
+        self.assertEqual(stats.statements, 22)
+
+        self.assertEqual(stats.temporaries["OL_RETURN_VALUE"], 3)
+        self.assertEqual(stats.temporaries["OL_NONLOCAL_DICT"], 1)
+        self.assertEqual(stats.temporaries["OL_INTERRUPT"], 1)
+        # eliminated, the values are used directly
+        self.assertNotIn("OL_ASSIGN_TMP", stats.temporaries)
+        self.assertNotIn("OL_IMPORT_TMP", stats.temporaries)
+        self.assertNotIn("OL_BREAK", stats.temporaries)
+
+        self.assertEqual(
+            stats.injections, ["chain_runner", "iter_wrapper", "importlib"]
+        )
+        self.assertEqual(stats.input_size, len(script))
+        self.assertEqual(stats.output_size, len(output))
+        self.assertAlmostEqual(stats.size_ratio, len(output) / len(script))
+        # the two prints after the inner "if"
+        self.assertEqual(stats.guarded_statements, 2)
+        self.assertAlmostEqual(stats.guarded_share, 2 / 22)
+        self.assertGreater(stats.nesting_depth, 10)
+
+    def test_nesting_depth(self):
+        _, flat = convert_with_stats("x = 1\n")
+        _, nested = convert_with_stats(
+            "for i in range(3):\n    for j in range(3):\n        x = i + j\n"
+        )
+        self.assertGreater(nested.nesting_depth, flat.nesting_depth)
+
+    def test_empty(self):
+        output, stats = convert_with_stats("")
+        self.assertEqual(stats.statements, 0)
+        self.assertEqual(stats.guarded_share, 0.0)
+        self.assertEqual(stats.size_ratio, 0.0)
+        self.assertEqual(stats.injections, [])
+
+    def test_report(self):
+        _, stats = convert_with_stats(script)
+        report = stats.format()
+        self.assertIn("Nonlocal", report)
+        self.assertIn("OL_NONLOCAL_DICT", report)
+        self.assertIn("guarded:        2/22 (9.1%)", report)
+        self.assertEqual(stats.to_dict()["guarded_statements"], 2)
@@ -0,0 +1,158 @@
+import io
+import os
+import tracemalloc
+import unittest
+
+import oneliner
+from oneliner.stream import convert_stream, iter_statements
+
+test_cases_dir = os.path.join(os.path.split(__file__)[0], "test_cases")
+
+
+class _Unseekable(io.StringIO):
+    def seekable(self):
+        return False
+
+
+class _Generated:
+    """
+    Generate a script of `count` statements line by line,
+    the names are reused, since the parser keeps the new names
+    """
+
+    def __init__(self, count: int):
+        self.lines = self._iter_lines(count)
+
+    @staticmethod
+    def _iter_lines(count: int):
+        yield "total = 0\n"
+        for i in range(count):
+            yield f"def f{i % 10}(n):\n"
+            yield "    for j in range(n):\n"
+            yield "        if j > 2:\n"
+            yield "            break\n"
+            yield f"    return n + {i}\n"
+            yield f"total += f{i % 10}(5)\n"
+
+    def readline(self) -> str:
+        return next(self.lines, "")
+
+
+class _Reader:
+    def __init__(self, readline):
+        self.readline = readline
+
+
+class _Sink:
+    """An output which drops the written text"""
+
+    size = 0
+
+    def write(self, text: str):
+        self.size += len(text)
+
+    def seekable(self):
+        return False
+
+
+class TestStream(unittest.TestCase):
+    def run_script(self, code: str) -> str:
+        output = io.StringIO()
+        _print = lambda *args, **kwargs: print(*args, file=output, **kwargs)
+        exec(code, {"print": _print, "__builtins__": __builtins__})
+        return output.getvalue()
+
+    def convert(self, script: str, outfile: io.StringIO, **configs) -> str:
+        convert_stream(
+            io.StringIO(script), outfile, configs=oneliner.Configs(**configs)
+        )
+        return outfile.getvalue()
+
+    def test_test_cases(self):
+        for test_case_filename in sorted(os.listdir(test_cases_dir)):
+            with open(
+                os.path.join(test_cases_dir, test_case_filename), encoding="utf8"
+            ) as f:
+                script = f.read()
+            try:
+                expected = self.run_script(script)
+            except NameError:
+                # the test case needs the globals of its test
+                continue
+            for unparser in ("ast.unparse", "oneliner"):
+                for outfile in (io.StringIO(), _Unseekable()):
+                    with self.subTest(test_case_filename, unparser=unparser):
+                        output = self.convert(script, outfile, unparser=unparser)
+                        self.assertEqual(len(output.splitlines()), 1)
+                        self.assertEqual(self.run_script(output), expected)
+
+    def test_preamble_slot(self):
+        script = "for i in range(3):\n    if i:\n        break\n"
+        output = self.convert(script, io.StringIO(), unparser="oneliner")
+        self.assertIn("__ol_iter_wrapper:=", output)
+        self.assertNotIn("importlib", output)
+        self.assertEqual(
+            self.convert("x = 1\n", io.StringIO(), unparser="oneliner").split(),
+            ["[", "(x:=1),]"],
+        )
+
+    def test_iter_statements(self):
+        script = (
+            "# comment\n"
+            "import os\n"
+            "\n"
+            "@dec\n"
+            "# comment\n"
+            "@dec2\n"
+            "def f():\n"
+            '    """\n'
+            "docs\n"
+            '"""\n'
+            "if a:\n"
+            "    pass\n"
+            "else:\n"
+            "    x = [\n"
+            "1]\n"
+            "a = 1; b = 2\n"
+            "c = \\\n"
+            "    3"
+        )
+        statements = list(iter_statements(io.StringIO(script)))
+        self.assertEqual([line for line, _ in statements], [1, 4, 11, 16, 17])
+        self.assertEqual("".join(source for _, source in statements), script)
+
+    def test_line_numbers(self):
+        script = "x = 1\n\ndef f():\n    while True:\n        x = yield\n"
+        with self.assertRaisesRegex(NotImplementedError, "At line 5, col 12"):
+            self.convert(script, io.StringIO())
+        with self.assertRaises(SyntaxError) as context:
+            self.convert("x = 1\ny = (\n", io.StringIO())
+        self.assertEqual(context.exception.lineno, 2)
+
+    def test_streaming(self):
+        # each statement is written before the next one is read
+        sink = _Sink()
+        generated = _Generated(100)
+        written = []
+
+        def readline():
+            written.append(sink.size)
+            return generated.readline()
+
+        convert_stream(_Reader(readline), sink)  # type: ignore
+        # 201 statements, some lines are read before the last one is written
+        self.assertGreater(len(set(written)), 150)
+
+    def test_bounded_memory(self):
+        peaks = []
+        for count in (50, 400):
+            tracemalloc.start()
+            try:
+                convert_stream(_Generated(count), _Sink())  # type: ignore
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            peaks.append(peak)
+        # the script is 8 times longer, the peak memory only changes
+        # with the garbage collected later
+        self.assertLess(peaks[1], peaks[0] * 3)
@@ -0,0 +1,104 @@
+# type: ignore
+print("=== Return from both branches ===")
+
+
+def func(x):
+    if x:
+        return "body"
+    else:
+        return "orelse"
+    print("never")
+
+
+print(func(1), func(0))
+
+print("=== Return from orelse ===")
+
+
+def func(x):
+    if x:
+        print("body")
+    else:
+        return "orelse"
+    return "after"
+
+
+print(func(1), func(0))
+
+print("=== Nested return ===")
+
+
+def func(x, y):
+    if x:
+        if y:
+            return "x and y"
+        print("x only")
+    elif y:
+        return "y only"
+    print("after")
+    if x or y:
+        return "x or y"
+    return
+
+
+print(func(1, 1), func(1, 0), func(0, 1), func(0, 0))
+
+print("=== Return chain ===")
+
+
+def func(x):
+    if x == 0:
+        return "zero"
+    if x == 1:
+        print("one")
+    if x == 2:
+        return "two"
+    print("other")
+    return "end"
+
+
+print(func(0), func(1), func(2), func(3))
+
+print("=== Continue at the end ===")
+for i in range(5):
+    if i % 2:
+        print("odd", i)
+        continue
+    print("even", i)
+
+print("=== Continue in orelse ===")
+for i in range(5):
+    if i < 3:
+        print("small", i)
+    else:
+        continue
+    print("after", i)
+else:
+    print("loop else")
+
+print("=== Break and continue ===")
+i = 0
+while i < 10:
+    i += 1
+    if i == 2:
+        continue
+    if i == 6:
+        break
+    print("while", i)
+else:
+    print("never")
+
+print("=== Return in loop ===")
+
+
+def func(items):
+    for item in items:
+        if item is None:
+            continue
+        if item < 0:
+            return item
+        print("item", item)
+    return "end"
+
+
+print(func([1, None, 2, -3, 4]), func([None, 5]))
@@ -0,0 +1,222 @@
+# type: ignore
+import itertools
+
+print("=== Yield in a loop ===")
+
+
+def double(items):
+    for item in items:
+        yield item * 2
+
+
+print(list(double(range(5))))
+
+print("=== Statements before the yield ===")
+
+
+def numbered(items):
+    count = 0
+    for item in items:
+        count += 1
+        line = f"{count}: {item}"
+        yield line
+    print("numbered", count)
+
+
+for line in numbered("abc"):
+    print(line)
+
+print("=== Conditional yield ===")
+
+
+def evens(items):
+    for item in items:
+        if item % 2 == 0:
+            yield item
+
+
+print(list(evens(range(10))))
+
+print("=== Lazy ===")
+
+
+def noisy(items):
+    for item in items:
+        print("before", item)
+        yield item
+        print("after", item)
+        yield -item
+    print("done")
+
+
+gen = noisy([1, 2])
+print("created")
+for value in gen:
+    print("got", value)
+gen = noisy([1, 2])
+print("first", next(gen))
+gen.close()
+
+print("=== Infinite ===")
+
+
+def naturals():
+    n = 0
+    while True:
+        yield n
+        n += 1
+
+
+print(list(itertools.islice(naturals(), 5)))
+
+print("=== Nested loops ===")
+
+
+def pairs(n):
+    for i in range(n):
+        print("row", i)
+        for j in range(i):
+            yield i, j
+
+
+print(list(pairs(4)))
+
+print("=== Break, continue and return ===")
+
+
+def until(items, stop):
+    for item in items:
+        if item == stop:
+            break
+        if item < 0:
+            continue
+        yield item
+    else:
+        yield "no stop"
+    yield "end"
+
+
+print(list(until([1, -2, 3, 4], 4)))
+print(list(until([1, -2, 3], 4)))
+
+
+def first_negative(items):
+    for item in items:
+        if item < 0:
+            return item
+        yield item
+    return None
+
+
+def outer(items):
+    result = yield from first_negative(items)
+    print("returned", result)
+
+
+print(list(outer([1, 2, -3, 4])))
+print(list(outer([1, 2])))
+
+print("=== Yield from in a loop ===")
+
+
+def flatten(tree):
+    for node in tree:
+        if isinstance(node, list):
+            yield from flatten(node)
+        else:
+            yield node
+
+
+print(list(flatten([1, [2, [3, 4]], 5])))
+
+print("=== While ===")
+
+
+def countdown(n):
+    while n > 0:
+        if n == 2:
+            n -= 1
+            continue
+        yield n
+        n -= 1
+    else:
+        yield "liftoff"
+
+
+print(list(countdown(4)))
+
+print("=== Yields out of loops ===")
+
+
+def echo():
+    received = yield "ready"
+    received = yield f"echo {received}"
+    yield f"echo {received}"
+
+
+gen = echo()
+print(next(gen))
+print(gen.send("a"))
+print(gen.send("b"))
+
+
+def steps():
+    yield 1
+    if len(str(steps)) > 0:
+        yield 2
+    yield 3
+
+
+print(list(steps()))
+
+print("=== Generator methods ===")
+
+
+class Lines:
+    def __init__(self, text):
+        self.text = text
+
+    def __iter__(self):
+        for line in self.text.split("\n"):
+            line_stripped = line.strip()
+            if line_stripped:
+                yield line_stripped
+
+
+print(list(Lines(" a \n\n b ")))
+
+print("=== Pipeline ===")
+
+
+def parse(lines):
+    for line in lines:
+        key, value = line.split("=")
+        yield key, int(value)
+
+
+def total(pairs):
+    sums = {}
+    for key, value in pairs:
+        sums[key] = sums.get(key, 0) + value
+    return sums
+
+
+print(total(parse(f"k{i % 3}={i}" for i in range(10))))
+
+
+# the unreachable "yield"s still make generators
+def unreachable_after_if(b):
+    if b > 2:
+        return 1
+    else:
+        return
+    yield 5
+
+
+def unreachable_after_return():
+    return
+    yield 1
+
+
+print(list(unreachable_after_if(2)), list(unreachable_after_if(3)))
+print(list(unreachable_after_return()))
@@ -36,3 +36,29 @@ class B:
 
 print(b)
 print(c)
+
+counter = 0
+
+
+def count(n):
+    global counter
+    for i in range(n):
+        counter = counter + i
+        if i == 3:
+            from math import floor as counter_floor
+
+            counter = counter_floor(counter / 2)
+    return counter
+
+
+print(count(6))
+print(counter)
+
+
+class C:
+    global counter
+    counter = -1
+    counter = counter * 2
+
+
+print(counter)
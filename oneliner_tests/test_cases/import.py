@@ -11,3 +11,7 @@ from os.path import splitext as sext
 
 print(join("./hello", "world.py"))
 print(sext("hello_world.py"))
+
+import os.path
+
+print(os.path.basename("./hello/world.py"))
@@ -0,0 +1,54 @@
+# type: ignore
+print("=== Nested loops ===")
+for i in range(3):
+    for j in range(i, 3):
+        print(i, j)
+
+print("=== Statements before the inner loop ===")
+total = 0
+for i in range(3):
+    total = total + i
+    offset = i * 10
+    for j in range(2):
+        print(offset + j, total)
+
+print("=== Inner while ===")
+for i in range(3):
+    k = 0
+    while k < i:
+        k += 1
+        if k == 2:
+            break
+        print(i, k)
+
+print("=== Inner break ===")
+for i in range(3):
+    for j in range(5):
+        if j > i:
+            break
+        print(i, j)
+
+print("=== Three levels ===")
+count = 0
+for a in range(2):
+    for b in range(2):
+        for c in range(2):
+            count = count + 1
+            print(a, b, c, count)
+
+print("=== Inner comprehension ===")
+for i in range(3):
+    [print(i, j) for j in range(3) if j != i]
+
+
+def func(n):
+    found = []
+    for i in range(n):
+        for j in range(n):
+            if i * j == n:
+                found.append((i, j))
+    return found
+
+
+print("=== In function ===")
+print(func(4))
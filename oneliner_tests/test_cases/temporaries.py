@@ -0,0 +1,49 @@
+# type: ignore
+
+calls = []
+
+
+def f(v):
+    calls.append(v)
+    return v
+
+
+a = b = f(1)
+print(a, b, calls)
+
+c, d = f(2), 3
+print(c, d, calls)
+
+c, d = d, c
+print(c, d)
+
+e, (g, h) = 1, (-2, 3.0)
+print(e, g, h)
+
+items = [1, 2, 3]
+items[f(0)], i = f(4), 5
+print(items, i, calls)
+
+items[0] += 10
+items[-1] *= 2
+items[0:2] += []
+print(items)
+
+from os.path import join
+
+print(join("a", "b"))
+
+
+def func():
+    from os.path import join
+    from os.path import splitext as sext
+
+    j = k = f(6)
+    m, n = f(7), 0
+    n, m = m, n
+    values = [0, 0]
+    values[1] += m
+    print(join("c", "d"), sext("e.py"), j, k, m, n, values, calls)
+
+
+func()
@@ -0,0 +1,110 @@
+# type: ignore
+print("=== Unpack in loop ===")
+
+
+def func(pairs):
+    total = 0
+    for pair in pairs:
+        key, value = pair
+        (first, *rest), last = key, value
+        total = total + value
+        print(key, value, first, rest, last)
+    return total
+
+
+print(func([("ab", 1), ("cde", 2)]))
+
+print("=== Used after the loop ===")
+
+
+def func(pairs):
+    for pair in pairs:
+        key, value = pair
+        print(key)
+    return key, value
+
+
+print(func([(1, 2), (3, 4)]))
+
+print("=== Swap ===")
+
+
+def func(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+print(func(10))
+
+print("=== Read before unpacked ===")
+
+
+def func(items):
+    result = []
+    for item in items:
+        x, y = item
+        y, z = x * 2, y
+        result.append((x, y, z))
+    return result
+
+
+print(func([(1, 2), (3, 4)]))
+
+print("=== Break and continue ===")
+
+
+def func(items):
+    for item in items:
+        head, *tail = item
+        if not tail:
+            continue
+        if head is None:
+            break
+        print(head, tail)
+    else:
+        print("no break")
+
+
+func([(1, 2), (3,), (4, 5, 6)])
+func([(1, 2), (None, 1), (7, 8)])
+
+print("=== While ===")
+
+
+def func(stack):
+    while stack:
+        name, depth = stack.pop()
+        print(name, depth)
+        if depth < 2:
+            stack.append((name + "+", depth + 1))
+
+
+func([("a", 0)])
+
+print("=== Nested loops ===")
+
+
+def func(rows):
+    for row in rows:
+        label, cells = row
+        for cell in cells:
+            x, y = cell
+            print(label, x + y)
+
+
+func([("r1", [(1, 2), (3, 4)]), ("r2", [(5, 6)])])
+
+print("=== Inner function ===")
+
+
+def func(items):
+    getters = []
+    for item in items:
+        a, b = item
+        getters.append(lambda: a + b)
+    return [getter() for getter in getters]
+
+
+print(func([(1, 2), (3, 4)]))
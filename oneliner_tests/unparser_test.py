@@ -85,6 +85,29 @@ class TestSingleExprUnparse(_TestExprUnparse):
             if sys.version_info >= (3, 12):
                 self.assertUnparseConsist("f'hello{0}fmt\\''")
 
+    def test_Constant_str_quote(self):
+        self.assertEqual(expr_unparse(ast.Constant(value="it's")), '"it\'s"')
+        self.assertEqual(expr_unparse(ast.Constant(value='"a"')), "'\"a\"'")
+        self.assertEqual(expr_unparse(ast.Constant(value="'\"")), "'\\'\"'")
+        self.assertUnparseConsist("['it\\'s', {'\"': (\"'\",)}]")
+        self.assertUnparseConsist("f\"it's {'x'}\"")
+        self.assertUnparseConsist('f\'{"it"}{[1, "s"]}\'')
+        # lone surrogates are escaped
+        self.assertEqual(expr_unparse(ast.Constant(value="\ud800")), "'\\ud800'")
+
+    def test_Constant_str_cache(self):
+        from oneliner import string_literal
+
+        before = string_literal._str_literal_cached.cache_info().currsize
+        long_string = "it's" * 1000
+        self.assertEqual(
+            expr_unparse(ast.Constant(value=long_string)), repr(long_string)
+        )
+        # long strings are not kept alive by the caches
+        self.assertEqual(
+            string_literal._str_literal_cached.cache_info().currsize, before
+        )
+
     def test_List(self):
         self.assertUnparseConsist("[]")
         self.assertUnparseConsist("[a]")
@@ -304,7 +327,7 @@ class TestComplexExprUnparse(_TestExprUnparse):
     }
 
     # generate test cases
-    def gen_complex_test_case(code: str):  # type:ignore
+    def gen_complex_test_case(code: str):  # type: ignore
         def test_case(self):
             self.assertUnparseConsist(code)
 
@@ -325,5 +348,46 @@ class TestComplexExprUnparse(_TestExprUnparse):
     del case_name  # type: ignore
 
 
+class TestLiteralUnparse(_TestExprUnparse):
+    literals = [
+        "[]",
+        "()",
+        "(1,)",
+        "[1, 2.5, 3j, -4, +5, ~6, not 7, True, None, ...]",
+        "{'a': 1, \"b'\": [2, 3], 'c\\n': {4: 'x'}}",
+        "(1, [(2, 3), {4, 5}], 'q\\\\é字', b'bytes')",
+        "[[[[[]]]], ((),), {(): {}}]",
+        "f\"{[1, 'x', (2, 'y')]}\"",
+    ]
+
+    def test_literal(self):
+        for code in self.literals:
+            with self.subTest(code):
+                self.assertUnparseConsist(code)
+
+    def test_literal_same_as_generic(self):
+        from oneliner.expr_unparse import _Node
+
+        for code in self.literals:
+            with self.subTest(code):
+                node = ast.parse(code, mode="eval").body
+                fast_result = expr_unparse(node)
+                literal_gen_funcs = _Node.literal_gen_funcs
+                try:
+                    _Node.literal_gen_funcs = ()
+                    generic_result = expr_unparse(node)
+                finally:
+                    _Node.literal_gen_funcs = literal_gen_funcs
+                self.assertEqual(fast_result, generic_result)
+
+    def test_not_literal(self):
+        from oneliner.expr_unparse import unparse_literal
+
+        for code in ["[a]", "[1, [2, a]]", "{**a}", "[-(1)**2]", "[-a]", "[*()]"]:
+            with self.subTest(code):
+                self.assertIsNone(unparse_literal(ast.parse(code).body[0].value, "'"))
+                self.assertUnparseConsist(code)
+
+
 if __name__ == "__main__":
     unittest.main()